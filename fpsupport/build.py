@@ -0,0 +1,218 @@
+"""Incremental builds of a tree of files from Jinja templates, wrapped in I/O Monads.
+
+fpsupport/build.py Copyright 2025 George Cummings
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed under the License
+is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied. See the License for the specific language governing permissions and limitations under the
+License.
+
+----
+
+A build renders many Targets, each a template, an output path and a data dictionary. Every build
+writes a manifest that records, for each template, a hash of its source and the templates it
+includes, extends or imports, and for each output, a hash of its template closure and its data.
+On the next build, an output is only rendered again if one of the templates it depends on, or its
+data, has changed.
+
+A template that includes another template by a variable name, as in {% include page %}, cannot be
+tracked. Outputs depending on such a template are always rendered.
+
+See fpsupport.file.py for an explanation of the I/O pattern.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Iterable, NamedTuple
+
+import jinja2
+import jinja2.meta
+
+from .cache import fingerprint
+from .decorator import side_effect
+from .jinja import TEMPLATE_CACHE
+from .monad import Monad
+from .struct import IOType
+
+MANIFEST_VERSION = 1
+DYNAMIC = "*"
+
+
+class Target(NamedTuple):
+    """One file of a build: the template name, relative to the template directory, and its data."""
+
+    template: str
+    output: str
+    data: dict
+
+
+@dataclass
+class BuildReport:
+    """The outcome of a build.
+
+    Attributes:
+        rendered: outputs that were rendered and written
+        skipped: outputs that were up to date
+        failed: outputs that could not be built, mapped to the reason
+    """
+
+    rendered: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+class _Graph:
+    """The dependency graph of the templates in one directory, reusing the last manifest.
+
+    A template is only parsed if its source hash differs from the one recorded in the manifest.
+    """
+
+    def __init__(self, env: jinja2.Environment, recorded: dict) -> None:
+        self.env = env
+        self.recorded = recorded
+        self.templates: dict[str, dict] = {}
+        self.closures: dict[str, str] = {}
+
+    def node(self, name: str) -> dict:
+        """Return {"source": hash, "deps": [names]} for a template."""
+        if name not in self.templates:
+            source, _, _ = self.env.loader.get_source(self.env, name)  # type: ignore
+            digest = hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+            previous = self.recorded.get(name)
+            if previous is not None and previous["source"] == digest:
+                self.templates[name] = previous
+            else:
+                references = jinja2.meta.find_referenced_templates(self.env.parse(source, name))
+                deps = sorted({DYNAMIC if ref is None else ref for ref in references})
+                self.templates[name] = {"source": digest, "deps": deps}
+        return self.templates[name]
+
+    def closure(self, name: str) -> str | None:
+        """Return a hash of a template and everything it depends on, or None if untrackable."""
+        if name not in self.closures:
+            seen: dict[str, str] = {}
+            pending = [name]
+            while pending:
+                current = pending.pop()
+                if current == DYNAMIC:
+                    return None
+                if current in seen:
+                    continue
+                node = self.node(current)
+                seen[current] = node["source"]
+                pending.extend(node["deps"])
+            self.closures[name] = fingerprint(sorted(seen.items()))  # type: ignore
+        return self.closures[name]
+
+
+def _read_manifest(manifest_path: str) -> dict:
+    """Return the manifest of the last build, or an empty one if there is none to trust."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file_pointer:
+            manifest = json.load(file_pointer)
+    except (OSError, ValueError):
+        return {"templates": {}, "outputs": {}}
+    if (
+        not isinstance(manifest, dict)
+        or manifest.get("version") != MANIFEST_VERSION
+        or not isinstance(manifest.get("templates"), dict)
+        or not isinstance(manifest.get("outputs"), dict)
+    ):
+        return {"templates": {}, "outputs": {}}
+    return manifest
+
+
+def _write_manifest(manifest_path: str, manifest: dict) -> None:
+    """Replace the manifest atomically, so an interrupted build never leaves half a manifest."""
+    temporary = f"{manifest_path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file_pointer:
+        json.dump(manifest, file_pointer, indent=1, sort_keys=True)
+    os.replace(temporary, manifest_path)
+
+
+def _write_output(path: str, text: str) -> None:
+    """Write a rendered file, creating its directory if necessary."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file_pointer:
+        file_pointer.write(text)
+
+
+def _reason(error: Exception) -> str:
+    """Describe why a target failed."""
+    if isinstance(error, OSError):
+        return f"{error.filename}: {error.strerror}"
+    if isinstance(error, jinja2.TemplateError):
+        return error.message or type(error).__name__
+    return f"{type(error).__name__}: {error}"
+
+
+@side_effect
+def build(
+    io: IOType,  # pylint: disable=unused-argument
+    template_dir: str,
+    targets: Iterable[Target],
+    manifest_path: str,
+) -> Monad:
+    """Render the targets whose templates or data changed since the last build.
+
+    Any error raised while rendering a target, such as a ZeroDivisionError in an expression, fails
+    that target rather than the build.
+
+    Args:
+        io: an unwrapped monad with content, error_msg, ok
+        template_dir: the directory the targets' template names are relative to
+        targets: the files to build
+        manifest_path: where the build manifest is read from and written to
+
+    Returns:
+        a monad wrapped around IOType:
+           outcome: a BuildReport
+           ok: False if any target failed, or if the manifest could not be written
+    """
+    manifest = _read_manifest(manifest_path)
+    env = TEMPLATE_CACHE.environment(os.path.abspath(template_dir))
+    graph = _Graph(env, manifest["templates"])
+    outputs = manifest["outputs"]
+    report = BuildReport()
+    for target in targets:
+        try:
+            closure = graph.closure(target.template)
+            entry = {"template": target.template, "closure": closure}
+            entry["data"] = fingerprint(target.data)
+            if (
+                None not in entry.values()
+                and outputs.get(target.output) == entry
+                and os.path.exists(target.output)
+            ):
+                report.skipped.append(target.output)
+                continue
+            outputs.pop(target.output, None)
+            _write_output(target.output, env.get_template(target.template).render(target.data))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            outputs.pop(target.output, None)
+            report.failed[target.output] = _reason(e)
+            continue
+        outputs[target.output] = entry
+        report.rendered.append(target.output)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "templates": {**manifest["templates"], **graph.templates},
+        "outputs": outputs,
+    }
+    try:
+        _write_manifest(manifest_path, manifest)
+    except OSError as e:
+        return Monad(IOType(report, _reason(e), False))
+    if report.failed:
+        return Monad(IOType(report, f"{len(report.failed)} targets failed", False))
+    return Monad(IOType(report, "", True))
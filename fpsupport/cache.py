@@ -0,0 +1,217 @@
+"""Bounded, thread-safe caches used by the monad-wrapped I/O functions.
+
+fpsupport/cache.py Copyright 2025 George Cummings
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed under the License
+is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied. See the License for the specific language governing permissions and limitations under the
+License.
+
+----
+
+A cache is a side effect like any other: it remembers what a pure function would recompute. The
+caches here are kept small and explicit so that a caller can always see, size and clear them.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+MISSING = object()
+
+
+class CacheInfo(NamedTuple):
+    """Counters describing how a cache has behaved since it was created or last cleared.
+
+    Invalidations are entries dropped because they were stale: expired, or failing a validity
+    check. Evictions are entries dropped to make room.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:  # pylint: disable=too-many-instance-attributes
+    """A least-recently-used mapping bounded by entries and, optionally, by age and bytes.
+
+    Attributes:
+        maxsize: the number of entries kept before the least recently used is evicted.
+        ttl: if set, the number of seconds an entry lives after it is stored.
+        max_bytes: if set, entries are evicted until the sum of their sizes fits.
+        sizeof: measures an entry for max_bytes. The default counts every entry as 1 byte.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: the number of entries kept. It must be at least 1.
+            ttl: the lifetime of an entry in seconds, or None to keep entries until evicted
+            max_bytes: the total size of the entries kept, or None for no limit
+            sizeof: a function returning the size of a value
+
+        Raises:
+            ValueError if maxsize is less than 1.
+        """
+        if maxsize < 1:
+            raise ValueError("LRUCache maxsize must be at least 1")
+        self.maxsize: int = maxsize
+        self.ttl: float | None = ttl
+        self.max_bytes: int | None = max_bytes
+        self.sizeof: Callable[[Any], int] = sizeof or (lambda value: 1)
+        self._data: OrderedDict = OrderedDict()  # key -> (value, expiry time, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(
+        self, key: Hashable, default: Any = MISSING, is_valid: Callable[[Any], bool] | None = None
+    ) -> Any:
+        """Return the value stored under key, marking it as recently used.
+
+        Args:
+            key: the cache key
+            default: returned on a miss. The module constant MISSING is the default.
+            is_valid: an optional check on the cached value. A stale value is dropped and counted
+                as both a miss and an invalidation, as is an expired one.
+
+        Returns:
+            The cached value or default.
+        """
+        with self._lock:
+            try:
+                value, expires, _ = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            if (expires is not None and expires <= time.monotonic()) or (
+                is_valid is not None and not is_valid(value)
+            ):
+                self._remove(key)
+                self._misses += 1
+                self._invalidations += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting least recently used entries until the cache fits.
+
+        A value larger than max_bytes on its own is not stored.
+        """
+        size = self.sizeof(value) if self.max_bytes is not None else 1
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (value, expires, size)
+            self._bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._data)))
+                self._evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove key from the cache and return its value, or MISSING if it was not there."""
+        with self._lock:
+            if key not in self._data:
+                return MISSING
+            return self._remove(key)
+
+    def _remove(self, key: Hashable) -> Any:
+        """Remove an entry that is known to exist. The lock must be held."""
+        value, _, size = self._data.pop(key)
+        self._bytes -= size
+        return value
+
+    def clear(self) -> None:
+        """Empty the cache and reset its counters."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def info(self) -> CacheInfo:
+        """Return the hit, miss and eviction counters along with the current size."""
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._invalidations,
+                self.maxsize,
+                len(self._data),
+            )
+
+    @property
+    def currbytes(self) -> int:
+        """Return the total size of the cached entries as measured by sizeof."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        """Return the number of entries currently cached."""
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return True if key is cached, without touching its recency or the counters."""
+        return key in self._data
+
+
+def _canonical(value: Any) -> Any:
+    """Convert plain data into a form whose repr() does not depend on insertion order.
+
+    Raises:
+        TypeError for anything other than None, bool, int, float, str, bytes, list, tuple, dict.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, list):
+        return ("list", [_canonical(item) for item in value])
+    if isinstance(value, tuple):
+        return ("tuple", [_canonical(item) for item in value])
+    if isinstance(value, dict):
+        return ("dict", sorted((repr(_canonical(k)), _canonical(v)) for k, v in value.items()))
+    raise TypeError(f"cannot fingerprint {type(value).__name__}")
+
+
+def fingerprint(value: Any) -> str | None:
+    """Return a stable hash of plain data, equal for equal data across runs and processes.
+
+    Unlike hash(), the fingerprint of a dictionary does not depend on key order, and it does not
+    change between interpreter runs.
+
+    Args:
+        value: None, bool, int, float, str, bytes, or lists, tuples and dicts of them
+
+    Returns:
+        A hexadecimal digest, or None if value holds anything else.
+    """
+    try:
+        canonical = repr(_canonical(value))
+    except (TypeError, RecursionError):
+        return None
+    return hashlib.blake2b(canonical.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
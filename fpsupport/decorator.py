@@ -17,10 +17,19 @@ License.
 
 """
 
+import asyncio
+import dataclasses
 import functools
-from typing import Callable
+import inspect
+import threading
+import time
+from typing import Any, Callable, Hashable
 
-from fpsupport import monad
+from fpsupport import exception, monad
+from fpsupport.cache import MISSING, LRUCache
+
+# The collector of @side_effect timings and outcomes. See set_metrics().
+_metrics: Any = None
 
 
 def side_effect(function: Callable) -> Callable:
@@ -37,6 +46,11 @@ def side_effect(function: Callable) -> Callable:
       outcome of the incoming Monad as the outcome of the function.
 
     It is related to the "Maybe" Monad, but is used for testing only.
+
+    A coroutine function stays a coroutine function: the skipped result is returned when the
+    wrapper is awaited.
+
+    While a collector is set with set_metrics(), every call is timed and its outcome counted.
     ---
 
     Example (naive) Usage:
@@ -71,13 +85,320 @@ def side_effect(function: Callable) -> Callable:
         io = Monad(IOType(test_data, "", None)
         assert read_file(io, "my_file.txt") == (2, test_data)
     """
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    if inspect.iscoroutinefunction(function):
+
+        @functools.wraps(function)
+        async def async_wrapper(*args, **kwargs) -> monad.Monad:
+            struct = args[0]
+            if hasattr(struct, "ok"):
+                if not struct.ok:
+                    if _metrics is not None:
+                        _metrics.skip(name)
+                    return monad.Monad(struct)
+            if _metrics is None:
+                return await function(*args, **kwargs)
+            metrics = _metrics
+            start = time.perf_counter_ns()
+            try:
+                result = await function(*args, **kwargs)
+            except BaseException as e:
+                metrics.record(name, time.perf_counter_ns() - start, None, e)
+                raise
+            metrics.record(name, time.perf_counter_ns() - start, result, None)
+            return result
+
+        return async_wrapper
 
     @functools.wraps(function)
     def wrapper(*args, **kwargs) -> monad.Monad:
         struct = args[0]
         if hasattr(struct, "ok"):
             if not struct.ok:
+                if _metrics is not None:
+                    _metrics.skip(name)
                 return monad.Monad(struct)
-        return function(*args, **kwargs)
+        if _metrics is None:
+            return function(*args, **kwargs)
+        metrics = _metrics
+        start = time.perf_counter_ns()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            metrics.record(name, time.perf_counter_ns() - start, None, e)
+            raise
+        metrics.record(name, time.perf_counter_ns() - start, result, None)
+        return result
+
+    return wrapper
+
+
+def set_metrics(collector: Any) -> None:
+    """Send the timing and outcome of every @side_effect call to collector, or stop with None.
+
+    The collector, usually a fpsupport.metrics.Metrics, needs two methods:
+
+    - skip(name): the function was skipped because the incoming ok was False or None
+    - record(name, elapsed_ns, result, error): the function returned result, or raised error
+
+    With no collector, the only cost to a call is a check on a module variable.
+    """
+    global _metrics  # pylint: disable=global-statement
+    _metrics = collector
+
+
+def do(function: Callable) -> Callable:
+    r"""Run a generator function as a chain of binds, in the manner of Haskell's do-notation.
+
+    Each `x = yield m` binds the Monad m: the generator resumes with the value m wraps, as a bound
+    function would receive it. Every earlier value stays in scope as a local variable, so a later
+    step can use any of them without nesting closures. A Maybe whose wrapped value has ok set to
+    False ends the chain at once: the generator is closed and that Maybe is returned, as
+    Maybe.flat_map would. The generator returns the final Monad.
+
+    No intermediate Monad is built between steps: the decorated function returns the Monad of the
+    return statement, or the failed Maybe.
+
+    ---
+
+    Example Usage:
+
+    ```python
+    @do
+    def greet(io: IOType, template_path: str, name_path: str):
+        template = yield Maybe(unwrap(load_template(io, template_path)))
+        name = yield Maybe(unwrap(fopen(io, name_path).flat_map(fread)))
+        return Maybe(unwrap(render(template, {"name": name.outcome})))
+    ```
+
+    Raises:
+        MonadException if, in strict validation mode, the generator yields or returns anything
+        other than a Monad.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs) -> monad.Monad:
+        steps = function(*args, **kwargs)
+        send = steps.send
+        strict = monad.Monad.strict
+        value = None
+        try:
+            while True:
+                m = send(value)
+                if strict and not isinstance(m, monad.Monad):
+                    steps.close()
+                    raise exception.MonadException(
+                        f'"{function.__name__}" yielded {type(m).__name__}, not a Monad'
+                    )
+                if isinstance(m, monad.Maybe) and m.outer.ok is False:
+                    steps.close()
+                    return m
+                value = m.outer if type(m).map is monad.Monad.map else m.map().outer
+        except StopIteration as stop:
+            result = stop.value
+            if strict and not isinstance(result, monad.Monad):
+                raise exception.MonadException(
+                    f'"{function.__name__}" returned {type(result).__name__}, not a Monad'
+                ) from None
+            return result
+
+    return wrapper
+
+
+def _memo_key(outer: Any, args: tuple, kwargs: dict) -> Hashable | None:
+    """Return a cache key for a call, or None if the arguments cannot be hashed.
+
+    A dataclass such as IOType is keyed on its type and field values, since it is not hashable.
+    """
+    if dataclasses.is_dataclass(outer) and not isinstance(outer, type):
+        outer = (type(outer), *(getattr(outer, f.name) for f in dataclasses.fields(outer)))
+    key = (outer, args, tuple(sorted(kwargs.items()))) if kwargs else (outer, args)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def memoize(
+    function: Callable | None = None, *, maxsize: int = 128, ttl: float | None = None
+) -> Callable:
+    r"""Remember the Monads returned by a bound function that is pure, or nearly so.
+
+    The cache is keyed on the unwrapped value the function is bound to, and on the other arguments.
+    Only results whose wrapped value has ok set to True are kept, so a failure is always retried.
+    A call whose arguments cannot be hashed runs uncached. The same Monad is returned to every
+    caller that hits the cache, so it must not be modified.
+
+    The decorated function gains three attributes:
+
+    - cache_info(): the hits, misses, evictions and size of its cache, as a CacheInfo
+    - cache_clear(): empties the cache and resets the counters
+    - invalidate(outer, *args, **kwargs): forgets one call, returning True if it was cached
+
+    ---
+
+    Example Usage:
+
+    ```python
+    @memoize(maxsize=32, ttl=60)
+    @side_effect
+    def read_config(io: IOType, name: str) -> Monad:
+        return fopen(io, name).flat_map(fread)
+
+    settings = Monad(IOType("", "", True)).flat_map(read_config, "settings.toml")
+    ```
+
+    Args:
+        function: the bound function, when used as @memoize without arguments
+        maxsize: the number of results kept
+        ttl: the number of seconds a result is kept, or None to keep it until evicted
+    """
+
+    def decorate(function: Callable) -> Callable:
+        cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+        @functools.wraps(function)
+        def wrapper(outer: Any, *args, **kwargs) -> monad.Monad:
+            key = _memo_key(outer, args, kwargs)
+            if key is None:
+                return function(outer, *args, **kwargs)
+            result = cache.get(key)
+            if result is MISSING:
+                result = function(outer, *args, **kwargs)
+                if getattr(getattr(result, "outer", None), "ok", None) is True:
+                    cache.put(key, result)
+            return result
+
+        def invalidate(outer: Any, *args, **kwargs) -> bool:
+            key = _memo_key(outer, args, kwargs)
+            return key is not None and cache.pop(key) is not MISSING
+
+        wrapper.cache_info = cache.info  # type: ignore[attr-defined]
+        wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+        wrapper.invalidate = invalidate  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorate if function is None else decorate(function)
+
+
+class _Flight:  # pylint: disable=too-few-public-methods
+    """A call in progress that other threads with the same arguments wait on."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: monad.Monad | None = None
+        self.error: BaseException | None = None
+
+
+class _SharedTask:  # pylint: disable=too-few-public-methods
+    """A task in progress that the coroutines with the same arguments await together."""
+
+    __slots__ = ("task", "callers")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.callers = 0
+
+
+def single_flight(function: Callable) -> Callable:
+    r"""Share one execution of a side effect among concurrent calls with the same arguments.
+
+    While a call is in progress, another call with an equal unwrapped value and equal arguments
+    does not run the function: it waits, and receives the same Monad, or the same exception. Once
+    the call completes, the next one runs again, so nothing is cached. A coroutine function
+    stays a coroutine function, and calls are shared among the tasks of one event loop. The
+    shared call runs in a task of its own: cancelling one caller leaves the others waiting, and
+    the call is only cancelled once every caller has been.
+
+    As with @side_effect, a wrapped value with ok set to False or None is returned at once in a
+    Monad. Calls whose arguments cannot be hashed are never shared. The shared Monad must not be
+    modified.
+
+    ---
+
+    Example Usage:
+
+    ```python
+    @single_flight
+    @side_effect
+    def fetch_settings(io: IOType, url: str) -> Monad:
+        ...
+
+    with ThreadPoolExecutor() as pool:
+        results = list(pool.map(lambda _: fetch_settings(io, url), range(16)))  # one request
+    ```
+    """
+    if inspect.iscoroutinefunction(function):
+        tasks: dict = {}
+
+        async def run(key: tuple, args: tuple, kwargs: dict) -> monad.Monad:
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                shared = tasks.get(key)
+                if shared is not None and shared.task is asyncio.current_task():
+                    del tasks[key]
+
+        @functools.wraps(function)
+        async def async_wrapper(*args, **kwargs) -> monad.Monad:
+            struct = args[0]
+            if hasattr(struct, "ok") and not struct.ok:
+                return monad.Monad(struct)
+            key = _memo_key(struct, args[1:], kwargs)
+            if key is None:
+                return await function(*args, **kwargs)
+            loop = asyncio.get_running_loop()
+            key = (loop, key)
+            shared = tasks.get(key)
+            if shared is None:
+                shared = tasks[key] = _SharedTask(loop.create_task(run(key, args, kwargs)))
+            # The call runs in its own task: cancelling one caller leaves the others waiting.
+            shared.callers += 1
+            try:
+                return await asyncio.shield(shared.task)
+            finally:
+                shared.callers -= 1
+                if not shared.callers:
+                    shared.task.cancel()  # the last caller has gone, or the task is done
+                    if tasks.get(key) is shared:  # a new caller must not join a cancelled call
+                        del tasks[key]
+
+        return async_wrapper
+
+    flights: dict = {}
+    lock = threading.Lock()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs) -> monad.Monad:
+        struct = args[0]
+        if hasattr(struct, "ok") and not struct.ok:
+            return monad.Monad(struct)
+        key = _memo_key(struct, args[1:], kwargs)
+        if key is None:
+            return function(*args, **kwargs)
+        with lock:
+            flight = flights.get(key)
+            waiting = flight is not None
+            if flight is None:
+                flight = flights[key] = _Flight()
+        if waiting:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = function(*args, **kwargs)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with lock:
+                del flights[key]
+            flight.done.set()
+        return flight.result
 
     return wrapper
@@ -24,8 +24,14 @@ As Python is not a lazy-evaluation language, this will permit pure functions to
 to an IO error as a simple boolean without mocking.
 """
 
-from typing import Callable
-
+import bisect
+import codecs
+import errno
+import mmap
+import os
+import threading
+import time
+from typing import IO, Callable, Iterator
 
 from .decorator import side_effect
 from .monad import Monad
@@ -65,3 +71,530 @@ def fread(io: IOType, *args, **kwargs) -> Monad:
         Monad(IOType) where IOType.outcome is the results of the file read.
     """
     return Monad(f_try(io.outcome.read, *args, **kwargs))
+
+
+@side_effect
+def fwrite(io: IOType, data: str | bytes) -> Monad:
+    """Write to a file pointer in a monad.
+
+    For many small writes, collect them in a Writer with a WriteBuffer instead.
+
+    Args:
+        io: an IOType whose outcome is a file pointer opened for writing
+        data: the text or bytes to write
+
+    Returns:
+        Monad(IOType) where IOType.outcome is the number of characters or bytes written
+    """
+    return Monad(f_try(io.outcome.write, data))
+
+
+@side_effect
+def fclose(io: IOType) -> Monad:
+    """Close a file pointer, flushing what remains of its buffer.
+
+    Use it as the release of fpsupport.monad.bracket, so that the file is closed however the chain
+    that reads it ends: bracket(Monad(IOType()), fopen, lambda m: m >> fread, fclose, path).
+
+    Args:
+        io: an IOType whose outcome is a file pointer, such as the outcome of fopen
+
+    Returns:
+        Monad(IOType) where IOType.outcome is None, or a failed IOType if the final flush failed
+    """
+    return Monad(f_try(io.outcome.close))
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _stream_error(e: OSError | ValueError, file_pointer: IO) -> IOType:
+    """Describe an error met while streaming, in the manner of f_try."""
+    name = getattr(file_pointer, "name", "")
+    if isinstance(e, OSError):
+        return IOType("", f"{e.filename or name}: {e.strerror}", False)
+    return IOType("", f"{name}: {e}", False)
+
+
+def _chunks(
+    file_pointer: IO, chunk_size: int, encoding: str | None, errors: str
+) -> Iterator[IOType]:
+    """Yield an IOType per chunk read, decoding bytes if an encoding is given.
+
+    An error ends the stream with a failed IOType.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors) if encoding else None
+    try:
+        while True:
+            raw = file_pointer.read(chunk_size)
+            chunk = raw
+            if decoder is not None and isinstance(raw, bytes):
+                chunk = decoder.decode(raw, final=not raw)
+            if chunk:
+                yield IOType(chunk, "", True)
+            if not raw:
+                return
+    except (OSError, ValueError) as e:
+        yield _stream_error(e, file_pointer)
+
+
+def _lines(chunks: Iterator[IOType], keepends: bool) -> Iterator[IOType]:
+    """Split a stream of chunks into an IOType per line, ended by a newline."""
+    pending = None
+    for io in chunks:
+        if not io.ok:
+            if pending:
+                yield IOType(pending, "", True)
+            yield io
+            return
+        text = io.outcome if pending is None else pending + io.outcome
+        newline = "\n" if isinstance(text, str) else b"\n"
+        start = 0
+        end = text.find(newline)
+        while end != -1:
+            yield IOType(text[start : end + 1 if keepends else end], "", True)
+            start = end + 1
+            end = text.find(newline, start)
+        pending = text[start:]
+    if pending:
+        yield IOType(pending, "", True)
+
+
+@side_effect
+def fread_chunks(
+    io: IOType,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str | None = None,
+    errors: str = "strict",
+) -> Monad:
+    """Read a file from a file pointer in a monad, one chunk at a time.
+
+    Nothing is read until the chunks are iterated, and only one chunk is held at a time, so the
+    memory used does not depend on the size of the file. An error while reading, or decoding, ends
+    the stream with a failed IOType rather than an exception.
+
+    Args:
+        io: an IOType whose outcome is a file pointer
+        chunk_size: the characters, or bytes, read at a time
+        encoding: decode a file opened in binary mode, with a decoder that handles characters
+            split between chunks. A file opened in text mode is decoded by the file itself.
+        errors: the decoding error handler, as in bytes.decode()
+
+    Returns:
+        Monad(IOType) where IOType.outcome is a generator of IOType, one per chunk.
+    """
+    return Monad(IOType(_chunks(io.outcome, chunk_size, encoding, errors), "", True))
+
+
+@side_effect
+def fread_lines(
+    io: IOType,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str | None = None,
+    errors: str = "strict",
+    keepends: bool = True,
+) -> Monad:
+    r"""Read a file from a file pointer in a monad, one line at a time.
+
+    As fread_chunks, the file is read lazily a chunk at a time. Lines end at "\n".
+
+    Args:
+        io: an IOType whose outcome is a file pointer
+        chunk_size: the characters, or bytes, read at a time
+        encoding: decode a file opened in binary mode
+        errors: the decoding error handler, as in bytes.decode()
+        keepends: if False, the newline is removed from each line
+
+    Returns:
+        Monad(IOType) where IOType.outcome is a generator of IOType, one per line.
+    """
+    chunks = _chunks(io.outcome, chunk_size, encoding, errors)
+    return Monad(IOType(_lines(chunks, keepends), "", True))
+
+
+def _map(file_pointer: IO, offset: int, length: int) -> memoryview:
+    """Map a window of a file read-only, returning a memoryview of exactly that window.
+
+    mmap only maps from a multiple of the allocation granularity, so the mapping starts at the
+    nearest such offset before the window, and the view skips the difference. A window starting
+    at or past the end of the file raises an OSError: mmap would map it as an empty view. So does
+    a negative offset or length, which mmap would raise as an OverflowError.
+    """
+    if offset < 0 or length < 0:
+        raise OSError(errno.EINVAL, "offset and length must not be negative", file_pointer.name)
+    fileno = file_pointer.fileno()
+    if offset >= os.fstat(fileno).st_size:
+        raise OSError(errno.EINVAL, "offset is past the end of the file", file_pointer.name)
+    skip = offset % mmap.ALLOCATIONGRANULARITY
+    mapped = mmap.mmap(
+        fileno, length + skip if length else 0, access=mmap.ACCESS_READ, offset=offset - skip
+    )
+    view = memoryview(mapped)
+    if not skip:
+        return view
+    window = view[skip:]
+    view.release()
+    return window
+
+
+@side_effect
+def fmmap(io: IOType, offset: int = 0, length: int = 0) -> Monad:
+    """Map a file into memory, read-only, without copying it into a Python object.
+
+    Release the mapping with funmap() as soon as it is no longer needed: until then it holds the
+    address space, and the file stays open in the operating system.
+
+    Args:
+        io: an IOType whose outcome is a file pointer, such as the outcome of fopen(io, path, "rb")
+        offset: the first byte of the window
+        length: the bytes in the window, or 0 for the rest of the file
+
+    Returns:
+        Monad(IOType) where IOType.outcome is a read-only memoryview of the window. An empty file,
+        or a window beyond the end of the file, fails as an OSError would.
+    """
+    try:
+        return Monad(f_try(_map, io.outcome, offset, length))
+    except ValueError as e:
+        return Monad(IOType("", f"{getattr(io.outcome, 'name', '')}: {e}", False))
+
+
+@side_effect
+def funmap(io: IOType) -> Monad:
+    """Release a memoryview returned by fmmap and close its mapping.
+
+    Args:
+        io: an IOType whose outcome is the memoryview returned by fmmap
+
+    Returns:
+        Monad(IOType) with ok set, or cleared if another view of the mapping is still in use, in
+        which case the mapping is closed when that view is released and collected.
+    """
+    view = io.outcome
+    mapped = view.obj
+    view.release()
+    try:
+        mapped.close()
+    except BufferError as e:
+        return Monad(IOType("", str(e), False))
+    return Monad(IOType("", "", True))
+
+
+class BufferPool:
+    """A thread-safe pool of reusable bytearrays, in a few size classes.
+
+    acquire() returns a buffer of the smallest class that fits, reusing a released one when it
+    can. Buffers larger than the largest class are allocated for the call and not kept.
+
+    Attributes:
+        size_classes: the buffer sizes kept, in bytes, in increasing order
+        max_per_class: the released buffers kept per class. Others are left to the collector.
+        allocated: the number of bytearrays the pool has created
+    """
+
+    def __init__(
+        self, size_classes: tuple[int, ...] = (4096, 65_536, 1_048_576), max_per_class: int = 16
+    ) -> None:
+        """Initialize an empty pool."""
+        self.size_classes = tuple(sorted(size_classes))
+        self.max_per_class = max_per_class
+        self.allocated = 0
+        self._free: dict[int, list[bytearray]] = {size: [] for size in self.size_classes}
+        self._lock = threading.Lock()
+
+    def acquire(self, size: int) -> bytearray:
+        """Return a buffer of at least size bytes."""
+        index = bisect.bisect_left(self.size_classes, size)
+        with self._lock:
+            if index < len(self.size_classes):
+                free = self._free[self.size_classes[index]]
+                if free:
+                    return free.pop()
+                size = self.size_classes[index]
+            self.allocated += 1
+        return bytearray(size)
+
+    def release(self, buffer: bytearray | memoryview) -> None:
+        """Give a buffer back, or a memoryview of one, such as the outcome of freadinto.
+
+        A memoryview is released first. Any other view of the buffer will see it overwritten.
+        """
+        if isinstance(buffer, memoryview):
+            view, buffer = buffer, buffer.obj  # type: ignore[assignment]
+            view.release()
+        if not isinstance(buffer, bytearray):
+            return
+        with self._lock:
+            free = self._free.get(len(buffer))
+            if free is not None and len(free) < self.max_per_class:
+                free.append(buffer)
+
+
+BUFFER_POOL = BufferPool()
+
+
+@side_effect
+def freadinto(
+    io: IOType,
+    size: int,
+    buffer: bytearray | memoryview | None = None,
+    pool: BufferPool = BUFFER_POOL,
+) -> Monad:
+    """Read up to size bytes from a binary file pointer into a reusable buffer, without a copy.
+
+    Reading fixed-size records into the same buffer allocates no bytes object per record. Either
+    pass the buffer, or let the pool provide one and give it back with pool.release(outcome).
+
+    Args:
+        io: an IOType whose outcome is a file pointer opened in binary mode
+        size: the most bytes to read
+        buffer: a writable buffer of at least size bytes. If None, one is taken from pool.
+        pool: the BufferPool to take a buffer from. The default is BUFFER_POOL.
+
+    Returns:
+        Monad(IOType) where IOType.outcome is a memoryview of the bytes read, empty at the end of
+        the file. The view is only valid until the buffer is read into again.
+    """
+    pooled = buffer is None
+    view = memoryview(pool.acquire(size) if pooled else buffer)  # type: ignore[arg-type]
+    if len(view) != size:
+        view = view[:size]
+    result = f_try(io.outcome.readinto, view)
+    if not result.ok:
+        if pooled:
+            pool.release(view)
+        return Monad(result)
+    if result.outcome != size:
+        view = view[: result.outcome]
+    result.outcome = view
+    return Monad(result)
+
+
+DEFAULT_FLUSH_BYTES = 1024 * 1024
+
+
+class WriteBuffer:  # pylint: disable=too-many-instance-attributes
+    """Output collected in memory and written to a file in batches, the sink of a Writer.
+
+    The output is written once flush_bytes characters, or bytes, are waiting, or once flush_seconds
+    have passed since the last batch. Without a background thread, both are checked on write(),
+    which writes the batch itself. With one, write() only appends, and the thread writes the
+    batches, so that producers do not wait on the disk. The memory held is then bounded only by
+    how fast the disk keeps up.
+
+    Atomic output goes to a temporary file beside file_path, which close() moves into place once
+    everything is written and synced. Readers see the old file or the new one, never a part.
+
+    Errors do not raise: write() and close() return a failed IOType, and after a failure every
+    later call returns that failure.
+
+    Attributes:
+        file_path: the file to write
+        mode: "w" or "wb", or "a" or "ab" to append when not atomic
+        encoding: the encoding of a text mode
+        flush_bytes: the characters, or bytes, waiting that start a batch
+        flush_seconds: the time since the last batch that starts one
+        atomic: write to a temporary file and move it into place on close
+        written: the characters, or bytes, accepted so far
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        file_path: str,
+        mode: str = "w",
+        *,
+        encoding: str | None = "utf-8",
+        flush_bytes: int = DEFAULT_FLUSH_BYTES,
+        flush_seconds: float = 1.0,
+        atomic: bool = True,
+        background: bool = False,
+    ) -> None:
+        """Initialize the buffer. The file is opened by the first batch.
+
+        Raises:
+            ValueError if an atomic buffer is asked to append
+        """
+        if atomic and mode.startswith("a"):
+            raise ValueError("an atomic WriteBuffer replaces the file, and cannot append to it")
+        self.file_path = file_path
+        self.mode = mode
+        self.encoding = None if "b" in mode else encoding
+        self.flush_bytes = flush_bytes
+        self.flush_seconds = flush_seconds
+        self.atomic = atomic
+        self.written = 0
+        self._empty: str | bytes = b"" if "b" in mode else ""
+        self._parts: list = []
+        self._size = 0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()  # guards the parts waiting
+        self._io_lock = threading.Lock()  # serializes the batches, in order
+        self._file: IO | None = None
+        self._temporary = f"{file_path}.{os.getpid()}.{id(self):x}.tmp"
+        self._error: IOType | None = None
+        self._result: IOType | None = None
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name="WriteBuffer", daemon=True)
+            self._thread.start()
+
+    def __repr__(self) -> str:
+        """Return WriteBuffer(file_path)."""
+        return f"WriteBuffer({self.file_path!r})"
+
+    def write(self, data: str | bytes) -> IOType:
+        """Append data, writing a batch if one is due.
+
+        Returns:
+            IOType where IOType.outcome is the length of data, or the failure of a batch
+        """
+        with self._lock:
+            if self._result is not None:
+                return IOType("", f"{self.file_path}: the buffer is closed", False)
+            if self._error is not None:
+                return self._error
+            if not isinstance(data, type(self._empty)):
+                return IOType(
+                    "",
+                    f"{self.file_path}: mode {self.mode!r} writes {type(self._empty).__name__}, "
+                    f"not {type(data).__name__}",
+                    False,
+                )
+            self._parts.append(data)
+            self._size += len(data)
+            self.written += len(data)
+            due = (
+                self._size >= self.flush_bytes
+                or time.monotonic() - self._last >= self.flush_seconds
+            )
+        if due:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                flushed = self.flush()
+                if not flushed.ok:
+                    return flushed
+        return IOType(len(data), "", True)
+
+    def flush(self) -> IOType:
+        """Write out everything waiting.
+
+        Returns:
+            IOType where IOType.outcome is the number of characters, or bytes, written
+        """
+        with self._io_lock:
+            return self._flush()
+
+    def close(self) -> IOType:
+        """Write out everything waiting, close the file and, if atomic, move it into place.
+
+        A second close returns the result of the first.
+
+        Returns:
+            IOType where IOType.outcome is the number of characters, or bytes, written in all
+        """
+        self._stop()
+        with self._io_lock:
+            if self._result is None:
+                result = self._flush()
+                if result.ok:
+                    result = f_try(self._commit)
+                if not result.ok:
+                    self._abandon()
+                with self._lock:
+                    self._result = result
+            return self._result
+
+    def discard(self) -> None:
+        """Drop everything waiting and close the file. An atomic buffer leaves file_path alone."""
+        self._stop()
+        with self._io_lock, self._lock:
+            self._parts, self._size = [], 0
+            if self._result is None:
+                self._abandon()
+                self._result = IOType("", f"{self.file_path}: the buffer was discarded", False)
+
+    def _flush(self) -> IOType:
+        """Write the waiting parts as one batch. The caller holds _io_lock."""
+        with self._lock:
+            if self._error is not None:
+                return self._error
+            parts, self._parts, self._size = self._parts, [], 0
+            self._last = time.monotonic()
+        if self._file is None:
+            opened = f_try(self._open)
+            if not opened.ok:
+                self._error = opened
+                return opened
+            self._file = opened.outcome
+        if not parts:
+            return IOType(0, "", True)
+        try:
+            result = f_try(self._write, self._empty.join(parts))
+        except ValueError as e:  # an encoding error, for one
+            result = IOType("", f"{self.file_path}: {e}", False)
+        if not result.ok:
+            self._error = result
+        return result
+
+    def _open(self) -> IO:
+        """Open the temporary file, or file_path itself when not atomic."""
+        if self.atomic:
+            return open(self._temporary, self.mode.replace("w", "x"), encoding=self.encoding)
+        return open(self.file_path, self.mode, encoding=self.encoding)
+
+    def _write(self, data: str | bytes) -> int:
+        """Write a batch through to the operating system."""
+        written = self._file.write(data)  # type: ignore[union-attr]
+        self._file.flush()  # type: ignore[union-attr]
+        return written
+
+    def _commit(self) -> int:
+        """Close the file and, if atomic, sync it and move it into place."""
+        file_pointer = self._file
+        if self.atomic:
+            os.fsync(file_pointer.fileno())  # type: ignore[union-attr]
+        file_pointer.close()  # type: ignore[union-attr]
+        if self.atomic:
+            os.replace(self._temporary, self.file_path)
+        return self.written
+
+    def _abandon(self) -> None:
+        """Close the file and remove the temporary file, ignoring errors."""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        if self.atomic:
+            try:
+                os.remove(self._temporary)
+            except OSError:
+                pass
+
+    def _stop(self) -> None:
+        """Stop the background thread, if any, once it has finished its batch."""
+        thread = self._thread
+        if thread is not None:
+            self._thread = None
+            self._wake.set()
+            thread.join()
+
+    def _run(self) -> None:
+        """Write the batches that are due, until stopped."""
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            if self._thread is None:
+                return
+            with self._lock:
+                due = self._parts and (
+                    self._size >= self.flush_bytes
+                    or time.monotonic() - self._last >= self.flush_seconds
+                )
+            if due:
+                try:
+                    self.flush()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    self._error = IOType("", f"{self.file_path}: {e}", False)
@@ -17,42 +17,452 @@ See fpsupport.file.py for an explanation of the pattern.
 This is just one example of how a monad can be used to prevent I/O side effects from messing up
 your unit tests. It also keeps Exceptions and all sorts of if/then/else/buts from cluttering your
 code.
+
+Loaded templates are kept in a process-wide TemplateCache, TEMPLATE_CACHE. One Jinja environment
+is kept per template directory, and one compiled template per file path. A cached template is
+reused until the file's modification time or size changes on disk.
+
+To shorten a cold start, TEMPLATE_CACHE can keep Jinja bytecode on disk (set_bytecode_dir), or load
+a template tree that was compiled ahead of time by precompile_templates (load_precompiled).
 """
 
+import asyncio
+import collections
+import importlib.util
+import itertools
+import marshal
+import os
 import pathlib
+import pickle
+from concurrent import futures
+from types import CodeType
+from typing import IO, Callable, Iterable, Iterator
 
 import jinja2
 
+from .cache import MISSING, CacheInfo, LRUCache, fingerprint
 from .decorator import side_effect
+from .file import f_try
 from .struct import IOType
 from .monad import Monad, unwrap
 
 
+def _signature(path: str) -> tuple[int, int] | None:
+    """Return the (mtime, size) of a file, or None if it cannot be read."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _FileSystemLoader(jinja2.FileSystemLoader):
+    """A FileSystemLoader whose templates are out of date when their size changes, not only mtime.
+
+    The Jinja environment keeps its own cache of templates, which it checks with the uptodate
+    function of the loader. This one compares the (mtime, size) signature, as TemplateCache does.
+    """
+
+    def get_source(
+        self, environment: jinja2.Environment, template: str
+    ) -> tuple[str, str, Callable[[], bool]]:
+        """Return the source, the file name and a check of the file's signature."""
+        source, filename, _ = super().get_source(environment, template)
+        signature = _signature(filename)
+        return (
+            source,
+            filename,
+            lambda: signature is not None and _signature(filename) == signature,
+        )
+
+
+class PrecompiledLoader(jinja2.BaseLoader):
+    """A Jinja loader that serves code objects compiled by precompile_templates().
+
+    Nothing is read or parsed: the template is built straight from its code object.
+    """
+
+    def __init__(self, codes: dict[str, CodeType]) -> None:
+        """Initialize the loader with compiled templates keyed by name."""
+        self.codes: dict[str, CodeType] = codes
+
+    def list_templates(self) -> list[str]:
+        """Return the names of the precompiled templates."""
+        return sorted(self.codes)
+
+    def load(
+        self,
+        environment: jinja2.Environment,
+        name: str,
+        globals: dict | None = None,  # pylint: disable=redefined-builtin
+    ) -> jinja2.Template:
+        """Build a template from its precompiled code.
+
+        The globals come from the environment, already merged with its own, and are used as they
+        are, as jinja2.BaseLoader.load() does.
+
+        Raises:
+            jinja2.TemplateNotFound if name was not precompiled
+        """
+        try:
+            code = self.codes[name]
+        except KeyError:
+            raise jinja2.TemplateNotFound(name) from None
+        if globals is None:
+            globals = {}
+        return environment.template_class.from_code(environment, code, globals)
+
+
+class TemplateCache:
+    """A bounded cache of Jinja environments and their compiled templates.
+
+    Attributes:
+        environments: an LRUCache of jinja2.Environment keyed by template directory
+        templates: an LRUCache of (jinja2.Template, signature) keyed by absolute file path and
+            whether the template is asynchronous
+        check_mtime: if True, a file is checked with stat() on every load and recompiled if it
+            changed. If False, a cached template is trusted until it is evicted or cleared.
+        bytecode_dir: if set, compiled templates are also kept on disk in this directory so that
+            a new process can skip parsing them.
+        precompiled: template directories mapped to the code compiled by precompile_templates().
+    """
+
+    def __init__(
+        self,
+        max_environments: int = 32,
+        max_templates: int = 512,
+        check_mtime: bool = True,
+        bytecode_dir: str | None = None,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_environments: the number of template directories kept
+            max_templates: the number of compiled templates kept
+            check_mtime: the default for stat-based invalidation
+            bytecode_dir: an optional directory for Jinja's on-disk bytecode cache
+        """
+        self.environments: LRUCache = LRUCache(max_environments)
+        self.templates: LRUCache = LRUCache(max_templates)
+        self.check_mtime: bool = check_mtime
+        self.bytecode_dir: str | None = bytecode_dir
+        self.precompiled: dict[str, dict[str, CodeType]] = {}
+
+    def set_bytecode_dir(self, bytecode_dir: str | None) -> None:
+        """Turn the on-disk bytecode cache on, or off with None, and drop what is in memory."""
+        self.bytecode_dir = bytecode_dir
+        self.clear()
+
+    def add_precompiled(self, directory: str, codes: dict[str, CodeType]) -> None:
+        """Serve the templates under directory from code compiled ahead of time.
+
+        A precompiled template is not recompiled when its source changes. Rebuild the archive
+        instead. Templates missing from the archive are still loaded from the directory. As without
+        an archive, a template in a subdirectory is loaded by the environment of its own directory,
+        so the names it extends or includes are relative to that directory.
+
+        Args:
+            directory: the template directory that was precompiled
+            codes: compiled templates keyed by their name relative to directory
+        """
+        self.precompiled[os.path.abspath(directory)] = codes
+        self.clear()
+
+    def environment(
+        self, template_dir: str, auto_reload: bool = True, enable_async: bool = False
+    ) -> jinja2.Environment:
+        """Return the cached Jinja environment for a directory, creating it if necessary.
+
+        Precompiled templates are synchronous, so an asynchronous environment never uses them.
+        """
+        key = (template_dir, auto_reload, enable_async)
+        env = self.environments.get(key)
+        if env is MISSING:
+            loader: jinja2.BaseLoader = _FileSystemLoader(template_dir)
+            codes = self._archive(template_dir)
+            if codes is not None and not enable_async:
+                loader = jinja2.ChoiceLoader([PrecompiledLoader(codes), loader])
+            bytecode_cache = (
+                jinja2.FileSystemBytecodeCache(self.bytecode_dir) if self.bytecode_dir else None
+            )
+            env = jinja2.Environment(
+                loader=loader,
+                auto_reload=auto_reload,
+                bytecode_cache=bytecode_cache,
+                enable_async=enable_async,
+            )
+            self.environments.put(key, env)
+        return env
+
+    def get_template(
+        self, file_path: str, check_mtime: bool | None = None, enable_async: bool = False
+    ) -> jinja2.Template:
+        """Return the compiled template for a file path.
+
+        Args:
+            file_path: the direct path to a template
+            check_mtime: overrides the cache's check_mtime for this call
+            enable_async: if True, compile the template for render_async
+
+        Returns:
+            a jinja2.Template
+
+        Raises:
+            jinja2.TemplateNotFound if the file does not exist
+        """
+        path = os.path.abspath(file_path)
+        check = self.check_mtime if check_mtime is None else check_mtime
+        signature = _signature(path) if check else None
+        key = (path, enable_async)
+        entry = self.templates.get(
+            key, is_valid=(lambda entry: entry[1] == signature) if check else None
+        )
+        if entry is not MISSING:
+            return entry[0]
+        template_dir, name = os.path.split(path)
+        template = self.environment(template_dir, check, enable_async).get_template(name)
+        self.templates.put(key, (template, signature if check else _signature(path)))
+        return template
+
+    def _archive(self, template_dir: str) -> dict[str, CodeType] | None:
+        """Return the precompiled code for template_dir, or None if no archive covers it.
+
+        The templates are named relative to template_dir, as its environment's loader names them.
+        """
+        roots = [
+            directory
+            for directory in self.precompiled
+            if template_dir == directory or template_dir.startswith(directory + os.sep)
+        ]
+        if not roots:
+            return None
+        directory = max(roots, key=len)
+        if directory == template_dir:
+            return self.precompiled[directory]
+        prefix = pathlib.PurePath(template_dir).relative_to(directory).as_posix() + "/"
+        return {
+            name[len(prefix) :]: code
+            for name, code in self.precompiled[directory].items()
+            if name.startswith(prefix)
+        }
+
+    def info(self) -> dict[str, CacheInfo]:
+        """Return the counters of the environment and template caches."""
+        return {"environments": self.environments.info(), "templates": self.templates.info()}
+
+    def clear(self) -> None:
+        """Drop every cached environment and template."""
+        self.environments.clear()
+        self.templates.clear()
+
+
+TEMPLATE_CACHE = TemplateCache()
+
+
 @side_effect
-def load_template(io: IOType, file_path: str) -> Monad:  # pylint: disable=unused-argument
-    """Load a Jinja2 template from disk.
+def load_template(
+    io: IOType,  # pylint: disable=unused-argument
+    file_path: str,
+    check_mtime: bool | None = None,
+    enable_async: bool = False,
+) -> Monad:
+    """Load a Jinja2 template from disk, or from the TEMPLATE_CACHE.
 
     Args:
         io: an unwrapped monad with content, error_msg, ok
         file_path: the direct path to a template.
+        check_mtime: if False, skip the stat() call that detects a changed file. The default is
+            TEMPLATE_CACHE.check_mtime.
+        enable_async: if True, load the template for render_async.
 
     Returns:
         a monad wrapped around IOType:
            outcome: a jinja2 template, correctly formatted.
            ok: meta-information if the IO succeeded, failed, or was skipped as part of a test
     """
-    template_dir = pathlib.Path(file_path).resolve().parent
-    filename = pathlib.Path(file_path).name
     try:
-        env = jinja2.Environment(loader=jinja2.FileSystemLoader(template_dir))
-        return Monad(IOType(env.get_template(filename), "", True))
+        template = TEMPLATE_CACHE.get_template(file_path, check_mtime, enable_async)
+        return Monad(IOType(template, "", True))
     except jinja2.TemplateNotFound as e:
         return Monad(IOType("", e.message, False))
 
 
-def render(io: IOType, data: dict) -> Monad:  # pylint: disable=unused-argument
+_ARCHIVE_MAGIC = b"FPSJ" + importlib.util.MAGIC_NUMBER
+
+
+@side_effect
+def precompile_templates(
+    io: IOType,  # pylint: disable=unused-argument
+    directory: str,
+    target: str,
+    extensions: list[str] | None = None,
+) -> Monad:
+    """Compile every template under a directory into an archive ahead of time.
+
+    The archive holds marshalled Python code, so it can only be loaded by the Python version that
+    wrote it. Register it with load_precompiled() so that load_template() builds templates from the
+    compiled code without reading or parsing their source.
+
+    Args:
+        io: an unwrapped monad with content, error_msg, ok
+        directory: the root of the template tree
+        target: the path of the archive to write
+        extensions: if given, only files ending with one of these extensions, like "j2", are
+            compiled
+
+    Returns:
+        a monad wrapped around IOType:
+           outcome: the path of the archive
+           ok: False if a template failed to compile or the archive could not be written
+    """
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(directory))
+    archive = os.path.abspath(target)
+    suffixes = tuple(f".{extension}" for extension in extensions) if extensions else ("",)
+
+    def wanted(name: str) -> bool:
+        path = os.path.abspath(os.path.join(directory, name))
+        return name.endswith(suffixes) and path != archive
+
+    codes = {}
+    try:
+        for name in env.list_templates(filter_func=wanted):
+            source, filename, _ = env.loader.get_source(env, name)  # type: ignore
+            codes[name] = env.compile(source, name, filename)
+        with open(target, "wb") as file_pointer:
+            file_pointer.write(_ARCHIVE_MAGIC + marshal.dumps(codes))
+    except jinja2.TemplateSyntaxError as e:
+        return Monad(IOType("", f"{e.filename}:{e.lineno}: {e.message}", False))
+    except UnicodeDecodeError as e:
+        return Monad(IOType("", f"{directory}: {e.reason}", False))
+    except OSError as e:
+        return Monad(IOType("", f"{e.filename}: {e.strerror}", False))
+    return Monad(IOType(target, "", True))
+
+
+def _read_archive(target: str) -> dict[str, CodeType] | None:
+    """Return the templates in an archive, or None if this Python did not write the archive."""
+    with open(target, "rb") as file_pointer:
+        data = file_pointer.read()
+    if not data.startswith(_ARCHIVE_MAGIC):
+        return None
+    try:
+        return marshal.loads(data[len(_ARCHIVE_MAGIC) :])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+@side_effect
+def load_precompiled(
+    io: IOType, directory: str, target: str  # pylint: disable=unused-argument
+) -> Monad:
+    """Register an archive written by precompile_templates() with the TEMPLATE_CACHE.
+
+    Args:
+        io: an unwrapped monad with content, error_msg, ok
+        directory: the template directory that was precompiled
+        target: the archive
+
+    Returns:
+        a monad wrapped around IOType:
+           outcome: the number of precompiled templates
+           ok: False if the archive could not be read or belongs to another Python version
+    """
+    result = f_try(_read_archive, target)
+    if not result.ok:
+        return Monad(result)
+    if result.outcome is None:
+        return Monad(IOType("", f"{target}: not a template archive for this Python", False))
+    TEMPLATE_CACHE.add_precompiled(directory, result.outcome)
+    return Monad(IOType(len(result.outcome), "", True))
+
+
+def _utf8_size(text: str) -> int:
+    """Return the size of text in UTF-8 bytes."""
+    return len(text.encode("utf-8", "surrogatepass"))
+
+
+class RenderCache:
+    """A cache of rendered output keyed by template and a fingerprint of the data.
+
+    Only successful renders are cached. Data that cannot be fingerprinted, that is anything other
+    than plain dicts, lists, tuples, strings, numbers and None, is rendered without the cache.
+    Templates whose output is not determined by their data, like one printing the time, must not
+    be rendered with a cache: leave the cache out of the call, or exclude the template by name.
+
+    Attributes:
+        outputs: an LRUCache of rendered strings
+        excluded: names of templates that are never cached
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float | None = None, max_bytes: int = 64 * 1024 * 1024
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: the number of rendered outputs kept
+            ttl: the lifetime of an output in seconds, or None to keep it until evicted
+            max_bytes: the total size of the outputs kept, counted in UTF-8 bytes
+        """
+        self.outputs: LRUCache = LRUCache(maxsize, ttl=ttl, max_bytes=max_bytes, sizeof=_utf8_size)
+        self.excluded: set[str] = set()
+
+    def exclude(self, template_name: str) -> None:
+        """Never cache the output of the template with this name."""
+        self.excluded.add(template_name)
+
+    def key(self, template: jinja2.Template, data: dict) -> tuple | None:
+        """Return the cache key of a render, or None if the render must not be cached."""
+        if template.name in self.excluded:
+            return None
+        digest = fingerprint(data)
+        return None if digest is None else (template, digest)
+
+    def info(self) -> CacheInfo:
+        """Return the counters of the output cache."""
+        return self.outputs.info()
+
+    def clear(self) -> None:
+        """Drop every cached output."""
+        self.outputs.clear()
+
+
+def render(io: IOType, data: dict, cache: RenderCache | None = None) -> Monad:
     """Pass data through a jinja2 template and returns its outcome.
 
+    Args:
+        io: An IOType whose outcome is a jinja template
+        data: a dictionary of values to be merged with the template
+        cache: an optional RenderCache holding earlier outputs of the same template and data
+
+    Returns:
+        a monad wrapped around IOType:
+           outcome: a string combining the data with the template
+    """
+    if not isinstance(io.outcome, jinja2.Template):
+        return Monad(io)
+    if not isinstance(data, dict):
+        return Monad(IOType("", f"data invalid type {str(type(data))}", False))
+    template = io.outcome
+    key = cache.key(template, data) if cache is not None else None
+    if key is None:
+        return Monad(IOType(template.render(data), "", True))
+    output = cache.outputs.get(key)  # type: ignore
+    if output is MISSING:
+        output = template.render(data)
+        cache.outputs.put(key, output)  # type: ignore
+    return Monad(IOType(output, "", True))
+
+
+ASYNC_YIELD_EVERY = 64
+
+
+async def render_async(io: IOType, data: dict) -> Monad:
+    """Pass data through a jinja2 template without blocking the event loop, returning its outcome.
+
+    A template loaded with enable_async=True is generated chunk by chunk, handing control back to
+    the event loop every ASYNC_YIELD_EVERY chunks. Any other template is rendered in a thread.
+
     Args:
         io: An IOType whose outcome is a jinja template
         data: a dictionary of values to be merged with the template
@@ -66,10 +476,213 @@ def render(io: IOType, data: dict) -> Monad:  # pylint: disable=unused-argument
     if not isinstance(data, dict):
         return Monad(IOType("", f"data invalid type {str(type(data))}", False))
     template = io.outcome
-    return Monad(IOType(template.render(data), "", True))
+    if not template.environment.is_async:
+        return Monad(IOType(await asyncio.to_thread(template.render, data), "", True))
+    chunks = []
+    async for chunk in template.generate_async(data):
+        chunks.append(chunk)
+        if len(chunks) % ASYNC_YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+    return Monad(IOType("".join(chunks), "", True))
+
+
+def render_many(io: IOType, rows: Iterable[dict]) -> Monad:
+    """Pass every row of an iterable through the same jinja2 template, lazily.
+
+    Nothing is rendered until the outcome is iterated, and only one row is held at a time, so rows
+    may come from a generator. A bad row fails on its own without stopping the batch.
+
+    Args:
+        io: An IOType whose outcome is a jinja template
+        rows: an iterable of dictionaries to be merged with the template
+
+    Returns:
+        a monad wrapped around IOType:
+           outcome: a generator of one IOType per row, whose outcome is the rendered string, or
+              whose error_msg starts with the row's index if it failed.
+    """
+    if not isinstance(io.outcome, jinja2.Template):
+        return Monad(io)
+    return Monad(IOType(_render_rows(io.outcome, rows), "", True))
+
+
+def _render_rows(template: jinja2.Template, rows: Iterable[dict]) -> Iterator[IOType]:
+    """Yield one IOType per row rendered through the template."""
+    template_render = template.render
+    for index, data in enumerate(rows):
+        yield _render_row(template_render, index, data)
+
+
+def _render_row(template_render: Callable, index: int, data: dict) -> IOType:
+    """Render one row of a batch, reporting a bad row by its index.
+
+    Any error raised while rendering, such as a ZeroDivisionError in an expression, fails the row
+    rather than the batch.
+    """
+    if not isinstance(data, dict):
+        return IOType("", f"row {index}: data invalid type {str(type(data))}", False)
+    try:
+        return IOType(template_render(data), "", True)
+    except jinja2.TemplateError as e:
+        return IOType("", f"row {index}: {e.message}", False)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return IOType("", f"row {index}: {type(e).__name__}: {e}", False)
+
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+@side_effect
+def render_stream(
+    io: IOType, data: dict, file_pointer: IO[str], buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> Monad:
+    """Pass data through a jinja2 template, writing the output to a file as it is generated.
+
+    The output is never held in memory as a whole: chunks from the template are joined until they
+    reach buffer_size characters, then written. Peak memory therefore depends on buffer_size and
+    not on the size of the output.
+
+    Args:
+        io: An IOType whose outcome is a jinja template
+        data: a dictionary of values to be merged with the template
+        file_pointer: a file opened for writing in text mode, for example by file.fopen
+        buffer_size: the number of characters gathered before each write
+
+    Returns:
+        a monad wrapped around IOType:
+           outcome: the number of characters written
+           ok: False if the template failed to render or the write failed
+    """
+    if not isinstance(io.outcome, jinja2.Template):
+        return Monad(io)
+    if not isinstance(data, dict):
+        return Monad(IOType("", f"data invalid type {str(type(data))}", False))
+    try:
+        return Monad(f_try(_write_chunks, io.outcome.generate(data), file_pointer, buffer_size))
+    except jinja2.TemplateError as e:
+        return Monad(IOType("", e.message, False))
+
+
+def _write_chunks(chunks: Iterator[str], file_pointer: IO[str], buffer_size: int) -> int:
+    """Write chunks to a file in buffer_size batches, returning the number of characters."""
+    buffer: list[str] = []
+    buffered = written = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= buffer_size:
+            file_pointer.write("".join(buffer))
+            written += buffered
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        file_pointer.write("".join(buffer))
+    return written + buffered
+
+
+# Parallel rendering ----------------------------------------------------------------------------
+
+_WORKER_IO = IOType("", "worker not initialized", False)
+
+
+def _init_worker(file_path: str) -> None:
+    """Load the template once in each worker process."""
+    global _WORKER_IO  # pylint: disable=global-statement
+    _WORKER_IO = unwrap(load_template(IOType(""), file_path))
+
+
+def _render_chunk(start: int, rows: list[dict]) -> list[IOType]:
+    """Render a chunk of rows in a worker process.
+
+    Nothing may be raised across the process boundary: _render_row turns any error into a failed
+    IOType.
+    """
+    if not _WORKER_IO.ok:
+        return [IOType("", _WORKER_IO.error_msg, False) for _ in rows]
+    template_render = _WORKER_IO.outcome.render
+    return [_render_row(template_render, index, data) for index, data in enumerate(rows, start)]
+
+
+def _chunks(rows: Iterable[dict], chunk_size: int) -> Iterator[tuple[int, list[dict]]]:
+    """Split rows into (index of the first row, list of rows) chunks."""
+    iterator = iter(rows)
+    start = 0
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+def _chunk_results(future: futures.Future, start: int, size: int) -> Iterator[tuple[int, IOType]]:
+    """Yield (index, IOType) pairs for a finished chunk, or its failure for every row."""
+    try:
+        results = future.result()
+    except (futures.BrokenExecutor, pickle.PicklingError, TypeError, AttributeError) as e:
+        results = [IOType("", f"row {start + i}: {e}", False) for i in range(size)]
+    yield from enumerate(results, start)
+
+
+def _render_pool(
+    file_path: str, rows: Iterable[dict], workers: int | None, chunk_size: int, ordered: bool
+) -> Iterator[tuple[int, IOType]]:
+    """Render rows in a process pool, keeping at most two chunks per worker in flight."""
+    workers = workers or os.cpu_count() or 1
+    pool = futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(file_path,))
+    pending: collections.OrderedDict = collections.OrderedDict()
+    chunks = _chunks(rows, chunk_size)
+    try:
+        for start, chunk in itertools.islice(chunks, 2 * workers):
+            pending[pool.submit(_render_chunk, start, chunk)] = (start, len(chunk))
+        while pending:
+            if ordered:
+                future, chunk_range = pending.popitem(last=False)
+            else:
+                future = futures.wait(pending, return_when="FIRST_COMPLETED").done.pop()
+                chunk_range = pending.pop(future)
+            yield from _chunk_results(future, *chunk_range)
+            for start, chunk in itertools.islice(chunks, 1):
+                pending[pool.submit(_render_chunk, start, chunk)] = (start, len(chunk))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+@side_effect
+def render_parallel(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    io: IOType,  # pylint: disable=unused-argument
+    file_path: str,
+    rows: Iterable[dict],
+    workers: int | None = None,
+    chunk_size: int = 256,
+    ordered: bool = True,
+) -> Monad:
+    """Render many rows through one template file in a pool of worker processes.
+
+    Each worker loads the template once and renders the rows it is sent in chunks. Rows are read
+    from the iterable only as workers become free, so it may be a generator. Nothing happens until
+    the outcome is iterated, and the pool is shut down when the outcome is exhausted or closed.
+
+    Args:
+        io: an unwrapped monad with content, error_msg, ok
+        file_path: the direct path to a template
+        rows: an iterable of picklable dictionaries to be merged with the template
+        workers: the number of processes. The default, None or 0, is the number of CPUs.
+        chunk_size: the number of rows sent to a worker at a time, at least 1
+        ordered: if True, results come back in input order. If False, as each chunk completes.
+
+    Returns:
+        a monad wrapped around IOType:
+           outcome: a generator of (row index, IOType) pairs, the IOType being as in render_many.
+           A negative number of workers, or a chunk_size below 1, fails at once.
+    """
+    if workers is not None and workers < 0:
+        return Monad(IOType("", f"workers must not be negative, not {workers}", False))
+    if chunk_size < 1:
+        return Monad(IOType("", f"chunk_size must be at least 1, not {chunk_size}", False))
+    return Monad(IOType(_render_pool(file_path, rows, workers, chunk_size, ordered), "", True))
 
 
-def render_from_file(io: Monad, template_filepath: str, data: dict) -> str | None:
-    """Generate a message from a jinja2 template."""
-    result = unwrap(io.flat_map(load_template, template_filepath).flat_map(render, data))
+def render_from_file(
+    io: Monad, template_filepath: str, data: dict, cache: RenderCache | None = None
+) -> str | None:
+    """Generate a message from a jinja2 template, optionally through a RenderCache."""
+    result = unwrap(io.flat_map(load_template, template_filepath).flat_map(render, data, cache))
     return result.outcome if result.ok else None
@@ -0,0 +1,272 @@
+"""Latency histograms and outcome counts for @side_effect functions, in Prometheus text format.
+
+fpsupport/metrics.py Copyright 2025 George Cummings
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed under the License
+is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied. See the License for the specific language governing permissions and limitations under the
+License.
+
+----
+
+Metrics are off until a Metrics collector is enabled:
+
+```python
+metrics = Metrics()
+metrics.enable()
+...
+write_prometheus(IOType(), metrics, "/var/lib/node_exporter/fpsupport.prom")
+```
+
+For every @side_effect function, by its module and qualified name, the collector keeps:
+
+- fpsupport_side_effect_seconds: a histogram of the time spent in the function
+- fpsupport_side_effect_calls_total: calls by result: "ok", "failed" and "skipped" follow the ok
+  of the returned IOType, or of the incoming one when the call was skipped; "error" is a raised
+  exception
+- fpsupport_side_effect_errors_total: failures by category, taken from the error message
+
+Each thread records into its own shard without taking a lock. The shards are only merged on
+export.
+"""
+
+import bisect
+import math
+import os
+import threading
+from typing import Any, Callable
+
+from . import decorator
+from .file import f_try
+from .monad import Monad
+from .struct import IOType
+
+# Upper bounds of the latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+# Distinct error categories kept per function. Further categories are counted as "other".
+MAX_CATEGORIES = 32
+
+RESULTS = ("ok", "failed", "skipped", "error")
+
+
+def error_category(error_msg: str | None) -> str:
+    """Reduce an error message to a category.
+
+    f_try and the renderers put a file name or a row number before the last ": ", which would
+    make every message its own category. Only the text after it is kept.
+    """
+    if not error_msg:
+        return "unknown"
+    return error_msg.rsplit(": ", 1)[-1][:64]
+
+
+class _Series:  # pylint: disable=too-few-public-methods
+    """The counts of one function in one thread."""
+
+    __slots__ = ("buckets", "sum_ns", "results", "errors")
+
+    def __init__(self, size: int) -> None:
+        self.buckets = [0] * size
+        self.sum_ns = 0
+        self.results = dict.fromkeys(RESULTS, 0)
+        self.errors: dict[str, int] = {}
+
+
+class Metrics:
+    """A collector of @side_effect latencies, outcomes and error categories.
+
+    Attributes:
+        buckets: the upper bounds of the latency histogram, in seconds
+        categorize: turns a failed IOType's error_msg into an error category
+    """
+
+    def __init__(
+        self,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        categorize: Callable[[str | None], str] = error_category,
+    ) -> None:
+        """Initialize an empty, disabled collector."""
+        self.buckets = tuple(sorted(buckets))
+        self._bounds_ns = [bound * 1e9 for bound in self.buckets]
+        self.categorize = categorize
+        self._local = threading.local()
+        self._shards: list[dict[str, _Series]] = []
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start collecting from every @side_effect function."""
+        decorator.set_metrics(self)
+
+    def disable(self) -> None:
+        """Stop collecting. What was collected is kept."""
+        decorator.set_metrics(None)
+
+    def __enter__(self) -> "Metrics":
+        """Collect for the duration of a with block."""
+        self.enable()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Stop collecting at the end of a with block."""
+        self.disable()
+
+    def _series(self, name: str) -> _Series:
+        """Return this thread's series for a function, creating the shard and series if needed."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        series = shard.get(name)
+        if series is None:
+            series = shard[name] = _Series(len(self.buckets) + 1)
+        return series
+
+    def skip(self, name: str) -> None:
+        """Count a call skipped because the incoming ok was False or None."""
+        self._series(name).results["skipped"] += 1
+
+    def record(self, name: str, elapsed_ns: int, result: Any, error: BaseException | None) -> None:
+        """Record the time and outcome of a call that ran."""
+        series = self._series(name)
+        series.buckets[bisect.bisect_left(self._bounds_ns, elapsed_ns)] += 1
+        series.sum_ns += elapsed_ns
+        if error is not None:
+            series.results["error"] += 1
+            self._count_error(series, type(error).__name__)
+            return
+        ok = getattr(getattr(result, "outer", None), "ok", None)
+        if ok is True:
+            series.results["ok"] += 1
+        elif ok is False:
+            series.results["failed"] += 1
+            self._count_error(series, self.categorize(result.outer.error_msg))
+        else:
+            series.results["skipped"] += 1
+
+    @staticmethod
+    def _count_error(series: _Series, category: str) -> None:
+        """Count an error, folding categories beyond MAX_CATEGORIES into "other"."""
+        errors = series.errors
+        if category not in errors and len(errors) >= MAX_CATEGORIES:
+            category = "other"
+        errors[category] = errors.get(category, 0) + 1
+
+    def snapshot(self) -> dict[str, dict]:
+        """Merge the shards of every thread.
+
+        Returns:
+            For each function name: "buckets", the non-cumulative count per bucket with the last
+            one unbounded; "sum_seconds"; "results", the count per result; and "errors", the count
+            per category.
+        """
+        merged: dict[str, dict] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for name, series in list(shard.items()):
+                total = merged.setdefault(
+                    name,
+                    {
+                        "buckets": [0] * (len(self.buckets) + 1),
+                        "sum_seconds": 0.0,
+                        "results": dict.fromkeys(RESULTS, 0),
+                        "errors": {},
+                    },
+                )
+                total["buckets"] = [a + b for a, b in zip(total["buckets"], series.buckets)]
+                total["sum_seconds"] += series.sum_ns / 1e9
+                for result, count in series.results.items():
+                    total["results"][result] += count
+                for category, count in list(series.errors.items()):
+                    total["errors"][category] = total["errors"].get(category, 0) + count
+        return merged
+
+    def prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        snapshot = sorted(self.snapshot().items())
+        lines = [
+            "# HELP fpsupport_side_effect_seconds Time spent in @side_effect functions.",
+            "# TYPE fpsupport_side_effect_seconds histogram",
+        ]
+        for name, total in snapshot:
+            label = f'function="{_escape(name)}"'
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), total["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                lines.append(
+                    f'fpsupport_side_effect_seconds_bucket{{{label},le="{le}"}} {cumulative}'
+                )
+            lines.append(f"fpsupport_side_effect_seconds_sum{{{label}}} {total['sum_seconds']!r}")
+            lines.append(f"fpsupport_side_effect_seconds_count{{{label}}} {cumulative}")
+        lines += [
+            "# HELP fpsupport_side_effect_calls_total Calls of @side_effect functions by result.",
+            "# TYPE fpsupport_side_effect_calls_total counter",
+        ]
+        for name, total in snapshot:
+            for result, count in total["results"].items():
+                lines.append(
+                    f'fpsupport_side_effect_calls_total{{function="{_escape(name)}",'
+                    f'result="{result}"}} {count}'
+                )
+        lines += [
+            "# HELP fpsupport_side_effect_errors_total Failures of @side_effect functions by"
+            " category.",
+            "# TYPE fpsupport_side_effect_errors_total counter",
+        ]
+        for name, total in snapshot:
+            for category, count in sorted(total["errors"].items()):
+                lines.append(
+                    f'fpsupport_side_effect_errors_total{{function="{_escape(name)}",'
+                    f'category="{_escape(category)}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def export(self, callback: Callable[[str], Any]) -> Any:
+        """Pass the Prometheus text to callback, a push to a gateway say, and return its result."""
+        return callback(self.prometheus())
+
+    def clear(self) -> None:
+        """Forget everything collected so far, in every thread."""
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomically(file_path: str, text: str) -> int:
+    """Replace a file with text, so that a scraper never reads half of it."""
+    temporary = f"{file_path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file_pointer:
+        written = file_pointer.write(text)
+    os.replace(temporary, file_path)
+    return written
+
+
+@decorator.side_effect
+def write_prometheus(
+    io: IOType, metrics: Metrics, file_path: str  # pylint: disable=unused-argument
+) -> Monad:
+    """Write the metrics in Prometheus text format, for example for a textfile collector.
+
+    Args:
+        io: an unwrapped monad with content, error_msg, ok
+        metrics: the collector to export
+        file_path: the file to replace
+
+    Returns:
+        Monad(IOType) where IOType.outcome is the number of characters written
+    """
+    return Monad(f_try(_write_atomically, file_path, metrics.prometheus()))
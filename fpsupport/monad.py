@@ -55,9 +55,24 @@ accepts objects (or named tuples) as its wrapped type.
 
 # pylint: disable=unused-variable
 
-from typing import Callable, Self, Any
+import contextvars
+import time
+from typing import Any, Callable, Iterable, Iterator, Self
 
 from . import exception
+from .struct import IOType
+
+STRICT = "strict"
+TRUSTED = "trusted"
+DEADLINE_EXCEEDED = "deadline exceeded"
+
+# The instrumentation hooks called around every bind. See add_hook().
+_hooks: tuple["Hook", ...] = ()
+
+# The deadline of the Deadline chain whose bound function is running, for remaining_budget().
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "fpsupport_deadline", default=None
+)
 
 
 class Monad:
@@ -69,8 +84,17 @@ class Monad:
     Attributes:
         There is one and only one attribute: the wrapped type, called "outer". It is the "a" in
         a -> M a.
+
+    The Monad is slotted, so it has no per-instance __dict__. A subclass that declares no
+    __slots__ of its own gets a __dict__ back, and may add attributes as before.
     """
 
+    __slots__ = ("outer",)
+
+    # In strict mode, flat_map checks the type returned by every bound function. See
+    # set_validation().
+    strict: bool = True
+
     def __init__(self, outer: Any = None) -> None:
         """Initializes the object with internal attributes.
 
@@ -87,6 +111,10 @@ class Monad:
         """
         self.outer: Any = outer
 
+    def __repr__(self) -> str:
+        """Return the Monad type and its wrapped value, as in Maybe(IOType(...))."""
+        return f"{type(self).__name__}({self.outer!r})"
+
     @staticmethod
     def unit(outer: Any = None) -> Self:  # type: ignore pylint: disable=undefined-variable
         """Wraps the arguments into this Monad. a -> M a.
@@ -153,14 +181,19 @@ class Monad:
         Returns:
             A Monad, or its sub-classed equivalent
 
+        If map() is not overridden, it is a clone, and it is skipped: the
+        wrapped value goes straight to _f_.
+
         Raises:
             MonadException if the function fails to return the same type as
             the original wrapped value. Making the check is necessary in a
-            duck-typed language.
+            duck-typed language. It is skipped in trusted mode.
         """
-        result = f(self.map().outer, *args, **kwargs)
-        if not isinstance(result, type(self)):
-            me = str(type(self)).split("'")[1]
+        cls = type(self)
+        outer = self.outer if cls.map is Monad.map else self.map().outer
+        result = _call_hooked(f, outer, args, kwargs) if _hooks else f(outer, *args, **kwargs)
+        if self.strict and not isinstance(result, cls):
+            me = str(cls).split("'")[1]
             raise exception.MonadException(
                 f'bound function "{f.__name__}" did not return type {me}'
             )
@@ -224,6 +257,8 @@ class Maybe(Monad):
     not testing.
     """
 
+    __slots__ = ()
+
     @staticmethod
     def unit(outer: Any = None):
         """The type converter, wrapping the arguments into this Monad. a -> M a."""
@@ -233,7 +268,322 @@ class Maybe(Monad):
 
     def flat_map(self, f: Callable, *args, **kwargs) -> Self:
         """Execute _f_ with the wrapped type as the first argument if ok is True."""
-        return self if self.outer.ok is False else super().flat_map(f, *args, **kwargs)
+        if self.outer.ok is False:
+            if _hooks:
+                _short_circuit(f, args, kwargs)
+            return self
+        return Monad.flat_map(self, f, *args, **kwargs)
+
+    chain = flat_map
+    flatMap = flat_map
+    fmap = flat_map
+    join = flat_map
+    join_map = flat_map
+    joinMap = flat_map
+    pure = unit
+    select = flat_map
+    then_apply = flat_map
+    __rshift__ = flat_map
+
+
+class Deadline(Maybe):
+    """The Maybe Monad with a latency budget.
+
+    A Deadline carries an absolute deadline on the time.monotonic() clock. Once it has passed,
+    flat_map no longer calls the bound function: it returns a Deadline around a failed IOType whose
+    error_msg is DEADLINE_EXCEEDED, keeping the last outcome. Until then it behaves as a Maybe.
+
+    Bound functions may return any Monad, for example the Monad of a @side_effect function: its
+    wrapped value is carried on in a Deadline with the same deadline. While a bound function runs,
+    remaining_budget() returns the seconds left, so that the function can pass it to its I/O as a
+    timeout.
+
+    Example:
+        Deadline.within(IOType(url), 0.25) >> fetch >> parse
+    """
+
+    __slots__ = ("deadline",)
+
+    def __init__(self, outer: Any = None, deadline: float | None = None) -> None:
+        """Initializes the Deadline.
+
+        Args:
+            outer: the wrapped type, which must have an attribute "ok"
+            deadline: the time.monotonic() value after which bound functions are skipped, or None
+                for no deadline
+        """
+        super().__init__(outer)
+        self.deadline: float | None = deadline
+
+    def __repr__(self) -> str:
+        """Return Deadline(outer, deadline)."""
+        return f"Deadline({self.outer!r}, {self.deadline!r})"
+
+    @staticmethod
+    def unit(outer: Any = None) -> "Deadline":
+        """Wraps the argument into a Deadline. a -> M a.
+
+        Inside a bound function of a Deadline chain, the new Deadline shares the chain's deadline.
+        """
+        if not hasattr(outer, "ok"):
+            raise exception.MonadException('The "Deadline" Monad needs a type with attribute "ok"')
+        return Deadline(outer, _deadline.get())
+
+    @staticmethod
+    def within(outer: Any, seconds: float) -> "Deadline":
+        """Wraps the argument into a Deadline that passes _seconds_ from now."""
+        return Deadline(outer, time.monotonic() + seconds)
+
+    @property
+    def remaining(self) -> float | None:
+        """The seconds left before the deadline, never negative, or None if there is none."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def flat_map(self, f: Callable, *args, **kwargs) -> Self:
+        """Execute _f_ with the wrapped type as the first argument if ok is True and time remains.
+
+        Raises:
+            MonadException if _f_ does not return a Monad. The check is made in trusted mode as
+            well, since the wrapped value must be taken out of the Monad to carry the deadline.
+        """
+        outer = self.outer
+        if outer.ok is False:
+            if _hooks:
+                _short_circuit(f, args, kwargs)
+            return self
+        deadline = self.deadline
+        if deadline is not None and time.monotonic() >= deadline:
+            if _hooks:
+                _short_circuit(f, args, kwargs)
+            expired = IOType(getattr(outer, "outcome", None), DEADLINE_EXCEEDED, False)
+            return Deadline(expired, deadline)
+        token = _deadline.set(deadline)
+        try:
+            if type(self).map is not Monad.map:
+                outer = self.map().outer
+            result = _call_hooked(f, outer, args, kwargs) if _hooks else f(outer, *args, **kwargs)
+        finally:
+            _deadline.reset(token)
+        if isinstance(result, Deadline):
+            if result.deadline is None or (deadline is not None and deadline < result.deadline):
+                return Deadline(result.outer, deadline)
+            return result
+        if not isinstance(result, Monad):
+            raise exception.MonadException(
+                f'bound function "{f.__name__}" did not return a fpsupport.monad.Monad'
+            )
+        return Deadline(result.outer, deadline)
+
+    chain = flat_map
+    flatMap = flat_map
+    fmap = flat_map
+    join = flat_map
+    join_map = flat_map
+    joinMap = flat_map
+    pure = unit
+    select = flat_map
+    then_apply = flat_map
+    __rshift__ = flat_map
+
+
+class Lazy(Monad):
+    """The deferred Monad: binding records the function, unwrapping runs the chain.
+
+    flat_map() returns at once with a new Lazy that remembers its parent and its bound function.
+    Nothing runs until the value is needed, by unwrap(), .outer or final(). The chain is then
+    evaluated in a loop rather than by recursion, so a chain of any length is safe, and each Lazy
+    in it keeps its value: forcing it again, or forcing a longer chain built on it, does not run
+    its functions again.
+
+    Bound functions must return a Lazy, for example Lazy.unit(x). In trusted mode any Monad is
+    accepted.
+    """
+
+    __slots__ = ("_parent", "_step", "_value", "_forced")
+
+    def __init__(self, outer: Any = None) -> None:  # pylint: disable=super-init-not-called
+        """Initializes the Lazy with an already known value."""
+        self._parent: Lazy | None = None
+        self._step: tuple[Callable, tuple, dict] | None = None
+        self._value: Any = outer
+        self._forced: bool = True
+
+    @staticmethod
+    def unit(outer: Any = None) -> "Lazy":
+        """Wraps a known value into a Lazy. a -> M a."""
+        return Lazy(outer)
+
+    @property
+    def outer(self) -> Any:  # type: ignore[override]
+        """The wrapped value, evaluating the chain the first time it is asked for."""
+        return self._value if self._forced else self._force()
+
+    @property
+    def forced(self) -> bool:
+        """True if the value has been evaluated."""
+        return self._forced
+
+    def __repr__(self) -> str:
+        """Return Lazy(value), or Lazy(<unevaluated>) without evaluating the chain."""
+        value = repr(self._value) if self._forced else "<unevaluated>"
+        return f"{type(self).__name__}({value})"
+
+    def flat_map(self, f: Callable, *args, **kwargs) -> Self:
+        """Record _f_ to run on the wrapped value once it is needed."""
+        # pylint: disable=protected-access
+        lazy = Lazy.__new__(Lazy)
+        lazy._parent = self
+        lazy._step = (f, args, kwargs)
+        lazy._value = None
+        lazy._forced = False
+        return lazy
+
+    def map(self) -> Self:
+        """Evaluate the chain and return its value in a new Lazy."""
+        return Lazy(self.outer)
+
+    def _force(self) -> Any:
+        """Evaluate the unevaluated part of the chain, keeping each intermediate value."""
+        # pylint: disable=protected-access
+        pending = []
+        node = self
+        while not node._forced:
+            pending.append(node)
+            node = node._parent  # type: ignore
+        value = node._value
+        for node in reversed(pending):
+            f, args, kwargs = node._step  # type: ignore
+            result = _call_hooked(f, value, args, kwargs) if _hooks else f(value, *args, **kwargs)
+            if isinstance(result, Lazy):
+                value = result._value if result._forced else result._force()
+            elif isinstance(result, Monad) and not self.strict:
+                value = result.outer
+            else:
+                raise exception.MonadException(
+                    f'bound function "{f.__name__}" did not return type fpsupport.monad.Lazy'
+                )
+            node._value, node._forced = value, True
+            node._parent = node._step = None
+        return value
+
+    chain = flat_map
+    flatMap = flat_map
+    fmap = flat_map
+    join = flat_map
+    join_map = flat_map
+    joinMap = flat_map
+    pure = unit
+    select = flat_map
+    then_apply = flat_map
+    __rshift__ = flat_map
+
+
+class Writer(Monad):
+    """The Monad that collects output beside its wrapped value.
+
+    A bound function adds output by returning Writer.tell(value, output). It may return any other
+    Monad, such as that of a @side_effect function, to add none. The output of every step is
+    appended in order: to the Writer's output, or to its sink when it was made with Writer.to().
+
+    A sink, such as a fpsupport.file.WriteBuffer, holds the output and writes it out in batches. It
+    has three methods: write(output) and close(), which return an IOType, and discard(). If a write
+    fails, the chain fails with its error. final() closes the sink, or discards it when the chain
+    has failed, so that a partial output is never committed.
+
+    As in a Maybe, a wrapped value whose "ok" is False skips every later bound function.
+
+    Example:
+        (Writer.to(IOType(rows), WriteBuffer("report.csv")) >> header >> body >> footer).final()
+    """
+
+    __slots__ = ("output", "sink")
+
+    def __init__(self, outer: Any = None, output: Any = "", sink: Any = None) -> None:
+        """Initializes the Writer.
+
+        Args:
+            outer: the wrapped type
+            output: the output collected so far, a str or bytes
+            sink: the sink that receives the output, or None to keep it in the Writer
+        """
+        super().__init__(outer)
+        self.output: Any = output
+        self.sink: Any = sink
+
+    def __repr__(self) -> str:
+        """Return Writer(outer, output, sink)."""
+        return f"Writer({self.outer!r}, {self.output!r}, {self.sink!r})"
+
+    @staticmethod
+    def unit(outer: Any = None) -> "Writer":
+        """Wraps the argument into a Writer with no output. a -> M a."""
+        return Writer(outer)
+
+    @staticmethod
+    def tell(outer: Any, output: Any) -> "Writer":
+        """Wraps the argument into a Writer that adds output."""
+        return Writer(outer, output)
+
+    @staticmethod
+    def to(outer: Any, sink: Any) -> "Writer":
+        """Wraps the argument into a Writer whose output goes to sink."""
+        return Writer(outer, "", sink)
+
+    def flat_map(self, f: Callable, *args, **kwargs) -> Self:
+        """Execute _f_ with the wrapped type as the first argument, and append its output.
+
+        Raises:
+            MonadException if _f_ does not return a Monad. The check is made in trusted mode as
+            well, since the wrapped value must be taken out of the Monad to carry the output.
+        """
+        outer = self.outer
+        if getattr(outer, "ok", None) is False:
+            if _hooks:
+                _short_circuit(f, args, kwargs)
+            return self
+        if type(self).map is not Monad.map:
+            outer = self.map().outer
+        result = _call_hooked(f, outer, args, kwargs) if _hooks else f(outer, *args, **kwargs)
+        if isinstance(result, Writer):
+            output = result.output
+        elif not isinstance(result, Monad):
+            raise exception.MonadException(
+                f'bound function "{f.__name__}" did not return a fpsupport.monad.Monad'
+            )
+        else:
+            output = None
+        sink = self.sink
+        if not output:
+            return Writer(result.outer, self.output, sink)
+        if sink is None:
+            return Writer(result.outer, self.output + output if self.output else output)
+        written = sink.write(output)
+        if not written.ok:
+            failed = IOType(getattr(result.outer, "outcome", None), written.error_msg, False)
+            return Writer(failed, "", sink)
+        return Writer(result.outer, "", sink)
+
+    def final(self) -> Self:
+        """Close the sink, writing out what it holds, or discard it if the chain has failed.
+
+        Returns:
+            A Writer around the wrapped value, failed with the error of the sink if closing it
+            failed.
+        """
+        outer = self.outer if type(self).map is Monad.map else self.map().outer
+        sink = self.sink
+        if sink is None:
+            return Writer(outer, self.output)
+        if getattr(outer, "ok", None) is False:
+            sink.discard()
+            return Writer(outer, "", sink)
+        closed = sink.close()
+        if not closed.ok:
+            failed = IOType(getattr(outer, "outcome", None), closed.error_msg, False)
+            return Writer(failed, "", sink)
+        return Writer(outer, "", sink)
 
     chain = flat_map
     flatMap = flat_map
@@ -247,9 +597,316 @@ class Maybe(Monad):
     __rshift__ = flat_map
 
 
+class Pipeline:
+    """A reusable chain of bound functions, recorded once and run against many Monads.
+
+    m.flat_map(f).flat_map(g, x) dispatches through flat_map, and for Maybe through a check on
+    "ok", once per step and once per input. A Pipeline records the steps once,
+
+        pipeline = Pipeline().then(f).then(g, x)    # or Pipeline() >> f >> (g, x)
+
+    and runs them in one loop with pipeline.run(m), or pipeline.run_many(ms). The result is the
+    same as the chain's: a Maybe whose "ok" is False stops the run and is returned as it is.
+
+    A Pipeline is immutable: then() returns a new Pipeline.
+    """
+
+    __slots__ = ("steps",)
+
+    def __init__(self, steps: Iterable[tuple[Callable, tuple, dict]] = ()) -> None:
+        """Initialize the Pipeline.
+
+        Args:
+            steps: (function, args, kwargs) triples, run in order
+        """
+        self.steps: tuple[tuple[Callable, tuple, dict], ...] = tuple(steps)
+
+    def then(self, f: Callable, *args, **kwargs) -> "Pipeline":
+        """Return a new Pipeline with f bound after the existing steps."""
+        return Pipeline(self.steps + ((f, args, kwargs),))
+
+    def __rshift__(self, step: Callable | tuple) -> "Pipeline":
+        """Add a step: pipeline >> f, or pipeline >> (f, arg, ...)."""
+        if isinstance(step, tuple):
+            return self.then(*step)
+        return self.then(step)
+
+    def run(self, m: Monad) -> Monad:
+        """Bind every step to m in order, returning the last Monad.
+
+        Raises:
+            MonadException as flat_map does, if a step returns the wrong type in strict mode.
+        """
+        cls = type(m)
+        if (
+            _hooks
+            or cls.map is not Monad.map
+            or cls.flat_map not in (Monad.flat_map, Maybe.flat_map)
+        ):
+            # The Monad has its own binding rules, or binds are instrumented: bind step by step.
+            return _bind_each(m, self.steps)
+        maybe = cls.flat_map is Maybe.flat_map
+        strict = m.strict
+        steps = iter(self.steps)
+        for f, args, kwargs in steps:
+            if maybe and m.outer.ok is False:
+                return m
+            result = f(m.outer, *args, **kwargs)
+            if strict and not isinstance(result, cls):
+                me = str(cls).split("'")[1]
+                raise exception.MonadException(
+                    f'bound function "{f.__name__}" did not return type {me}'
+                )
+            m = result
+            if type(m) is not cls:  # pylint: disable=unidiomatic-typecheck
+                # The step changed the type of Monad: bind the rest by the new type's rules.
+                return _bind_each(m, steps)
+        return m
+
+    def run_many(self, monads: Iterable[Monad]) -> Iterator[Monad]:
+        """Run the Pipeline against each Monad in turn, lazily."""
+        run = self.run
+        for m in monads:
+            yield run(m)
+
+    __call__ = run
+
+
+def _bind_each(m: Monad, steps: Iterable[tuple[Callable, tuple, dict]]) -> Monad:
+    """Bind the steps to m one at a time through flat_map."""
+    for f, args, kwargs in steps:
+        m = m.flat_map(f, *args, **kwargs)
+    return m
+
+
+# Resources -----------------------------------------------------------------
+
+
+def bracket(
+    m: Monad, acquire: Callable, use: Callable[[Monad], Monad], release: Callable, *args, **kwargs
+) -> Monad:
+    """Acquire a resource, use it in a sub-chain and release it, whatever the sub-chain does.
+
+    acquire is bound to m with the remaining arguments. If it fails, nothing was acquired and its
+    Monad is returned. Otherwise use receives the acquired Monad and returns the Monad of its
+    sub-chain, and release is then called with the acquired value, even if a step of the
+    sub-chain cleared "ok" or raised. release is called directly rather than bound, so that
+    nothing, not even a passed Deadline, can skip it.
+
+    Example:
+
+        bracket(Monad(IOType()), fopen, lambda m: m >> fread, fclose, "notes.txt", "r")
+
+    Args:
+        m: the Monad to bind acquire to
+        acquire: a bound function whose Monad holds the resource, such as fopen
+        use: a function of the acquired Monad, such as a lambda or a Pipeline
+        release: a function of the acquired value returning a Monad, such as fclose
+        *args: additional positional arguments for acquire
+        **kwargs: additional keyword arguments for acquire
+
+    Returns:
+        The Monad returned by use, unless it succeeded and release failed: then the failure of
+        release, wrapped in the type of the Monad returned by use.
+    """
+    acquired = m.flat_map(acquire, *args, **kwargs)
+    outer = acquired.outer
+    if outer.ok is False:
+        return acquired
+    try:
+        used = use(acquired)
+    finally:
+        released = _call_hooked(release, outer, (), {}) if _hooks else release(outer)
+    if used.outer.ok is not False and released.outer.ok is False:
+        return type(used).unit(released.outer)
+    return used
+
+
+# Instrumentation -----------------------------------------------------------
+
+
+class Hook:
+    """Instrumentation called around every bind while it is registered with add_hook().
+
+    Subclass it and override what is needed. Every method receives the bound function, and the
+    arguments it is, or would have been, called with: args starts with the unwrapped value.
+    """
+
+    def pre(self, f: Callable, args: tuple, kwargs: dict) -> None:
+        """Called just before the bound function."""
+
+    def post(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, f: Callable, args: tuple, kwargs: dict, elapsed_ns: int, result: Any
+    ) -> None:
+        """Called just after the bound function, with its run time and result.
+
+        If the function raised, result is None and the exception continues after the hooks.
+        """
+
+    def short_circuit(self, f: Callable, args: tuple, kwargs: dict) -> None:
+        """Called when a Maybe, or a Deadline, skips the bound function.
+
+        args holds only the extra arguments: the skipped function has no unwrapped value.
+        """
+
+
+def add_hook(hook: Hook) -> None:
+    """Start calling hook around every bind.
+
+    With no hooks registered, the only cost to a bind is a check on an empty tuple.
+    """
+    global _hooks  # pylint: disable=global-statement
+    _hooks = (*_hooks, hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Stop calling hook. A hook that is not registered is ignored."""
+    global _hooks  # pylint: disable=global-statement
+    _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def _call_hooked(f: Callable, outer: Any, args: tuple, kwargs: dict) -> Any:
+    """Call a bound function between the registered hooks."""
+    hooks = _hooks
+    args = (outer, *args)
+    for hook in hooks:
+        hook.pre(f, args, kwargs)
+    result = None
+    start = time.perf_counter_ns()
+    try:
+        result = f(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter_ns() - start
+        for hook in reversed(hooks):
+            hook.post(f, args, kwargs, elapsed, result)
+    return result
+
+
+def _short_circuit(f: Callable, args: tuple, kwargs: dict) -> None:
+    """Tell the registered hooks that a bind was skipped."""
+    for hook in _hooks:
+        hook.short_circuit(f, args, kwargs)
+
+
+# Trampolining --------------------------------------------------------------
+
+
+class Done:
+    """The last step of a trampolined computation, holding its result."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        """Initializes the step with the result, usually a Monad."""
+        self.value: Any = value
+
+    def then(self, f: Callable, *args, **kwargs) -> "Suspend":
+        """Continue with _f_ called on the result. f must return a Done or a Suspend."""
+        return Suspend(f, self.value, *args, **kwargs)
+
+    def __repr__(self) -> str:
+        """Return Done(value)."""
+        return f"Done({self.value!r})"
+
+
+class Suspend:
+    """A call that a trampolined function would otherwise make, and the work left after it.
+
+    A recursive function returns Suspend(itself, *args) instead of calling itself, so that the
+    call is made by trampoline() rather than on the stack. A call that is not the last thing the
+    function does is followed by then(): Suspend(walk, rest).then(add, head) calls add(result,
+    head) once walk(rest) is done.
+    """
+
+    __slots__ = ("f", "args", "kwargs", "continuations")
+
+    def __init__(self, f: Callable, *args, **kwargs) -> None:
+        """Initializes the step with the function to call and its arguments."""
+        self.f: Callable = f
+        self.args: tuple = args
+        self.kwargs: dict = kwargs
+        self.continuations: tuple = ()
+
+    def then(self, f: Callable, *args, **kwargs) -> "Suspend":
+        """Continue with _f_ called on the result. f must return a Done or a Suspend."""
+        step = Suspend(self.f, *self.args, **self.kwargs)
+        step.continuations = (*self.continuations, (f, args, kwargs))
+        return step
+
+    def __repr__(self) -> str:
+        """Return Suspend(function name, ...)."""
+        return f"Suspend({getattr(self.f, '__name__', self.f)!r}, ...)"
+
+
+def trampoline(step: Done | Suspend) -> Any:
+    """Run a trampolined computation in constant stack space and return its result.
+
+    Each Suspend is called in a loop, and the continuations added with then() are kept on a list
+    rather than on the stack, so recursion of any depth neither reaches the recursion limit nor
+    pays for a Python frame per level that is kept alive.
+
+    Args:
+        step: a Done or a Suspend, usually Suspend(f, *args) for a recursive function f
+
+    Returns:
+        The value of the last Done.
+
+    Raises:
+        MonadException if a step returns anything other than a Done or a Suspend.
+    """
+    pending: list[tuple[Callable, tuple, dict]] = []
+    while True:
+        if isinstance(step, Suspend):
+            if step.continuations:
+                pending.extend(reversed(step.continuations))
+            step = step.f(*step.args, **step.kwargs)
+        elif isinstance(step, Done):
+            if not pending:
+                return step.value
+            f, args, kwargs = pending.pop()
+            step = f(step.value, *args, **kwargs)
+        else:
+            raise exception.MonadException(
+                f"trampolined step {step!r} is not a fpsupport.monad.Done or Suspend"
+            )
+
+
 # Convenience functions -----------------------------------------------------
 
 
+def set_validation(mode: str) -> None:
+    """Choose whether flat_map checks the type returned by bound functions.
+
+    In STRICT mode, the default, a bound function returning the wrong type raises a
+    MonadException. In TRUSTED mode the check is skipped, which saves an isinstance()
+    call per bind. Keep tests in STRICT mode so that a wrong return type is caught there.
+
+    Args:
+        mode: STRICT or TRUSTED
+
+    Raises:
+        ValueError on any other mode
+    """
+    if mode not in (STRICT, TRUSTED):
+        raise ValueError(f'validation mode must be "{STRICT}" or "{TRUSTED}", not "{mode}"')
+    Monad.strict = mode == STRICT
+
+
+def remaining_budget() -> float | None:
+    """Return the seconds left to the bound function of a Deadline chain that is running.
+
+    A @side_effect function bound in a Deadline chain can pass the budget to its I/O as a timeout.
+    Outside such a chain, or in a chain with no deadline, there is no budget.
+
+    Returns:
+        The seconds left, never negative, or None if there is no deadline.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
 def unwrap(m: Monad) -> Any:
     """Return the internally wrapped value of a Monad or subclass.
 
@@ -0,0 +1,256 @@
+"""Profiling of bound functions, collected through the instrumentation hooks of fpsupport.monad.
+
+fpsupport/profiling.py Copyright 2025 George Cummings
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed under the License
+is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied. See the License for the specific language governing permissions and limitations under the
+License.
+
+----
+
+A Profiler times every bound function while it is active:
+
+```python
+with Profiler() as profiler:
+    handle(request)
+
+print(profiler.report())
+write_folded(IOType(), profiler, "binds.folded")
+```
+
+The report lists, for each bound function, its calls, its total and percentile times and the number
+of times a Maybe skipped it. The folded stacks, one "outer;inner nanoseconds" line per chain of
+nested binds, are the input of flame graph tools such as flamegraph.pl and speedscope. A bound
+function that itself binds other functions appears as their parent.
+"""
+
+import random
+import threading
+from typing import Any, Callable, NamedTuple
+
+from .decorator import side_effect
+from .file import f_try
+from .monad import Hook, Monad, add_hook, remove_hook
+from .struct import IOType
+
+
+class FunctionStats(NamedTuple):
+    """The timings of one bound function, in nanoseconds.
+
+    The percentiles are taken from a uniform sample of at most Profiler.max_samples calls.
+    """
+
+    name: str
+    calls: int
+    short_circuits: int
+    total_ns: int
+    p50_ns: int
+    p90_ns: int
+    p99_ns: int
+    max_ns: int
+
+
+def _name(f: Callable) -> str:
+    """Return module.qualified_name for a function, or its repr, fit for a folded stack."""
+    name = getattr(f, "__qualname__", None) or repr(f)
+    module = getattr(f, "__module__", None)
+    name = f"{module}.{name}" if module else name
+    return name.replace(" ", "_").replace(";", ":")
+
+
+def _percentile(ordered: list[int], fraction: float) -> int:
+    """Return the nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _Record:  # pylint: disable=too-few-public-methods
+    """The counters of one bound function."""
+
+    __slots__ = ("calls", "short_circuits", "total_ns", "max_ns", "samples")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.short_circuits = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.samples: list[int] = []
+
+
+class Profiler(Hook):
+    """Collects the calls, timings and short circuits of every bound function while active.
+
+    Attributes:
+        max_samples: the number of timings kept per function for the percentiles
+    """
+
+    # pylint: disable=unused-argument
+
+    def __init__(self, max_samples: int = 10_000) -> None:
+        """Initialize an empty, inactive Profiler."""
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._records: dict[str, _Record] = {}
+        self._folded: dict[str, int] = {}
+
+    def start(self) -> None:
+        """Start profiling every bind."""
+        add_hook(self)
+
+    def stop(self) -> None:
+        """Stop profiling. The collected timings are kept."""
+        remove_hook(self)
+
+    def __enter__(self) -> "Profiler":
+        """Start profiling for the duration of a with block."""
+        self.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Stop profiling at the end of a with block."""
+        self.stop()
+
+    def _stack(self) -> list[list]:
+        """Return this thread's stack of [name, nanoseconds spent in children] frames."""
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def pre(self, f: Callable, args: tuple, kwargs: dict) -> None:
+        """Open a frame for the bound function."""
+        self._stack().append([_name(f), 0])
+
+    def post(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, f: Callable, args: tuple, kwargs: dict, elapsed_ns: int, result: Any
+    ) -> None:
+        """Close the frame of the bound function and record its time."""
+        stack = self._stack()
+        if not stack:  # no matching pre
+            return
+        path = ";".join(frame[0] for frame in stack)
+        name, children_ns = stack.pop()
+        if stack:
+            stack[-1][1] += elapsed_ns
+        with self._lock:
+            record = self._record(name)
+            record.calls += 1
+            record.total_ns += elapsed_ns
+            record.max_ns = max(record.max_ns, elapsed_ns)
+            self._folded[path] = self._folded.get(path, 0) + max(0, elapsed_ns - children_ns)
+            samples = record.samples
+            if len(samples) < self.max_samples:
+                samples.append(elapsed_ns)
+            else:
+                index = random.randrange(record.calls)
+                if index < self.max_samples:
+                    samples[index] = elapsed_ns
+
+    def short_circuit(self, f: Callable, args: tuple, kwargs: dict) -> None:
+        """Count a skipped bind."""
+        name = _name(f)
+        with self._lock:
+            self._record(name).short_circuits += 1
+
+    def _record(self, name: str) -> _Record:
+        """Return the record of a function, creating it if needed. The caller holds the lock."""
+        record = self._records.get(name)
+        if record is None:
+            record = self._records[name] = _Record()
+        return record
+
+    def stats(self) -> list[FunctionStats]:
+        """Return the statistics of every function seen, the most total time first."""
+        with self._lock:
+            stats = []
+            for name, record in self._records.items():
+                ordered = sorted(record.samples)
+                stats.append(
+                    FunctionStats(
+                        name,
+                        record.calls,
+                        record.short_circuits,
+                        record.total_ns,
+                        _percentile(ordered, 0.5),
+                        _percentile(ordered, 0.9),
+                        _percentile(ordered, 0.99),
+                        record.max_ns,
+                    )
+                )
+        return sorted(stats, key=lambda s: (-s.total_ns, s.name))
+
+    def report(self) -> str:
+        """Return the statistics as an aligned text table, times in microseconds."""
+        stats = self.stats()
+        width = max([len("function")] + [len(s.name) for s in stats])
+        lines = [
+            f"{'function':<{width}} {'calls':>9} {'skipped':>9} {'total us':>12} "
+            f"{'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'max us':>10}"
+        ]
+        for s in stats:
+            lines.append(
+                f"{s.name:<{width}} {s.calls:>9} {s.short_circuits:>9} {s.total_ns / 1000:>12.1f} "
+                f"{s.p50_ns / 1000:>10.1f} {s.p90_ns / 1000:>10.1f} {s.p99_ns / 1000:>10.1f} "
+                f"{s.max_ns / 1000:>10.1f}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def folded(self) -> str:
+        """Return the self time of every chain of nested binds in the folded stack format."""
+        with self._lock:
+            return "".join(f"{path} {ns}\n" for path, ns in sorted(self._folded.items()))
+
+    def clear(self) -> None:
+        """Forget everything collected so far."""
+        with self._lock:
+            self._records.clear()
+            self._folded.clear()
+
+
+def _write_text(file_path: str, text: str) -> int:
+    """Write text to a file, returning the number of characters written."""
+    with open(file_path, "w", encoding="utf-8") as file_pointer:
+        return file_pointer.write(text)
+
+
+@side_effect
+def write_report(
+    io: IOType, profiler: Profiler, file_path: str  # pylint: disable=unused-argument
+) -> Monad:
+    """Write the profiler's report to a file.
+
+    Args:
+        io: an unwrapped monad with content, error_msg, ok
+        profiler: the Profiler to report on
+        file_path: the file to write
+
+    Returns:
+        Monad(IOType) where IOType.outcome is the number of characters written
+    """
+    return Monad(f_try(_write_text, file_path, profiler.report()))
+
+
+@side_effect
+def write_folded(
+    io: IOType, profiler: Profiler, file_path: str  # pylint: disable=unused-argument
+) -> Monad:
+    """Write the profiler's folded stacks, for flame graph tools, to a file.
+
+    Args:
+        io: an unwrapped monad with content, error_msg, ok
+        profiler: the Profiler to report on
+        file_path: the file to write
+
+    Returns:
+        Monad(IOType) where IOType.outcome is the number of characters written
+    """
+    return Monad(f_try(_write_text, file_path, profiler.folded()))
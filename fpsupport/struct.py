@@ -24,8 +24,16 @@ class IOType:
     IOType.outcome is the testable, provable results of an IO call, failure or success.
     IOType.error_msg is meta-information about why a call failed.
     IOType.ok is the meta-information on whether the call passed, failed, or was skipped in a test.
+
+    IOType is slotted: it has no per-instance __dict__, as pipelines create millions of them.
     """
 
+    __slots__ = ("outcome", "error_msg", "ok")
+
+    outcome: Any
+    error_msg: str | None
+    ok: bool | None
+
     def __init__(self, outcome: Any = None, error_msg: str | None = None, ok: bool | None = True):
         """Initialize IOType, ensuring values are of type."""
         self.outcome: Any = outcome
@@ -0,0 +1,46 @@
+"""Benchmarks of fpsupport.decorator.
+
+Side effect overhead: a call through @side_effect against the same function undecorated, with
+ok True, with the call skipped, and with a Metrics collector enabled.
+"""
+
+from harness import measure, report
+
+from fpsupport.decorator import side_effect
+from fpsupport.metrics import Metrics
+from fpsupport.monad import Monad
+from fpsupport.struct import IOType
+
+COUNT = 100_000
+
+
+def _plain(io: IOType) -> Monad:
+    return Monad(io)
+
+
+_decorated = side_effect(_plain)
+
+
+def run_side_effect() -> list[dict]:
+    """Time the wrapper of @side_effect on its three paths."""
+    ok = IOType("", "", True)
+    skipped = IOType("", "", None)
+    results = [
+        measure("undecorated call", lambda: _plain(ok), COUNT),
+        measure("@side_effect call, ok", lambda: _decorated(ok), COUNT),
+        measure("@side_effect call, skipped", lambda: _decorated(skipped), COUNT),
+    ]
+    with Metrics():
+        results.append(
+            measure("@side_effect call, ok, with Metrics", lambda: _decorated(ok), COUNT)
+        )
+    return results
+
+
+def run() -> list[dict]:
+    """Run the decorator benchmarks."""
+    return run_side_effect()
+
+
+if __name__ == "__main__":
+    report(run())
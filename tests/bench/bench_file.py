@@ -0,0 +1,242 @@
+"""Benchmarks of fpsupport.file.
+
+Reading: fopen and fread of a small and a large file, against the plain open() and read() they
+wrap.
+
+Streaming: the time and peak memory of reading a large file whole with fread, and a chunk at a
+time with fread_chunks.
+
+Memory map: scanning a large binary file for a byte through fmmap, against fread of its bytes.
+
+Records: reading a file of fixed-size records with fread(size), which allocates a bytes object per
+record, against freadinto a reused buffer and into pooled buffers.
+
+Writing: many short lines written with fwrite, through Python's file buffer and without one,
+against a Writer chain whose WriteBuffer writes them in batches, itself or from a background
+thread.
+"""
+
+import os
+import tempfile
+import tracemalloc
+from typing import Callable
+
+from harness import measure, report, summarize
+
+from fpsupport.file import (
+    BufferPool,
+    WriteBuffer,
+    fmmap,
+    fopen,
+    fread,
+    fread_chunks,
+    freadinto,
+    funmap,
+    fwrite,
+)
+from fpsupport.monad import Monad, Writer, unwrap
+from fpsupport.struct import IOType
+
+SIZES = {"small (1 KiB)": 1024, "large (16 MiB)": 16 * 1024 * 1024}
+
+
+def _read_plain(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as file_pointer:
+        return file_pointer.read()
+
+
+def _read_monad(path: str) -> Monad:
+    opened = fopen(IOType(), path, "r", encoding="utf-8")
+    result = opened.flat_map(fread)
+    unwrap(opened).outcome.close()
+    return result
+
+
+def run_read() -> list[dict]:
+    """Time reading whole files through the monad and directly."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, size in SIZES.items():
+            path = os.path.join(directory, f"{size}.txt")
+            with open(path, "w", encoding="utf-8") as file_pointer:
+                file_pointer.write("x" * size)
+            number = max(1, 2000 * 1024 // size)
+            results += [
+                measure(f"open and read, {name}", lambda p=path: _read_plain(p), number),
+                measure(f"fopen and fread, {name}", lambda p=path: _read_monad(p), number),
+            ]
+    return results
+
+
+def _stream(path: str) -> int:
+    with open(path, "r", encoding="utf-8") as file_pointer:
+        chunks = unwrap(fread_chunks(IOType(file_pointer))).outcome
+        return sum(len(chunk.outcome) for chunk in chunks)
+
+
+def _whole(path: str) -> int:
+    with open(path, "r", encoding="utf-8") as file_pointer:
+        return len(unwrap(fread(IOType(file_pointer))).outcome)
+
+
+def _peak(function: Callable[[], object]) -> float:
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run_stream() -> list[dict]:
+    """Compare reading a large file whole and in chunks."""
+    size = SIZES["large (16 MiB)"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.txt")
+        with open(path, "w", encoding="utf-8") as file_pointer:
+            file_pointer.write("x" * size)
+        return [
+            measure("fread, large (16 MiB)", lambda: _whole(path), 5),
+            measure("fread_chunks, large (16 MiB)", lambda: _stream(path), 5),
+            summarize("peak memory, fread", [_peak(lambda: _whole(path))], unit="bytes"),
+            summarize("peak memory, fread_chunks", [_peak(lambda: _stream(path))], unit="bytes"),
+        ]
+
+
+def _scan_read(path: str) -> int:
+    with open(path, "rb") as file_pointer:
+        return unwrap(fread(IOType(file_pointer))).outcome.find(b"y")
+
+
+def _scan_mmap(path: str) -> int:
+    with open(path, "rb") as file_pointer:
+        view = unwrap(fmmap(IOType(file_pointer))).outcome
+        found = view.obj.find(b"y")
+        funmap(IOType(view))
+        return found
+
+
+def run_mmap() -> list[dict]:
+    """Compare finding the last byte of a large file through fread and through fmmap."""
+    size = SIZES["large (16 MiB)"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.bin")
+        with open(path, "wb") as file_pointer:
+            file_pointer.write(b"x" * (size - 1) + b"y")
+        return [
+            measure("find in fread bytes, large (16 MiB)", lambda: _scan_read(path), 5),
+            measure("find in fmmap view, large (16 MiB)", lambda: _scan_mmap(path), 5),
+            summarize("peak memory, fread bytes", [_peak(lambda: _scan_read(path))], unit="bytes"),
+            summarize("peak memory, fmmap view", [_peak(lambda: _scan_mmap(path))], unit="bytes"),
+        ]
+
+
+RECORD_SETS = {"512 B": (512, 20_000), "1 MiB": (1024 * 1024, 64)}
+
+
+def _records_fread(path: str, size: int) -> int:
+    total = 0
+    with open(path, "rb") as file_pointer:
+        io = IOType(file_pointer)
+        while record := unwrap(fread(io, size)).outcome:
+            total += record[0]
+    return total
+
+
+def _records_into(path: str, size: int, buffer: bytearray) -> int:
+    total = 0
+    with open(path, "rb") as file_pointer:
+        io = IOType(file_pointer)
+        while record := unwrap(freadinto(io, size, buffer)).outcome:
+            total += record[0]
+    return total
+
+
+def _records_pooled(path: str, size: int, pool: BufferPool) -> int:
+    total = 0
+    with open(path, "rb") as file_pointer:
+        io = IOType(file_pointer)
+        while True:
+            record = unwrap(freadinto(io, size, pool=pool)).outcome
+            if not record:
+                pool.release(record)
+                return total
+            total += record[0]
+            pool.release(record)
+
+
+def run_records() -> list[dict]:
+    """Compare reading fixed-size records with fread and with freadinto.
+
+    Small bytes objects are cheap to allocate, so fread keeps up with freadinto on small records.
+    The reuse pays on large records, where every fresh buffer costs the allocator and page faults.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for label, (size, count) in RECORD_SETS.items():
+            path = os.path.join(directory, f"records_{size}.bin")
+            with open(path, "wb") as file_pointer:
+                file_pointer.write(bytes(size) * count)
+            buffer = bytearray(size)
+            pool = BufferPool(size_classes=(size,))
+            name = f"{count} records of {label}"
+            results += [
+                measure(f"fread, {name}", lambda p=path, n=size: _records_fread(p, n), 5),
+                measure(
+                    f"freadinto a buffer, {name}",
+                    lambda p=path, n=size, b=buffer: _records_into(p, n, b),
+                    5,
+                ),
+                measure(
+                    f"freadinto the pool, {name}",
+                    lambda p=path, n=size, q=pool: _records_pooled(p, n, q),
+                    5,
+                ),
+                summarize(f"buffers per pass, fread, {name}", [count + 1], unit="objs"),
+                summarize(f"buffers in all passes, pool, {name}", [pool.allocated], unit="objs"),
+            ]
+    return results
+
+
+LINES = [f"{i:08d},Everything is awesome\n".encode() for i in range(20_000)]
+
+
+def _write_fwrite(path: str, buffering: int) -> None:
+    with open(path, "wb", buffering=buffering) as file_pointer:
+        io = IOType(file_pointer)
+        for line in LINES:
+            fwrite(io, line)
+
+
+def _emit(io: IOType, line: bytes) -> Writer:
+    return Writer.tell(io, line)
+
+
+def _write_writer(path: str, background: bool) -> None:
+    m = Writer.to(IOType(), WriteBuffer(path, "wb", background=background))
+    for line in LINES:
+        m = m.flat_map(_emit, line)
+    assert unwrap(m.final()).ok
+
+
+def run_write() -> list[dict]:
+    """Compare writing many short lines with fwrite and with a Writer and WriteBuffer."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "lines.csv")
+        name = f"{len(LINES)} lines"
+        return [
+            measure(f"fwrite, buffered file, {name}", lambda: _write_fwrite(path, -1), 5),
+            measure(f"fwrite, unbuffered file, {name}", lambda: _write_fwrite(path, 0), 5),
+            measure(f"Writer, WriteBuffer, {name}", lambda: _write_writer(path, False), 5),
+            measure(
+                f"Writer, background WriteBuffer, {name}", lambda: _write_writer(path, True), 5
+            ),
+        ]
+
+
+def run() -> list[dict]:
+    """Run the file benchmarks."""
+    return run_read() + run_stream() + run_mmap() + run_records() + run_write()
+
+
+if __name__ == "__main__":
+    report(run())
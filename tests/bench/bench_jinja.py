@@ -0,0 +1,204 @@
+"""Benchmarks of fpsupport.jinja.
+
+Startup: loading a tree of templates cold, from the on-disk bytecode cache, and from a precompiled
+archive, each through a fresh TemplateCache as a new worker process would.
+
+Throughput: rendering a batch of rows with render_many against a loop of render calls.
+
+Event loop latency: the worst delay of a 1 ms heartbeat while large templates are rendered
+concurrently, with render called from coroutines against render_async.
+
+Load and render: load_template with an empty TEMPLATE_CACHE and with the template cached, and
+render of a freshly loaded template against a template already rendered once.
+"""
+
+import asyncio
+import pathlib
+import tempfile
+import time
+
+import jinja2
+from harness import measure, report, summarize
+
+from fpsupport import jinja
+from fpsupport.monad import Monad, unwrap
+from fpsupport.struct import IOType
+
+TEMPLATES = 200
+BODY = """{% extends "base.j2" %}
+{% block body %}
+{% for item in items %}{{ loop.index }}. {{ item.name | title }} owes {{ item.amount }}
+{% endfor %}{% if footer %}{{ footer }}{% endif %}
+{% endblock %}
+"""
+
+
+def _tree(root: pathlib.Path) -> list[str]:
+    """Write a base template and TEMPLATES children, returning the children's paths."""
+    (root / "base.j2").write_text("<{% block body %}{% endblock %}>", encoding="utf-8")
+    paths = []
+    for i in range(TEMPLATES):
+        path = root / f"child_{i}.j2"
+        path.write_text(BODY + f"{{# {i} #}}", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def _load_all(cache: jinja.TemplateCache, paths: list[str]) -> None:
+    for path in paths:
+        cache.get_template(path)
+
+
+ROWS = [{"to": f"recipient {i}", "holiday": "Birthday"} for i in range(1000)]
+
+
+def _render_loop(template: jinja2.Template) -> list[str]:
+    io = Monad(IOType(template))
+    return [unwrap(io.flat_map(jinja.render, row)).outcome for row in ROWS]
+
+
+def _render_many(template: jinja2.Template) -> list[str]:
+    return [row.outcome for row in unwrap(jinja.render_many(IOType(template), ROWS)).outcome]
+
+
+def run_throughput() -> list[dict]:
+    """Compare render_many with a loop of render over the same rows."""
+    template = jinja2.Template("Happy {{ holiday }}, {{ to }}!")
+    return [
+        measure(f"render loop ({len(ROWS)} rows)", lambda: _render_loop(template), number=20),
+        measure(f"render_many ({len(ROWS)} rows)", lambda: _render_many(template), number=20),
+    ]
+
+
+def run_startup() -> list[dict]:
+    """Compare the start-up cost of cold, bytecode-cached and precompiled templates."""
+    with tempfile.TemporaryDirectory() as directory:
+        root = pathlib.Path(directory) / "templates"
+        root.mkdir()
+        bytecode = pathlib.Path(directory) / "bytecode"
+        bytecode.mkdir()
+        archive = str(pathlib.Path(directory) / "templates.fpsj")
+        paths = _tree(root)
+        jinja.precompile_templates(IOType(""), str(root), archive)
+        _load_all(jinja.TemplateCache(bytecode_dir=str(bytecode)), paths)
+
+        jinja.load_precompiled(IOType(""), str(root), archive)
+        warm = jinja.TemplateCache()
+        _load_all(warm, paths)
+
+        return [
+            measure(
+                f"startup cold ({TEMPLATES} templates)",
+                lambda: _load_all(jinja.TemplateCache(), paths),
+                number=1,
+            ),
+            measure(
+                f"startup bytecode cache ({TEMPLATES} templates)",
+                lambda: _load_all(jinja.TemplateCache(bytecode_dir=str(bytecode)), paths),
+                number=1,
+            ),
+            measure(
+                f"startup precompiled ({TEMPLATES} templates)",
+                lambda: _load_all(jinja.TEMPLATE_CACHE, paths),
+                number=1,
+                setup=jinja.TEMPLATE_CACHE.clear,
+            ),
+            measure(
+                f"in-memory hit ({TEMPLATES} templates)", lambda: _load_all(warm, paths), number=10
+            ),
+            measure(
+                "load_template hit, stat check",
+                lambda: jinja.load_template(IOType(""), paths[0]),
+                number=10000,
+            ),
+            measure(
+                "load_template hit, no stat check",
+                lambda: jinja.load_template(IOType(""), paths[0], check_mtime=False),
+                number=10000,
+            ),
+        ]
+
+
+LARGE = (
+    "{% for i in range(rows) %}<tr><td>{{ i }}</td><td>{{ name | upper }}</td></tr>\n{% endfor %}"
+)
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list[int]) -> None:
+    """Record how late each 1 ms sleep wakes up."""
+    while not stop.is_set():
+        start = time.perf_counter_ns()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter_ns() - start - 1_000_000)
+
+
+async def _sync_render(io: IOType) -> Monad:
+    return jinja.render(io, {"rows": 5000, "name": "row"})
+
+
+async def _async_render(io: IOType) -> Monad:
+    return await jinja.render_async(io, {"rows": 5000, "name": "row"})
+
+
+async def _worst_lag(render_call, io: IOType, concurrent: int = 10) -> int:
+    """Return the worst heartbeat delay while concurrent renders run."""
+    stop = asyncio.Event()
+    lags: list[int] = []
+    beat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(0.005)
+    await asyncio.gather(*(render_call(io) for _ in range(concurrent)))
+    stop.set()
+    await beat
+    return max(lags)
+
+
+def run_event_loop_latency() -> list[dict]:
+    """Compare the event loop's worst delay under render and render_async."""
+    sync_io = IOType(jinja2.Environment().from_string(LARGE))
+    async_io = IOType(jinja2.Environment(enable_async=True).from_string(LARGE))
+    return [
+        summarize(
+            "event loop worst lag, render",
+            [asyncio.run(_worst_lag(_sync_render, sync_io)) for _ in range(5)],
+        ),
+        summarize(
+            "event loop worst lag, render_async",
+            [asyncio.run(_worst_lag(_async_render, async_io)) for _ in range(5)],
+        ),
+    ]
+
+
+def _load_cold(path: str) -> Monad:
+    jinja.TEMPLATE_CACHE.clear()
+    return jinja.load_template(IOType(), path)
+
+
+def _render_cold(path: str, data: dict) -> Monad:
+    jinja.TEMPLATE_CACHE.clear()
+    return jinja.load_template(IOType(), path).flat_map(jinja.render, data)
+
+
+def run_load_render() -> list[dict]:
+    """Time load_template and render, cold and warm."""
+    data = {"items": [{"name": f"name {i}", "amount": i} for i in range(20)], "footer": "-"}
+    with tempfile.TemporaryDirectory() as directory:
+        path = _tree(pathlib.Path(directory))[0]
+        warm = jinja.load_template(IOType(), path)
+        warm.flat_map(jinja.render, data)
+        results = [
+            measure("load_template, cold", lambda: _load_cold(path), number=50),
+            measure("load_template, warm", lambda: jinja.load_template(IOType(), path), 10_000),
+            measure("load_template and render, cold", lambda: _render_cold(path, data), 50),
+            measure("render, warm", lambda: warm.flat_map(jinja.render, data), 2000),
+        ]
+        jinja.TEMPLATE_CACHE.clear()
+    return results
+
+
+def run() -> list[dict]:
+    """Run the jinja benchmarks."""
+    return run_startup() + run_throughput() + run_event_loop_latency() + run_load_render()
+
+
+if __name__ == "__main__":
+    report(run())
@@ -0,0 +1,455 @@
+"""Benchmarks of fpsupport.monad and fpsupport.struct.
+
+Memory: bytes held per Monad(IOType) pair, measured with tracemalloc, against an equivalent pair
+of classes with a per-instance __dict__.
+
+IOType: the time to build an IOType, against a slotted class without its type checks.
+
+Allocation rate: the time to build a Monad(IOType) pair, against the same classes.
+
+Chains: binding chains of 10, 100 and 1000 functions, in strict and trusted validation modes,
+against the flat_map that cloned through map() and called super() on every bind.
+
+Short circuit: a Maybe chain failed from its first bind, against one that succeeds.
+
+Pipeline: one Pipeline of 10 steps run against many inputs, against building the equivalent
+flat_map chain for each input. The steps rewrap their input so that the dispatch is measured
+rather than the work of the steps.
+
+Lazy: building and forcing a deferred chain of 1000 and 100k binds, against binding eagerly.
+
+Trampoline: a recursive walk over linked records, 10^3 to 10^6 deep, with naive recursion under a
+raised recursion limit and with trampoline().
+
+Do: a four-step do block against the nested closures it replaces.
+
+Hooks: a chain with no instrumentation, with a Hook that does nothing, and with the Profiler.
+"""
+
+import sys
+import tracemalloc
+from typing import Any, Callable, Self
+
+from harness import measure, report, summarize
+
+from fpsupport import exception
+from fpsupport.decorator import do
+from fpsupport.monad import (
+    STRICT,
+    TRUSTED,
+    Done,
+    Hook,
+    Lazy,
+    Maybe,
+    Monad,
+    Pipeline,
+    Suspend,
+    add_hook,
+    remove_hook,
+    set_validation,
+    trampoline,
+)
+from fpsupport.profiling import Profiler
+from fpsupport.struct import IOType
+
+COUNT = 100_000
+
+
+class DictMonad:  # pylint: disable=too-few-public-methods
+    """A Monad as it was before __slots__."""
+
+    def __init__(self, outer: Any = None) -> None:
+        self.outer = outer
+
+
+class DictIOType:  # pylint: disable=too-few-public-methods
+    """An IOType as it was before __slots__."""
+
+    def __init__(self, outcome: Any = None, error_msg: str | None = None, ok: bool | None = True):
+        self.outcome = outcome
+        if not isinstance(error_msg, str | None):
+            raise TypeError("error_msg")
+        self.error_msg = error_msg
+        if not isinstance(ok, bool | None):
+            raise TypeError("ok")
+        self.ok = ok
+
+
+def bytes_per_pair(monad_class: type, io_class: type) -> float:
+    """Return the memory held per monad_class(io_class()) pair."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    pairs = [monad_class(io_class(i, "", True)) for i in range(COUNT)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del pairs
+    return (after - before) / COUNT
+
+
+def run_memory() -> list[dict]:
+    """Compare the memory held by slotted and unslotted pairs."""
+    pairs = {
+        "Monad(IOType), slotted": (Monad, IOType),
+        "Maybe(IOType), slotted": (Maybe, IOType),
+        "pair with __dict__": (DictMonad, DictIOType),
+    }
+    return [
+        summarize(f"bytes per {name}", [bytes_per_pair(*classes)], unit="bytes")
+        for name, classes in pairs.items()
+    ]
+
+
+class UncheckedIOType:  # pylint: disable=too-few-public-methods
+    """A slotted IOType without the type checks of its __init__."""
+
+    __slots__ = ("outcome", "error_msg", "ok")
+
+    def __init__(self, outcome: Any = None, error_msg: str | None = None, ok: bool | None = True):
+        self.outcome = outcome
+        self.error_msg = error_msg
+        self.ok = ok
+
+
+def run_iotype() -> list[dict]:
+    """Time IOType construction, and the part of it spent validating error_msg and ok."""
+    return [
+        measure("IOType(outcome, error_msg, ok)", lambda: IOType("", "", True), COUNT),
+        measure("IOType() with defaults", IOType, COUNT),
+        measure("slotted IOType without checks", lambda: UncheckedIOType("", "", True), COUNT),
+    ]
+
+
+def run_allocation() -> list[dict]:
+    """Compare the time to allocate slotted and unslotted pairs."""
+    return [
+        measure("allocate Monad(IOType), slotted", lambda: Monad(IOType("", "", True)), COUNT),
+        measure("allocate pair with __dict__", lambda: DictMonad(DictIOType("", "", True)), COUNT),
+    ]
+
+
+class LegacyMonad(Monad):
+    """A Monad binding as flat_map did before its fast path."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def unit(outer: Any = None) -> Self:  # type: ignore
+        return LegacyMonad(outer)
+
+    def flat_map(self, f: Callable, *args, **kwargs) -> Self:
+        result = f(Monad.unit(self.outer).outer, *args, **kwargs)
+        if not isinstance(result, type(self)):
+            raise exception.MonadException(f"{f.__name__} did not return {type(self)}")
+        return result
+
+
+class LegacyMaybe(LegacyMonad):
+    """A Maybe binding as flat_map did before its fast path."""
+
+    __slots__ = ()
+
+    def flat_map(self, f: Callable, *args, **kwargs) -> Self:
+        return self if self.outer.ok is False else super().flat_map(f, *args, **kwargs)
+
+
+def chain(m: Monad, step: Callable, depth: int) -> Monad:
+    """Bind step depth times."""
+    for _ in range(depth):
+        m = m.flat_map(step, 1)
+    return m
+
+
+def _step(cls: type) -> Callable:
+    def add(io: IOType, n: int) -> Monad:
+        return cls(IOType(io.outcome + n, "", True))
+
+    return add
+
+
+def run_chains() -> list[dict]:
+    """Compare deep chains before and after the flat_map fast path."""
+    results = []
+    for depth in (10, 100, 1000):
+        number = 50_000 // depth
+        for name, cls in (
+            ("Monad", Monad),
+            ("Maybe", Maybe),
+            ("legacy Monad", LegacyMonad),
+            ("legacy Maybe", LegacyMaybe),
+        ):
+            step = _step(cls)
+            results.append(
+                measure(
+                    f"{name} chain of {depth}, strict",
+                    lambda cls=cls, step=step, depth=depth: chain(cls(IOType(0)), step, depth),
+                    number,
+                )
+            )
+        set_validation(TRUSTED)
+        for name, cls in (("Monad", Monad), ("Maybe", Maybe)):
+            step = _step(cls)
+            results.append(
+                measure(
+                    f"{name} chain of {depth}, trusted",
+                    lambda cls=cls, step=step, depth=depth: chain(cls(IOType(0)), step, depth),
+                    number,
+                )
+            )
+        set_validation(STRICT)
+    return results
+
+
+def run_short_circuit() -> list[dict]:
+    """Time a Maybe chain that fails at its first bind, against one that succeeds throughout."""
+    results = []
+    step = _step(Maybe)
+    for depth in (10, 100, 1000):
+        number = 50_000 // depth
+        results.append(
+            measure(
+                f"Maybe chain of {depth}, failed",
+                lambda depth=depth: chain(Maybe(IOType(0, "failed", False)), step, depth),
+                number,
+            )
+        )
+        results.append(
+            measure(
+                f"Maybe chain of {depth}, ok",
+                lambda depth=depth: chain(Maybe(IOType(0)), step, depth),
+                number,
+            )
+        )
+    return results
+
+
+def _chain_10(m: Monad, step: Callable) -> Monad:
+    return (
+        m.flat_map(step, 1)
+        .flat_map(step, 2)
+        .flat_map(step, 3)
+        .flat_map(step, 4)
+        .flat_map(step, 5)
+        .flat_map(step, 6)
+        .flat_map(step, 7)
+        .flat_map(step, 8)
+        .flat_map(step, 9)
+        .flat_map(step, 10)
+    )
+
+
+def run_pipeline() -> list[dict]:
+    """Compare a reused Pipeline with a chain rebuilt for each input."""
+    results = []
+    for name, cls in (("Monad", Monad), ("Maybe", Maybe)):
+        step = lambda io, n, cls=cls: cls(io)  # pylint: disable=unnecessary-lambda-assignment
+        pipeline = Pipeline()
+        for n in range(1, 11):
+            pipeline = pipeline.then(step, n)
+        inputs = [cls(IOType(i)) for i in range(10_000)]
+        results.append(
+            measure(
+                f"{name} chain of 10 x {len(inputs)} inputs",
+                lambda inputs=inputs, step=step: [_chain_10(m, step) for m in inputs],
+                number=5,
+            )
+        )
+        results.append(
+            measure(
+                f"{name} Pipeline of 10 x {len(inputs)} inputs",
+                lambda inputs=inputs, pipeline=pipeline: list(pipeline.run_many(inputs)),
+                number=5,
+            )
+        )
+    return results
+
+
+def chain_plain(m: Monad, depth: int) -> Monad:
+    """Bind an increment depth times."""
+    for _ in range(depth):
+        m = m.flat_map(lambda a: Monad(a + 1))
+    return m
+
+
+def _lazy_add(a: int) -> Lazy:
+    return Lazy(a + 1)
+
+
+def _lazy_chain(depth: int) -> Lazy:
+    m = Lazy(0)
+    for _ in range(depth):
+        m = m.flat_map(_lazy_add)
+    return m
+
+
+def run_lazy() -> list[dict]:
+    """Compare building and forcing a Lazy chain with binding a Monad chain eagerly."""
+    results = []
+    for depth in (1000, 100_000):
+        number = max(1, 100_000 // depth)
+        results.append(
+            measure(
+                f"Monad chain of {depth}",
+                lambda depth=depth: chain_plain(Monad(0), depth),
+                number,
+            )
+        )
+        results.append(
+            measure(
+                f"Lazy chain of {depth}, built",
+                lambda depth=depth: _lazy_chain(depth),
+                number,
+            )
+        )
+        results.append(
+            measure(
+                f"Lazy chain of {depth}, built and forced",
+                lambda depth=depth: _lazy_chain(depth).outer,
+                number,
+            )
+        )
+    return results
+
+
+def _linked(length: int) -> tuple | None:
+    record = None
+    for _ in range(length):
+        record = (1, record)
+    return record
+
+
+def _add(io: IOType, n: int) -> Maybe:
+    return Maybe(IOType(io.outcome + n, "", True))
+
+
+def _walk_naive(m: Maybe, record: tuple | None) -> Maybe:
+    if record is None:
+        return m
+    return _walk_naive(m.flat_map(_add, record[0]), record[1])
+
+
+def _walk(m: Maybe, record: tuple | None) -> Done | Suspend:
+    if record is None:
+        return Done(m)
+    return Suspend(_walk, m.flat_map(_add, record[0]), record[1])
+
+
+def run_trampoline() -> list[dict]:
+    """Compare naive recursion with the trampoline on linked records of growing length.
+
+    Naive recursion needs the recursion limit raised past the depth. Where it still fails, the
+    result is reported with the error in place of the timings.
+    """
+    results = []
+    limit = sys.getrecursionlimit()
+    for depth in (1000, 10_000, 100_000, 1_000_000):
+        number = max(1, 10_000 // depth)
+        repeat = 5 if depth < 1_000_000 else 3
+        records = _linked(depth)
+        sys.setrecursionlimit(depth + 1000)
+        try:
+            results.append(
+                measure(
+                    f"naive recursion, depth {depth}",
+                    lambda records=records: _walk_naive(Maybe(IOType(0)), records),
+                    number,
+                    repeat,
+                )
+            )
+        except (RecursionError, MemoryError) as e:
+            results.append(
+                {"name": f"naive recursion, depth {depth}", "error": type(e).__name__}
+            )
+        finally:
+            sys.setrecursionlimit(limit)
+        results.append(
+            measure(
+                f"trampoline, depth {depth}",
+                lambda records=records: trampoline(Suspend(_walk, Maybe(IOType(0)), records)),
+                number,
+                repeat,
+            )
+        )
+    return results
+
+
+def _halve(io: IOType) -> Maybe:
+    return Maybe(IOType(io.outcome // 2, "", True))
+
+
+def _sum(*ios: IOType) -> Maybe:
+    return Maybe(IOType(sum(io.outcome for io in ios), "", True))
+
+
+def _closures(m: Maybe) -> Maybe:
+    return m.flat_map(
+        lambda a: _halve(a).flat_map(
+            lambda b: _halve(b).flat_map(lambda c: _halve(c).flat_map(lambda d: _sum(a, b, c, d)))
+        )
+    )
+
+
+@do
+def _do_block(m: Maybe):
+    a = yield m
+    b = yield _halve(a)
+    c = yield _halve(b)
+    d = yield _halve(c)
+    return _sum(a, b, c, d)
+
+
+def run_do() -> list[dict]:
+    """Compare a do block with nested closures where the last step needs every earlier value."""
+    inputs = [Maybe(IOType(i * 8, "", True)) for i in range(10_000)]
+    return [
+        measure(
+            f"closure chain of 4 x {len(inputs)} inputs",
+            lambda: [_closures(m) for m in inputs],
+            number=5,
+        ),
+        measure(
+            f"do block of 4 x {len(inputs)} inputs",
+            lambda: [_do_block(m) for m in inputs],
+            number=5,
+        ),
+    ]
+
+
+def run_hooks() -> list[dict]:
+    """Compare a chain of 100 binds with no hooks, an empty Hook, and the Profiler."""
+    step = _step(Maybe)
+    results = [
+        measure("Maybe chain of 100, no hooks", lambda: chain(Maybe(IOType(0)), step, 100), 500)
+    ]
+    for name, hook in (("an empty Hook", Hook()), ("the Profiler", Profiler())):
+        add_hook(hook)
+        try:
+            results.append(
+                measure(
+                    f"Maybe chain of 100, {name}",
+                    lambda: chain(Maybe(IOType(0)), step, 100),
+                    500,
+                )
+            )
+        finally:
+            remove_hook(hook)
+    return results
+
+
+def run() -> list[dict]:
+    """Run the monad benchmarks."""
+    return (
+        run_memory()
+        + run_iotype()
+        + run_allocation()
+        + run_chains()
+        + run_short_circuit()
+        + run_pipeline()
+        + run_lazy()
+        + run_trampoline()
+        + run_do()
+        + run_hooks()
+    )
+
+
+if __name__ == "__main__":
+    report(run())
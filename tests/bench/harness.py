@@ -0,0 +1,69 @@
+"""Timing helpers shared by the benchmarks.
+
+Every benchmark module exposes run() -> list[dict] and can be run on its own:
+
+    python tests/bench/bench_jinja.py
+
+The numbers are nanoseconds per operation unless a benchmark states another unit, like bytes.
+The best of several repeats is reported, as the slower repeats only measure interference from the
+rest of the machine.
+"""
+
+import statistics
+import time
+from typing import Callable
+
+
+def measure(
+    name: str,
+    function: Callable[[], object],
+    number: int = 1000,
+    repeat: int = 5,
+    setup: Callable[[], object] | None = None,
+) -> dict:
+    """Time a function and return the result as a dictionary.
+
+    Args:
+        name: the name of the benchmark
+        function: called number times per repeat without arguments
+        number: the calls per repeat
+        repeat: the number of repeats
+        setup: called, untimed, before each repeat
+
+    Returns:
+        {"name", "unit", "number", "repeat", "best", "median"}, where the times are per call.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter_ns() - start) / number)
+    return summarize(name, timings, number)
+
+
+def summarize(name: str, samples: list[float], number: int = 1, unit: str = "ns") -> dict:
+    """Return samples, lower being better, in the form returned by measure()."""
+    return {
+        "name": name,
+        "unit": unit,
+        "number": number,
+        "repeat": len(samples),
+        "best": min(samples),
+        "median": statistics.median(samples),
+    }
+
+
+def report(results: list[dict]) -> None:
+    """Print results as an aligned table."""
+    width = max((len(result["name"]) for result in results), default=0)
+    for result in results:
+        if "error" in result:
+            print(f"{result['name']:<{width}}  {result['error']:>14}")
+            continue
+        print(
+            f"{result['name']:<{width}}  {result['best']:>14,.0f} {result['unit']:<5}"
+            f"  (median {result['median']:,.0f})"
+        )
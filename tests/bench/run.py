@@ -0,0 +1,127 @@
+"""Run the benchmarks, save the results as JSON and compare them with a saved baseline.
+
+    python tests/bench/run.py                                    # every bench_*.py module
+    python tests/bench/run.py monad file                         # bench_monad.py, bench_file.py
+    python tests/bench/run.py --output bench.json                # save the results
+    python tests/bench/run.py --baseline bench.json              # compare with saved results
+
+In comparison mode, each result is shown with its change from the baseline's best time, and the
+exit status is 1 if any result is slower by more than the threshold, 10% unless --threshold is
+given. The machine should be otherwise idle: a single noisy run is not a regression.
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import pathlib
+import platform
+import sys
+
+from harness import report
+
+HERE = pathlib.Path(__file__).resolve().parent
+
+
+def discover(names: list[str]) -> list[str]:
+    """Return the benchmark modules to run: all bench_*.py files, or those named."""
+    found = sorted(path.stem for path in HERE.glob("bench_*.py"))
+    if not names:
+        return found
+    wanted = [name if name.startswith("bench_") else f"bench_{name}" for name in names]
+    unknown = sorted(set(wanted) - set(found))
+    if unknown:
+        raise SystemExit(f"unknown benchmark modules: {', '.join(unknown)}")
+    return wanted
+
+
+def run(modules: list[str]) -> dict:
+    """Run each module's run() and return the results with a description of the machine."""
+    results = {}
+    for name in modules:
+        print(f"# {name}", file=sys.stderr)
+        results[name] = importlib.import_module(name).run()
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Return a comparison row for every result present in both runs.
+
+    Each row holds the module, name, unit, baseline and current best, and the ratio of current to
+    baseline. A result is a regression when its ratio is above 1 + threshold.
+    """
+    rows = []
+    for module, results in current["results"].items():
+        before = {result["name"]: result for result in baseline["results"].get(module, [])}
+        for result in results:
+            old = before.get(result["name"])
+            if old is None or "best" not in result or "best" not in old or not old["best"]:
+                continue
+            ratio = result["best"] / old["best"]
+            rows.append(
+                {
+                    "module": module,
+                    "name": result["name"],
+                    "unit": result["unit"],
+                    "baseline": old["best"],
+                    "current": result["best"],
+                    "ratio": ratio,
+                    "regression": ratio > 1 + threshold,
+                }
+            )
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> None:
+    """Print the comparison as an aligned table, marking regressions."""
+    width = max((len(row["name"]) for row in rows), default=0)
+    module = None
+    for row in rows:
+        if row["module"] != module:
+            module = row["module"]
+            print(f"# {module}")
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<{width}}  {row['baseline']:>14,.0f} -> {row['current']:>14,.0f} "
+            f"{row['unit']:<5} {row['ratio'] - 1:>+7.1%}{flag}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks from the command line and return the exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("modules", nargs="*", help="modules to run, like monad or bench_file")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="slowdown counted as a regression"
+    )
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file_pointer:
+            baseline = json.load(file_pointer)
+    current = run(discover(args.modules))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file_pointer:
+            json.dump(current, file_pointer, indent=1)
+    if baseline is None:
+        for module, results in current["results"].items():
+            print(f"# {module}")
+            report(results)
+        return 0
+    rows = compare(current, baseline, args.threshold)
+    print_comparison(rows)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Testing the incremental template build."""
+
+import json
+import os
+import pathlib
+import tempfile
+from unittest import TestCase
+
+from fpsupport import build, jinja
+from fpsupport.monad import Monad, unwrap
+from fpsupport.struct import IOType
+
+
+class TestBuild(TestCase):
+    """Testing build.build with real templates on disk."""
+
+    def setUp(self):
+        """Create a base template, a page extending it, and a page including a partial."""
+        jinja.TEMPLATE_CACHE.clear()
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.root = pathlib.Path(self.directory.name)
+        self.templates = self.root / "templates"
+        self.templates.mkdir()
+        self.write("base.j2", "[{% block body %}{% endblock %}]")
+        self.write("page.j2", '{% extends "base.j2" %}{% block body %}{{ name }}{% endblock %}')
+        self.write("partial.j2", "({{ name }})")
+        self.write("card.j2", '{% include "partial.j2" %}')
+        self.manifest = str(self.root / "manifest.json")
+        self.targets = [
+            build.Target("page.j2", str(self.root / "out" / "a.txt"), {"name": "a"}),
+            build.Target("page.j2", str(self.root / "out" / "b.txt"), {"name": "b"}),
+            build.Target("card.j2", str(self.root / "out" / "c.txt"), {"name": "c"}),
+        ]
+
+    def tearDown(self):
+        """Remove the build directory."""
+        self.directory.cleanup()
+
+    def write(self, name: str, source: str) -> None:
+        """Write a template, making sure its modification is seen."""
+        path = self.templates / name
+        path.write_text(source, encoding="utf-8")
+        os.utime(path, (os.stat(path).st_atime + 10, os.stat(path).st_mtime + 10))
+
+    def run_build(self, targets=None) -> build.BuildReport:
+        """Run a build and return its report."""
+        io = Monad(IOType(""))
+        result = unwrap(
+            io.flat_map(build.build, str(self.templates), targets or self.targets, self.manifest)
+        )
+        return result.outcome
+
+    def test_nok(self):
+        """build.build with a monad's ok cleared renders nothing."""
+        # when
+        result = unwrap(build.build(IOType("", "", False), str(self.templates), [], self.manifest))
+        # then
+        assert not result.ok
+        assert not os.path.exists(self.manifest)
+
+    def test_first_build_renders_everything(self):
+        """Without a manifest, every target is rendered and a manifest is written."""
+        # when
+        report = self.run_build()
+        # then
+        assert len(report.rendered) == 3
+        assert (self.root / "out" / "a.txt").read_text(encoding="utf-8") == "[a]"
+        assert (self.root / "out" / "c.txt").read_text(encoding="utf-8") == "(c)"
+        with open(self.manifest, "r", encoding="utf-8") as file_pointer:
+            manifest = json.load(file_pointer)
+        assert manifest["templates"]["page.j2"]["deps"] == ["base.j2"]
+        assert manifest["templates"]["card.j2"]["deps"] == ["partial.j2"]
+
+    def test_rerun_skips_everything(self):
+        """Nothing changed, nothing is rendered."""
+        # given
+        self.run_build()
+        # when
+        report = self.run_build()
+        # then
+        assert not report.rendered
+        assert len(report.skipped) == 3
+
+    def test_changed_base_renders_its_dependants(self):
+        """A change in an extended template re-renders only the outputs that extend it."""
+        # given
+        self.run_build()
+        self.write("base.j2", "<{% block body %}{% endblock %}>")
+        # when
+        report = self.run_build()
+        # then
+        assert sorted(report.rendered) == [self.targets[0].output, self.targets[1].output]
+        assert (self.root / "out" / "a.txt").read_text(encoding="utf-8") == "<a>"
+
+    def test_changed_data_renders_its_output(self):
+        """A change in the data re-renders only that output."""
+        # given
+        self.run_build()
+        targets = list(self.targets)
+        targets[2] = build.Target("card.j2", targets[2].output, {"name": "z"})
+        # when
+        report = self.run_build(targets)
+        # then
+        assert report.rendered == [targets[2].output]
+
+    def test_missing_output_is_rendered(self):
+        """An output deleted since the last build is rendered again."""
+        # given
+        self.run_build()
+        os.remove(self.targets[0].output)
+        # when
+        report = self.run_build()
+        # then
+        assert report.rendered == [self.targets[0].output]
+
+    def test_dynamic_include_is_always_rendered(self):
+        """A template including a variable name cannot be tracked, so it is always rendered."""
+        # given
+        self.write("dynamic.j2", "{% include page %}")
+        targets = [build.Target("dynamic.j2", str(self.root / "d.txt"), {"page": "partial.j2"})]
+        self.run_build(targets)
+        # when
+        report = self.run_build(targets)
+        # then
+        assert report.rendered == [targets[0].output]
+
+    def test_failures_are_reported(self):
+        """A broken template fails its own target, and clears ok."""
+        # given
+        self.write("broken.j2", "{% if %}")
+        targets = self.targets + [
+            build.Target("broken.j2", str(self.root / "x.txt"), {}),
+            build.Target("missing.j2", str(self.root / "y.txt"), {}),
+        ]
+        # when
+        result = unwrap(build.build(IOType(""), str(self.templates), targets, self.manifest))
+        # then
+        assert not result.ok
+        assert result.error_msg == "2 targets failed"
+        assert len(result.outcome.rendered) == 3
+        assert set(result.outcome.failed) == {targets[3].output, targets[4].output}
+
+    def test_python_errors_fail_their_target(self):
+        """An exception raised while rendering fails its target, and the manifest is written."""
+        # given
+        self.write("divide.j2", "{{ 1 // n }}")
+        targets = [
+            build.Target("divide.j2", str(self.root / "out" / "zero.txt"), {"n": 0}),
+            *self.targets,
+        ]
+        # when
+        result = unwrap(build.build(IOType(""), str(self.templates), targets, self.manifest))
+        report = self.run_build(targets)
+        # then
+        assert result.outcome.failed == {
+            targets[0].output: "ZeroDivisionError: integer division or modulo by zero"
+        }
+        assert len(result.outcome.rendered) == 3
+        assert report.skipped == [target.output for target in self.targets]
+
+    def test_unwritable_output_is_reported(self):
+        """An OSError writing an output fails that target."""
+        # given
+        (self.root / "blocker").write_text("", encoding="utf-8")
+        targets = [build.Target("partial.j2", str(self.root / "blocker" / "x.txt"), {})]
+        # when
+        report = self.run_build(targets)
+        # then
+        assert targets[0].output in report.failed
+
+    def test_unreadable_manifest_is_rebuilt(self):
+        """A corrupt or foreign manifest is ignored."""
+        # given
+        pathlib.Path(self.manifest).write_text("{not json", encoding="utf-8")
+        # when
+        report = self.run_build()
+        # then
+        assert len(report.rendered) == 3
+
+    def test_foreign_manifest_is_rebuilt(self):
+        """A manifest of another version is ignored."""
+        # given
+        self.run_build()
+        pathlib.Path(self.manifest).write_text('{"version": -1}', encoding="utf-8")
+        # when
+        report = self.run_build()
+        # then
+        assert len(report.rendered) == 3
+
+    def test_incomplete_manifest_is_rebuilt(self):
+        """A manifest of this version without its templates or outputs is ignored."""
+        # given
+        self.run_build()
+        manifest = pathlib.Path(self.manifest)
+        version = build.MANIFEST_VERSION
+        # when
+        manifest.write_text(json.dumps({"version": version}), encoding="utf-8")
+        missing = self.run_build()
+        manifest.write_text(
+            json.dumps({"version": version, "templates": [], "outputs": {}}), encoding="utf-8"
+        )
+        wrong = self.run_build()
+        # then
+        assert len(missing.rendered) == len(wrong.rendered) == 3
+
+    def test_shared_dependency_is_tracked(self):
+        """A template reached through two paths is tracked, and changing it re-renders."""
+        # given
+        self.write("both.j2", '{% include "partial.j2" %}{% include "card.j2" %}')
+        targets = [build.Target("both.j2", str(self.root / "out" / "d.txt"), {"name": "d"})]
+        self.run_build(targets)
+        skipped = self.run_build(targets)
+        self.write("partial.j2", "<{{ name }}>")
+        # when
+        report = self.run_build(targets)
+        # then
+        assert skipped.skipped == [targets[0].output]
+        assert report.rendered == [targets[0].output]
+        assert (self.root / "out" / "d.txt").read_text(encoding="utf-8") == "<d><d>"
+
+    def test_unwritable_manifest_clears_ok(self):
+        """An OSError writing the manifest is reported instead of raised."""
+        # given
+        manifest = str(self.root / "missing" / "manifest.json")
+        # when
+        result = unwrap(build.build(IOType(""), str(self.templates), self.targets, manifest))
+        # then
+        assert not result.ok
+        assert result.error_msg.endswith("No such file or directory")
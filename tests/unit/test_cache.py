@@ -0,0 +1,136 @@
+"""Testing the bounded caches."""
+
+from unittest import TestCase
+
+from pytest import raises
+
+from fpsupport.cache import MISSING, LRUCache, fingerprint
+
+
+class TestLRUCache(TestCase):
+    """Testing the LRUCache eviction and counters."""
+
+    def test_fail_bad_maxsize(self):
+        """A cache must hold at least one entry."""
+        with raises(ValueError):
+            _ = LRUCache(0)
+
+    def test_get_counts_hits_and_misses(self):
+        """A get on a missing key is a miss, a get on a stored key is a hit."""
+        # given
+        cache = LRUCache(2)
+        # when
+        cache.put("a", 1)
+        # then
+        assert cache.get("a") == 1
+        assert cache.get("b") is MISSING
+        assert cache.info().hits == 1
+        assert cache.info().misses == 1
+
+    def test_least_recently_used_is_evicted(self):
+        """The entry not touched for the longest time is the one evicted."""
+        # given
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        # when
+        cache.get("a")
+        cache.put("c", 3)
+        # then
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.info().evictions == 1
+        assert len(cache) == 2
+
+    def test_invalid_entry_is_dropped(self):
+        """An entry that fails is_valid is removed and counted as a miss and an invalidation."""
+        # given
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        # when
+        result = cache.get("a", is_valid=lambda value: value == 2)
+        # then
+        assert result is MISSING
+        assert "a" not in cache
+        assert cache.info().invalidations == 1
+        assert cache.info().misses == 1
+
+    def test_pop_and_clear(self):
+        """Pop removes a single entry, clear removes all entries and counters."""
+        # given
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        # when
+        popped = cache.pop("a")
+        cache.clear()
+        # then
+        assert popped == 1
+        assert cache.pop("a") is MISSING
+        assert cache.info() == (0, 0, 0, 0, 2, 0)
+
+
+class TestBoundedLRUCache(TestCase):
+    """Testing the LRUCache time-to-live and byte limits."""
+
+    def test_expired_entry_is_a_miss(self):
+        """An entry older than ttl is dropped and counted as an invalidation."""
+        # given
+        cache = LRUCache(2, ttl=0)
+        cache.put("a", 1)
+        # when
+        result = cache.get("a")
+        # then
+        assert result is MISSING
+        assert cache.info().invalidations == 1
+
+    def test_entry_within_ttl_is_a_hit(self):
+        """An entry younger than ttl is returned."""
+        # given
+        cache = LRUCache(2, ttl=60)
+        cache.put("a", 1)
+        # then
+        assert cache.get("a") == 1
+
+    def test_bytes_are_bounded(self):
+        """Least recently used entries are evicted until the total size fits."""
+        # given
+        cache = LRUCache(10, max_bytes=10, sizeof=len)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        # when
+        cache.put("c", "123")
+        # then
+        assert "a" not in cache
+        assert cache.currbytes == 8
+        assert cache.info().evictions == 1
+
+    def test_oversized_value_is_not_stored(self):
+        """A value larger than max_bytes on its own is dropped, and replaces nothing."""
+        # given
+        cache = LRUCache(10, max_bytes=4, sizeof=len)
+        cache.put("a", "1234")
+        # when
+        cache.put("a", "12345")
+        # then
+        assert "a" not in cache
+        assert cache.currbytes == 0
+
+
+class TestFingerprint(TestCase):
+    """Testing the stable data hash."""
+
+    def test_key_order_does_not_matter(self):
+        """Equal dictionaries have equal fingerprints whatever their insertion order."""
+        assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+
+    def test_types_are_distinguished(self):
+        """Values that compare or print alike but differ in type have different fingerprints."""
+        assert fingerprint({"a": [1]}) != fingerprint({"a": (1,)})
+        assert fingerprint({1: "a"}) != fingerprint({"1": "a"})
+        assert fingerprint(b"a") != fingerprint("a")
+
+    def test_unsupported_data_has_no_fingerprint(self):
+        """Objects other than plain data cannot be fingerprinted."""
+        assert fingerprint({"a": object()}) is None
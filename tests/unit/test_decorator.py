@@ -0,0 +1,504 @@
+"""Testing the functional programming decorators."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+import pytest
+
+from fpsupport.decorator import do, memoize, side_effect, single_flight
+from fpsupport.exception import MonadException
+from fpsupport.monad import Maybe, Monad, unwrap
+from fpsupport.struct import IOType
+
+
+@side_effect
+def io_call(io: IOType, calls: list) -> Monad:
+    """A side effect that records that it ran."""
+    calls.append(io)
+    return Monad(IOType("ran", "", True))
+
+
+@side_effect
+async def async_io_call(io: IOType, calls: list) -> Monad:
+    """An asynchronous side effect that records that it ran."""
+    calls.append(io)
+    await asyncio.sleep(0)
+    return Monad(IOType("ran", "", True))
+
+
+class TestSideEffect(TestCase):
+    """Testing the side_effect skip semantics."""
+
+    def test_ok_runs(self):
+        """With ok set, the wrapped function runs."""
+        # given
+        calls: list = []
+        # when
+        result = io_call(IOType(""), calls)
+        # then
+        assert unwrap(result).outcome == "ran"
+        assert len(calls) == 1
+
+    def test_nok_and_none_skip(self):
+        """With ok False or None, the incoming IOType is returned and nothing runs."""
+        # given
+        calls: list = []
+        failed = IOType("before", "unit test", False)
+        simulated = IOType("before", "", None)
+        # when
+        results = [unwrap(io_call(failed, calls)), unwrap(io_call(simulated, calls))]
+        # then
+        assert results == [failed, simulated]
+        assert not calls
+
+    def test_coroutine_ok_runs(self):
+        """A coroutine function is still awaited when ok is set."""
+        # given
+        calls: list = []
+        # when
+        result = asyncio.run(async_io_call(IOType(""), calls))
+        # then
+        assert unwrap(result).outcome == "ran"
+        assert len(calls) == 1
+
+    def test_coroutine_nok_skips(self):
+        """A coroutine function is skipped when ok is False or None."""
+        # given
+        calls: list = []
+        io = IOType("before", "unit test", False)
+        # when
+        result = asyncio.run(async_io_call(io, calls))
+        # then
+        assert unwrap(result) is io
+        assert not calls
+
+
+def halve(io: IOType) -> Maybe:
+    """Halve an even number, failing on an odd one."""
+    if io.outcome % 2:
+        return Maybe(IOType(io.outcome, "odd", False))
+    return Maybe(IOType(io.outcome // 2, "", True))
+
+
+class TestDo(TestCase):
+    """Testing the generator-based do-notation."""
+
+    def test_values_stay_in_scope(self):
+        """Each yield resumes with the wrapped value, and later steps can use earlier ones."""
+
+        # given
+        @do
+        def quarter_sum(io: IOType):
+            half = yield halve(io)
+            quarter = yield halve(half)
+            return Maybe(IOType(half.outcome + quarter.outcome, "", True))
+
+        # when
+        result = quarter_sum(IOType(8, "", True))
+        # then
+        assert unwrap(result).outcome == 6
+
+    def test_failed_maybe_short_circuits(self):
+        """A failed Maybe is returned as is, the rest of the generator never runs."""
+        # given
+        cleaned_up = []
+
+        @do
+        def quarter(io: IOType):
+            try:
+                half = yield halve(io)
+                quarter = yield halve(half)
+                raise AssertionError("not reached")  # pragma: no cover
+            finally:
+                cleaned_up.append(True)
+            return Maybe(quarter)  # pylint: disable=unreachable
+
+        # when
+        result = quarter(IOType(6, "", True))
+        # then
+        assert unwrap(result) == IOType(3, "odd", False)
+        assert cleaned_up == [True]
+
+    def test_plain_monad_does_not_short_circuit(self):
+        """A Monad other than Maybe passes its wrapped value through even when ok is False."""
+
+        # given
+        @do
+        def passthrough(io: IOType):
+            failed = yield Monad(io)
+            return Monad(IOType("next", failed.error_msg, True))
+
+        # when
+        result = passthrough(IOType("", "failed", False))
+        # then
+        assert unwrap(result) == IOType("next", "failed", True)
+
+    def test_same_result_as_flat_map(self):
+        """The do block gives the same result as the equivalent chain of closures."""
+
+        # given
+        @do
+        def quarter(io: IOType):
+            half = yield halve(io)
+            return halve(half)
+
+        # when
+        chained = Maybe(IOType(12, "", True)).flat_map(halve).flat_map(halve)
+        # then
+        assert unwrap(quarter(IOType(12, "", True))) == unwrap(chained)
+
+    def test_wrong_types_fail(self):
+        """Yielding or returning anything but a Monad raises a MonadException."""
+
+        # given
+        @do
+        def yields_int(io: IOType):
+            yield io.outcome
+            return Monad(io)  # pragma: no cover
+
+        @do
+        def returns_int(io: IOType):
+            value = yield Monad(io)
+            return value.outcome
+
+        # then
+        with pytest.raises(MonadException):
+            yields_int(IOType(1))
+        with pytest.raises(MonadException):
+            returns_int(IOType(1))
+
+
+class TestMemoize(TestCase):
+    """Testing the memoization of bound functions."""
+
+    def setUp(self):
+        self.calls: list = []
+
+        @memoize
+        def lookup(io: IOType, key: str, default: str = "") -> Monad:
+            self.calls.append(key)
+            if key == "missing":
+                return Monad(IOType(default, f"{key} not found", False))
+            return Monad(IOType(f"{io.outcome}.{key}", "", True))
+
+        self.lookup = lookup
+
+    def test_repeated_calls_are_cached(self):
+        """The second identical call returns the cached Monad without running."""
+        # given
+        m = Monad(IOType("config", "", True))
+        # when
+        first = m.flat_map(self.lookup, "port")
+        second = m.flat_map(self.lookup, "port")
+        # then
+        assert second is first
+        assert unwrap(second).outcome == "config.port"
+        assert self.calls == ["port"]
+        assert self.lookup.cache_info()[:2] == (1, 1)
+
+    def test_key_includes_outer_and_arguments(self):
+        """A different wrapped value or argument is a different entry."""
+        # when
+        self.lookup(IOType("a", "", True), "port")
+        self.lookup(IOType("b", "", True), "port")
+        self.lookup(IOType("a", "", True), "host")
+        self.lookup(IOType("a", "", True), "host", default="x")
+        # then
+        assert self.calls == ["port", "port", "host", "host"]
+
+    def test_failures_are_not_cached(self):
+        """A result whose ok is not True runs again on the next call."""
+        # when
+        self.lookup(IOType("", "", True), "missing")
+        self.lookup(IOType("", "", True), "missing")
+        # then
+        assert self.calls == ["missing", "missing"]
+        assert self.lookup.cache_info().currsize == 0
+
+    def test_unhashable_arguments_bypass_the_cache(self):
+        """A call that cannot be keyed runs every time."""
+        # when
+        self.lookup(IOType(["unhashable"], "", True), "port")
+        self.lookup(IOType(["unhashable"], "", True), "port")
+        # then
+        assert self.calls == ["port", "port"]
+
+    def test_invalidate_and_clear(self):
+        """One entry can be forgotten, or all of them."""
+        # given
+        io = IOType("config", "", True)
+        self.lookup(io, "port")
+        self.lookup(io, "host")
+        # when
+        invalidated = self.lookup.invalidate(io, "port")
+        # then
+        assert invalidated
+        assert not self.lookup.invalidate(io, "port")
+        self.lookup(io, "port")
+        self.lookup(io, "host")
+        assert self.calls == ["port", "host", "port"]
+        self.lookup.cache_clear()
+        assert self.lookup.cache_info().currsize == 0
+
+    def test_maxsize_and_ttl(self):
+        """The least recently used entry is evicted, and entries expire."""
+
+        # given
+        @memoize(maxsize=1, ttl=0.05)
+        def identity(io: IOType) -> Monad:
+            self.calls.append(io.outcome)
+            return Monad(io)
+
+        # when
+        identity(IOType(1, "", True))
+        identity(IOType(2, "", True))
+        identity(IOType(2, "", True))
+        time.sleep(0.06)
+        identity(IOType(2, "", True))
+        # then
+        assert self.calls == [1, 2, 2]
+        assert identity.cache_info().evictions == 1
+        assert identity.cache_info().invalidations == 1
+
+
+class TestSingleFlight(TestCase):
+    """Testing the sharing of concurrent identical calls."""
+
+    def test_threads_share_one_call(self):
+        """Concurrent callers with the same arguments receive the result of one execution."""
+        # given
+        calls: list = []
+        release = threading.Event()
+
+        @single_flight
+        def slow_read(io: IOType, path: str) -> Monad:
+            calls.append(path)
+            release.wait(5)
+            return Monad(IOType(f"{io.outcome}{path}", "", True))
+
+        io = IOType("/tmp/", "", True)
+        # when
+        with ThreadPoolExecutor(8) as pool:
+            futures = [pool.submit(slow_read, io, "a") for _ in range(8)]
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+        # then
+        assert calls == ["a"]
+        assert all(result is results[0] for result in results)
+        assert unwrap(results[0]).outcome == "/tmp/a"
+
+    def test_calls_after_completion_run_again(self):
+        """Nothing is cached once the shared call is over."""
+        # given
+        calls: list = []
+
+        @single_flight
+        def read(io: IOType) -> Monad:
+            calls.append(io.outcome)
+            return Monad(io)
+
+        # when
+        read(IOType("a", "", True))
+        read(IOType("a", "", True))
+        # then
+        assert calls == ["a", "a"]
+
+    def test_exceptions_are_shared(self):
+        """Every waiting caller receives the exception of the shared call."""
+        # given
+        release = threading.Event()
+
+        @single_flight
+        def broken(io: IOType) -> Monad:
+            release.wait(5)
+            raise ValueError(io.outcome)
+
+        # when
+        with ThreadPoolExecutor(4) as pool:
+            futures = [pool.submit(broken, IOType("bad", "", True)) for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            # then
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_nok_and_none_skip(self):
+        """As with side_effect, a wrapped value whose ok is False or None is returned at once."""
+        # given
+        calls: list = []
+
+        @single_flight
+        def read(io: IOType) -> Monad:  # pragma: no cover
+            calls.append(io)
+            return Monad(IOType("ran", "", True))
+
+        # when
+        failed = read(IOType("", "failed", False))
+        skipped = read(IOType("skipped", "", None))
+        # then
+        assert unwrap(failed) == IOType("", "failed", False)
+        assert unwrap(skipped) == IOType("skipped", "", None)
+        assert not calls
+
+    def test_tasks_share_one_call(self):
+        """Concurrent tasks with the same arguments await one execution."""
+        # given
+        calls: list = []
+
+        @single_flight
+        async def slow_read(io: IOType, path: str) -> Monad:
+            calls.append(path)
+            await asyncio.sleep(0.05)
+            return Monad(IOType(path, "", True))
+
+        async def gather():
+            io = IOType("", "", True)
+            return await asyncio.gather(
+                *(slow_read(io, "a") for _ in range(8)), slow_read(io, "b")
+            )
+
+        # when
+        results = asyncio.run(gather())
+        # then
+        assert sorted(calls) == ["a", "b"]
+        assert all(result is results[0] for result in results[:8])
+        assert unwrap(results[8]).outcome == "b"
+
+    def test_async_skip_and_exceptions(self):
+        """The asynchronous version skips on ok and shares exceptions too."""
+
+        # given
+        @single_flight
+        async def broken(io: IOType) -> Monad:
+            await asyncio.sleep(0.01)
+            raise ValueError(io.outcome)
+
+        async def gather():
+            io = IOType("bad", "", True)
+            return await asyncio.gather(broken(io), broken(io), return_exceptions=True)
+
+        # when
+        errors = asyncio.run(gather())
+        skipped = asyncio.run(broken(IOType("skipped", "", None)))
+        # then
+        assert all(isinstance(error, ValueError) for error in errors)
+        assert unwrap(skipped).outcome == "skipped"
+
+    def test_cancelled_owner_leaves_the_waiters(self):
+        """Cancelling the task that started the call does not cancel the others."""
+        # given
+        calls: list = []
+
+        @single_flight
+        async def slow_read(io: IOType) -> Monad:
+            calls.append(io.outcome)
+            await asyncio.sleep(0.05)
+            return Monad(IOType("read", "", True))
+
+        async def scenario():
+            io = IOType("a", "", True)
+            owner = asyncio.create_task(slow_read(io))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(slow_read(io))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            result = await waiter
+            return owner.cancelled(), result
+
+        # when
+        owner_cancelled, result = asyncio.run(scenario())
+        # then
+        assert owner_cancelled
+        assert unwrap(result).outcome == "read"
+        assert calls == ["a"]
+
+    def test_call_is_cancelled_with_its_last_caller(self):
+        """Once every caller is cancelled, so is the shared call."""
+        # given
+        cancelled: list = []
+
+        @single_flight
+        async def slow_read(io: IOType) -> Monad:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(io.outcome)
+                raise
+            return Monad(io)  # pragma: no cover
+
+        async def scenario():
+            io = IOType("a", "", True)
+            callers = [asyncio.create_task(slow_read(io)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            callers[0].cancel()
+            await asyncio.sleep(0.01)
+            alone = list(cancelled)
+            callers[1].cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0)
+            return alone
+
+        # when
+        alone = asyncio.run(scenario())
+        # then
+        assert not alone
+        assert cancelled == ["a"]
+
+    def test_call_after_the_last_caller_is_cancelled(self):
+        """A caller arriving while the abandoned call is being cancelled starts a new call."""
+        # given
+        calls: list = []
+
+        @single_flight
+        async def slow_read(io: IOType) -> Monad:
+            calls.append(io.outcome)
+            await asyncio.sleep(0.05)
+            return Monad(io)
+
+        async def scenario():
+            io = IOType("a", "", True)
+            first = asyncio.create_task(slow_read(io))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            second = asyncio.create_task(slow_read(io))
+            await asyncio.gather(first, second, return_exceptions=True)
+            return first, second
+
+        # when
+        first, second = asyncio.run(scenario())
+        # then
+        assert first.cancelled()
+        assert not second.cancelled()
+        assert unwrap(second.result()).outcome == "a"
+        assert calls == ["a", "a"]
+
+    def test_unhashable_arguments_are_not_shared(self):
+        """Calls whose arguments cannot be hashed each run on their own."""
+        # given
+        calls: list = []
+
+        @single_flight
+        def read(io: IOType, options: dict) -> Monad:
+            calls.append(options)
+            return Monad(io)
+
+        @single_flight
+        async def async_read(io: IOType, options: dict) -> Monad:
+            calls.append(options)
+            return Monad(io)
+
+        async def gather():
+            io = IOType("a", "", True)
+            return await asyncio.gather(async_read(io, {}), async_read(io, {}))
+
+        # when
+        read(IOType("a", "", True), {})
+        results = asyncio.run(gather())
+        # then
+        assert len(calls) == 3
+        assert unwrap(results[1]).outcome == "a"
@@ -1,10 +1,16 @@
 """Testing the monad-wrapped file module."""
 
-from unittest import TestCase
+import io as python_io
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from unittest import TestCase, skipUnless
 from unittest.mock import Mock, patch
 
 from fpsupport import file
-from fpsupport.monad import unwrap
+from fpsupport.monad import Monad, Pipeline, Writer, bracket, unwrap
 from fpsupport.struct import IOType
 
 
@@ -98,3 +104,649 @@ class TestRead(TestCase):
         assert new_io.ok
         assert new_io.outcome == "Another visitor!"
         file_object.read.assert_called_once_with()
+
+
+def open_descriptors() -> int:
+    """Count the file descriptors open in this process."""
+    return len(os.listdir("/proc/self/fd"))
+
+
+class TestClose(TestCase):
+    """Testing the file.fclose function, and its use with bracket."""
+
+    def test_nok(self):
+        """With ok cleared, nothing is closed."""
+        # given
+        file_object = Mock()
+        # when
+        result = file.fclose(IOType(file_object, "", False))
+        # then
+        assert not unwrap(result).ok
+        file_object.close.assert_not_called()
+
+    def test_failed_close_clears_ok(self):
+        """A close whose final flush fails clears ok."""
+        # given
+        file_object = Mock()
+        file_object.close.side_effect = OSError(28, "No space left on device", "full.txt")
+        # when
+        result = file.fclose(IOType(file_object))
+        # then
+        assert unwrap(result).error_msg == "full.txt: No space left on device"
+
+    @skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc/self/fd")
+    def test_bracket_leaks_no_descriptors(self):
+        """Every file opened in a bracket is closed, whether reading succeeds or fails."""
+        # given
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.txt")
+            with open(path, "w", encoding="utf-8") as file_pointer:
+                file_pointer.write("Everything is awesome")
+            held = []
+
+            def read(m: Monad) -> Monad:
+                held.append(unwrap(m).outcome)  # keep the file object alive
+                return m >> file.fread
+
+            failing = Pipeline() >> (lambda io: Monad(IOType(io.outcome, "bad", False)))
+            before = open_descriptors()
+            # when
+            for i in range(2000):
+                use = read if i % 2 else failing
+                result = bracket(Monad(IOType()), file.fopen, use, file.fclose, path, "r")
+                assert unwrap(result).ok is bool(i % 2)
+            # then
+            assert open_descriptors() == before
+            assert all(file_pointer.closed for file_pointer in held)
+            assert len(held) == 1000
+
+
+class TestReadChunks(TestCase):
+    """Testing the streaming readers file.fread_chunks and file.fread_lines."""
+
+    def test_nok(self):
+        """With ok cleared, nothing is read."""
+        # given
+        file_object = Mock()
+        # when
+        result = file.fread_chunks(IOType(file_object, "", False))
+        # then
+        assert not unwrap(result).ok
+        file_object.read.assert_not_called()
+
+    def test_chunks_are_lazy(self):
+        """The file is only read as the chunks are iterated."""
+        # given
+        file_object = python_io.StringIO("abcdefg")
+        # when
+        result = unwrap(file.fread_chunks(IOType(file_object), chunk_size=3))
+        # then
+        assert file_object.tell() == 0
+        assert [chunk.outcome for chunk in result.outcome] == ["abc", "def", "g"]
+
+    def test_decodes_characters_split_between_chunks(self):
+        """A binary file is decoded without breaking multibyte characters."""
+        # given
+        file_object = python_io.BytesIO("żółw €".encode("utf-8"))
+        # when
+        result = unwrap(file.fread_chunks(IOType(file_object), chunk_size=1, encoding="utf-8"))
+        # then
+        assert "".join(chunk.outcome for chunk in result.outcome) == "żółw €"
+
+    def test_error_mid_stream_fails(self):
+        """An OSError while reading ends the stream with a failed IOType."""
+        # given
+        file_object = Mock()
+        file_object.name = "big.log"
+        file_object.read.side_effect = ["one", OSError(5, "Input/output error")]
+        # when
+        chunks = list(unwrap(file.fread_chunks(IOType(file_object))).outcome)
+        # then
+        assert chunks[0] == IOType("one", "", True)
+        assert chunks[1] == IOType("", "big.log: Input/output error", False)
+
+    def test_decode_error_fails(self):
+        """Undecodable bytes end the stream with a failed IOType, or are replaced if asked."""
+        # given
+        data = b"ok\xff"
+        # when
+        strict = list(
+            unwrap(file.fread_chunks(IOType(python_io.BytesIO(data)), encoding="utf-8")).outcome
+        )
+        replaced = unwrap(
+            file.fread_chunks(IOType(python_io.BytesIO(data)), encoding="utf-8", errors="replace")
+        )
+        # then
+        assert strict[-1].ok is False
+        assert "".join(chunk.outcome for chunk in replaced.outcome) == "ok\ufffd"
+
+    def test_lines(self):
+        """Lines are split across chunk boundaries, with or without their newlines."""
+        # given
+        text = "first\nsecond line\n\nlast"
+        # when
+        kept = unwrap(file.fread_lines(IOType(python_io.StringIO(text)), chunk_size=4))
+        stripped = unwrap(
+            file.fread_lines(IOType(python_io.BytesIO(text.encode())), 4, keepends=False)
+        )
+        # then
+        assert [line.outcome for line in kept.outcome] == text.splitlines(keepends=True)
+        assert [line.outcome for line in stripped.outcome] == [
+            line.encode() for line in text.splitlines()
+        ]
+
+    def test_lines_error_mid_stream(self):
+        """A partial line is given before the failure."""
+        # given
+        file_object = Mock()
+        file_object.read.side_effect = ["a\nb", OSError(5, "Input/output error", "x.log")]
+        # when
+        lines = list(unwrap(file.fread_lines(IOType(file_object))).outcome)
+        # then
+        assert [line.outcome for line in lines[:2]] == ["a\n", "b"]
+        assert lines[2] == IOType("", "x.log: Input/output error", False)
+
+    def test_memory_does_not_grow_with_the_file(self):
+        """Streaming a 16 MiB file holds little more than one chunk."""
+        # given
+        block = "".join(f"line {i:>12} of the log file\n" for i in range(1000))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "big.log")
+            with open(path, "w", encoding="utf-8") as file_pointer:
+                for _ in range(400):
+                    file_pointer.write(block)
+            with open(path, "r", encoding="utf-8") as file_pointer:
+                # when
+                tracemalloc.start()
+                chunks = unwrap(file.fread_chunks(IOType(file_pointer))).outcome
+                count = sum(len(chunk.outcome) for chunk in chunks)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+        # then
+        assert count == 400 * len(block)
+        assert peak < 1024 * 1024
+
+
+class TestMemoryMap(TestCase):
+    """Testing file.fmmap and file.funmap on real files."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "data.bin")
+        with open(self.path, "wb") as file_pointer:
+            file_pointer.write(bytes(range(256)) * 100)
+        self.file_pointer = open(self.path, "rb")  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.file_pointer.close()
+        self.directory.cleanup()
+
+    def test_nok(self):
+        """With ok cleared, nothing is mapped."""
+        # given
+        file_object = Mock()
+        # when
+        result = file.fmmap(IOType(file_object, "", False))
+        # then
+        assert not unwrap(result).ok
+        file_object.fileno.assert_not_called()
+
+    def test_whole_file(self):
+        """By default the whole file is mapped, read-only."""
+        # when
+        view = unwrap(file.fmmap(IOType(self.file_pointer))).outcome
+        # then
+        assert view.readonly
+        assert len(view) == 25_600
+        assert view[255] == 255
+        assert unwrap(file.funmap(IOType(view))).ok
+
+    def test_unaligned_window(self):
+        """A window may start anywhere, whatever the allocation granularity."""
+        # when
+        view = unwrap(file.fmmap(IOType(self.file_pointer), 5000, 10)).outcome
+        # then
+        assert bytes(view) == bytes(range(136, 146))
+        assert unwrap(file.funmap(IOType(view))).ok
+
+    def test_funmap_releases_the_mapping(self):
+        """After funmap, the view and the mapping are closed."""
+        # given
+        view = unwrap(file.fmmap(IOType(self.file_pointer), 10)).outcome
+        mapped = view.obj
+        # when
+        file.funmap(IOType(view))
+        # then
+        assert mapped.closed
+        with self.assertRaises(ValueError):
+            bytes(view)
+
+    def test_funmap_with_views_in_use(self):
+        """A mapping still viewed elsewhere is not closed, and funmap says so."""
+        # given
+        view = unwrap(file.fmmap(IOType(self.file_pointer))).outcome
+        other = view[:10]
+        # when
+        result = unwrap(file.funmap(IOType(view)))
+        # then
+        assert result.ok is False
+        assert bytes(other) == bytes(range(10))
+        other.release()
+
+    def test_bad_windows_fail(self):
+        """A window beyond the end, or an empty file, fails like an OSError."""
+        # given
+        empty = os.path.join(self.directory.name, "empty.bin")
+        with open(empty, "wb"):
+            pass
+        # when
+        beyond = unwrap(file.fmmap(IOType(self.file_pointer), 30_000))
+        too_long = unwrap(file.fmmap(IOType(self.file_pointer), 25_000, 1000))
+        with open(empty, "rb") as file_pointer:
+            nothing = unwrap(file.fmmap(IOType(file_pointer)))
+        # then
+        assert beyond.ok is False and beyond.error_msg.startswith(self.path)
+        assert too_long.ok is False and too_long.error_msg.startswith(self.path)
+        assert nothing.ok is False and nothing.error_msg.startswith(empty)
+
+    def test_offset_just_past_the_end(self):
+        """An offset past the end of a small file fails instead of mapping an empty view."""
+        # given
+        small = os.path.join(self.directory.name, "small.bin")
+        with open(small, "wb") as file_pointer:
+            file_pointer.write(b"12345")
+        # when
+        with open(small, "rb") as file_pointer:
+            past = unwrap(file.fmmap(IOType(file_pointer), 10))
+            at_end = unwrap(file.fmmap(IOType(file_pointer), 5))
+        # then
+        assert past == IOType("", f"{small}: offset is past the end of the file", False)
+        assert at_end.ok is False
+
+    def test_negative_window_fails(self):
+        """A negative offset or length fails like an OSError instead of raising."""
+        # when
+        offset = unwrap(file.fmmap(IOType(self.file_pointer), -1))
+        length = unwrap(file.fmmap(IOType(self.file_pointer), 0, -1))
+        # then
+        expected = IOType("", f"{self.path}: offset and length must not be negative", False)
+        assert offset == length == expected
+
+    def test_os_error(self):
+        """An OSError is reported as f_try reports it."""
+        # given
+        file_object = Mock()
+        file_object.fileno.side_effect = OSError(9, "Bad file descriptor", "closed.bin")
+        # when
+        result = unwrap(file.fmmap(IOType(file_object)))
+        # then
+        assert result == IOType("", "closed.bin: Bad file descriptor", False)
+
+
+class TestReadInto(TestCase):
+    """Testing file.freadinto and file.BufferPool."""
+
+    def test_nok(self):
+        """With ok cleared, nothing is read and no buffer is taken."""
+        # given
+        file_object = Mock()
+        pool = file.BufferPool()
+        # when
+        result = file.freadinto(IOType(file_object, "", False), 16, pool=pool)
+        # then
+        assert not unwrap(result).ok
+        file_object.readinto.assert_not_called()
+        assert pool.allocated == 0
+
+    def test_records_into_one_buffer(self):
+        """Fixed-size records are read into the caller's buffer until the end of the file."""
+        # given
+        file_object = python_io.BytesIO(b"0123456789")
+        buffer = bytearray(4)
+        records = []
+        # when
+        while True:
+            view = unwrap(file.freadinto(IOType(file_object), 4, buffer)).outcome
+            if not view:
+                break
+            records.append(bytes(view))
+            assert view.obj is buffer
+        # then
+        assert records == [b"0123", b"4567", b"89"]
+
+    def test_pooled_buffers_are_reused(self):
+        """A released buffer is handed out again."""
+        # given
+        pool = file.BufferPool(size_classes=(8, 64))
+        file_object = python_io.BytesIO(b"x" * 100)
+        # when
+        first = unwrap(file.freadinto(IOType(file_object), 5, pool=pool)).outcome
+        buffer = first.obj
+        pool.release(first)
+        second = unwrap(file.freadinto(IOType(file_object), 6, pool=pool)).outcome
+        large = unwrap(file.freadinto(IOType(file_object), 20, pool=pool)).outcome
+        # then
+        assert second.obj is buffer and len(second) == 6
+        assert len(large.obj) == 64
+        assert pool.allocated == 2
+
+    def test_pool_classes_and_limits(self):
+        """Sizes above the largest class are not pooled, and each class keeps a bounded number."""
+        # given
+        pool = file.BufferPool(size_classes=(16,), max_per_class=1)
+        # when
+        huge = pool.acquire(100)
+        small = [pool.acquire(1), pool.acquire(1)]
+        for buffer in [huge, *small]:
+            pool.release(buffer)
+        # then
+        assert len(huge) == 100
+        assert pool.acquire(1) in small
+        assert pool.allocated == 3
+
+    def test_other_buffers_are_not_pooled(self):
+        """A view of anything but a bytearray is released, and the pool does not keep it."""
+        # given
+        pool = file.BufferPool(size_classes=(8,))
+        view = memoryview(bytes(8))
+        # when
+        pool.release(view)
+        # then
+        with self.assertRaises(ValueError):
+            bytes(view)
+        assert isinstance(pool.acquire(8), bytearray)
+        assert pool.allocated == 1
+
+    def test_pool_is_thread_safe(self):
+        """Buffers are never handed to two threads at once."""
+        # given
+        pool = file.BufferPool(size_classes=(8,))
+        owners: dict = {}
+        clashes: list = []
+
+        def work():
+            for _ in range(1000):
+                buffer = pool.acquire(8)
+                if owners.setdefault(id(buffer), threading.get_ident()) != threading.get_ident():
+                    clashes.append(buffer)  # pragma: no cover
+                owners.pop(id(buffer))
+                pool.release(buffer)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        # when
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # then
+        assert not clashes
+
+    def test_failed_read_returns_the_buffer(self):
+        """An OSError clears ok, and a pooled buffer goes back to the pool."""
+        # given
+        pool = file.BufferPool(size_classes=(8,))
+        file_object = Mock()
+        file_object.readinto.side_effect = OSError(5, "Input/output error", "disk.img")
+        # when
+        result = unwrap(file.freadinto(IOType(file_object), 8, pool=pool))
+        # then
+        assert result == IOType("", "disk.img: Input/output error", False)
+        assert pool.acquire(8) is not None and pool.allocated == 1
+
+
+class TestWrite(TestCase):
+    """Testing the file.fwrite function."""
+
+    def test_nok(self):
+        """With ok cleared, nothing is written."""
+        # given
+        file_object = Mock()
+        # when
+        result = file.fwrite(IOType(file_object, "", False), "text")
+        # then
+        assert not unwrap(result).ok
+        file_object.write.assert_not_called()
+
+    def test_write_sets_ok(self):
+        """The outcome is the number of characters written."""
+        # given
+        file_object = python_io.StringIO()
+        # when
+        result = file.fwrite(IOType(file_object), "Everything is awesome")
+        # then
+        assert unwrap(result).outcome == 21
+        assert file_object.getvalue() == "Everything is awesome"
+
+    def test_failed_write_clears_ok(self):
+        """file.fwrite with an OS Error clears ok."""
+        # given
+        file_object = Mock()
+        file_object.write.side_effect = OSError(28, "No space left on device", "full.txt")
+        # when
+        result = file.fwrite(IOType(file_object), "text")
+        # then
+        assert unwrap(result).error_msg == "full.txt: No space left on device"
+
+
+def emit(io: IOType, text: str) -> Writer:
+    """Add a line of output."""
+    return Writer.tell(io, text + "\n")
+
+
+def read_text(path: str) -> str:
+    """Return the contents of a text file."""
+    with open(path, encoding="utf-8") as file_pointer:
+        return file_pointer.read()
+
+
+class TestWriteBuffer(TestCase):
+    """Testing the file.WriteBuffer sink of a Writer."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "out.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_atomic_output_appears_on_final(self):
+        """Batches go to a temporary file, which final() moves into place."""
+        # given
+        with open(self.path, "w", encoding="utf-8") as file_pointer:
+            file_pointer.write("old")
+        buffer = file.WriteBuffer(self.path, flush_bytes=4)
+        m = Writer.to(IOType(), buffer)
+        # when
+        for i in range(10):
+            m = m.flat_map(emit, str(i))
+        # then
+        assert read_text(self.path) == "old"
+        assert len(os.listdir(self.directory.name)) == 2
+        result = m.final()
+        assert unwrap(result).ok
+        assert read_text(self.path) == "".join(f"{i}\n" for i in range(10))
+        assert os.listdir(self.directory.name) == ["out.txt"]
+        assert buffer.close().outcome == 20
+
+    def test_batches_wait_for_a_threshold(self):
+        """Nothing is written until flush_bytes are waiting, or flush_seconds have passed."""
+        # given
+        buffer = file.WriteBuffer(self.path, flush_bytes=6, flush_seconds=60, atomic=False)
+        # when
+        buffer.write("ab")
+        buffer.write("cd")
+        before = read_text(self.path) if os.path.exists(self.path) else None
+        buffer.write("ef")
+        # then
+        assert before is None
+        assert read_text(self.path) == "abcdef"
+        buffer.flush_seconds = 0
+        buffer.write("g")
+        assert read_text(self.path) == "abcdefg"
+        buffer.close()
+
+    def test_background_thread_writes_the_batches(self):
+        """A background thread writes once flush_seconds have passed, without another write."""
+        # given
+        buffer = file.WriteBuffer(self.path, flush_seconds=0.01, atomic=False, background=True)
+        # when
+        buffer.write("Everything is awesome")
+        for _ in range(200):
+            if os.path.exists(self.path) and read_text(self.path):
+                break
+            time.sleep(0.01)
+        # then
+        assert read_text(self.path) == "Everything is awesome"
+        assert buffer.close().ok
+        assert not buffer.write("late").ok
+
+    def test_producers_in_threads(self):
+        """Writes from many threads are all kept, each whole."""
+        # given
+        buffer = file.WriteBuffer(self.path, flush_bytes=64, background=True)
+
+        def produce(n: int):
+            for i in range(500):
+                buffer.write(f"{n}:{i}\n")
+
+        threads = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+        # when
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result = buffer.close()
+        # then
+        lines = read_text(self.path).splitlines()
+        assert result.ok and len(lines) == 2000
+        assert {f"{n}:{i}" for n in range(4) for i in range(500)} == set(lines)
+
+    def test_failed_chain_leaves_the_file_alone(self):
+        """A chain that fails discards the output, and the temporary file."""
+        # given
+        m = Writer.to(IOType(), file.WriteBuffer(self.path, flush_bytes=1))
+        # when
+        m = m.flat_map(emit, "partial") >> (lambda io: Writer(IOType("", "bad", False)))
+        m.final()
+        # then
+        assert not os.listdir(self.directory.name)
+
+    def test_errors_fail_the_chain(self):
+        """A file that cannot be written fails the chain with the error of f_try."""
+        # given
+        path = os.path.join(self.directory.name, "missing", "out.txt")
+        m = Writer.to(IOType(), file.WriteBuffer(path, flush_bytes=1))
+        # when
+        result = m.flat_map(emit, "a").flat_map(emit, "b").final()
+        # then
+        assert unwrap(result).ok is False
+        assert unwrap(result).error_msg.endswith("No such file or directory")
+
+    def test_atomic_cannot_append(self):
+        """Appending is only possible without atomic replacement."""
+        with self.assertRaises(ValueError):
+            file.WriteBuffer(self.path, "a")
+
+    def test_wrong_data_type_fails(self):
+        """A str written to a binary buffer, or bytes to a text one, fails without raising."""
+        # given
+        binary = file.WriteBuffer(self.path, "wb", flush_bytes=1, atomic=False)
+        # when
+        wrong = binary.write("text")
+        right = binary.write(b"bytes")
+        # then
+        assert wrong == IOType("", f"{self.path}: mode 'wb' writes bytes, not str", False)
+        assert right.ok
+        assert binary.close().outcome == 5
+        assert repr(binary) == f"WriteBuffer({self.path!r})"
+        assert not file.WriteBuffer(self.path, flush_bytes=1).write(b"bytes").ok
+
+    def test_failure_is_sticky(self):
+        """After a batch fails, every write and flush returns that failure."""
+        # given
+        buffer = file.WriteBuffer(os.path.join(self.directory.name, "missing", "out.txt"))
+        failed = buffer.flush()
+        # when
+        written = buffer.write("more")
+        flushed = buffer.flush()
+        # then
+        assert failed.ok is False
+        assert written == flushed == failed
+        assert buffer.close() == failed
+
+    def test_failed_write_is_returned(self):
+        """A batch the operating system refuses fails the write that started it."""
+        # given
+        buffer = file.WriteBuffer(self.path, flush_bytes=1)
+        # when
+        with patch.object(buffer, "_write", side_effect=OSError(28, "No space left", self.path)):
+            result = buffer.write("a")
+        # then
+        assert result == IOType("", f"{self.path}: No space left", False)
+        assert buffer.close() == result
+        assert not os.listdir(self.directory.name)
+
+    def test_unencodable_write_fails(self):
+        """A batch the encoding cannot hold fails the buffer instead of raising or being lost."""
+        # given
+        with open(self.path, "w", encoding="utf-8") as file_pointer:
+            file_pointer.write("old")
+        buffer = file.WriteBuffer(self.path, encoding="ascii", flush_bytes=4)
+        buffer.write("abc")
+        # when
+        failed = buffer.write("é")
+        later = buffer.write("xyz!")
+        closed = buffer.close()
+        # then
+        assert failed.ok is False and failed.error_msg.startswith(f"{self.path}: ")
+        assert "encode" in failed.error_msg
+        assert later == closed == failed
+        assert read_text(self.path) == "old"
+        assert os.listdir(self.directory.name) == ["out.txt"]
+
+    def test_failed_commit_leaves_the_file_alone(self):
+        """If the temporary file cannot be moved into place, it is removed and close fails."""
+        # given
+        with open(self.path, "w", encoding="utf-8") as file_pointer:
+            file_pointer.write("old")
+        buffer = file.WriteBuffer(self.path)
+        buffer.write("new")
+        # when
+        with patch("os.replace", side_effect=OSError(13, "Permission denied", self.path)):
+            result = buffer.close()
+        # then
+        assert result == IOType("", f"{self.path}: Permission denied", False)
+        assert read_text(self.path) == "old"
+        assert os.listdir(self.directory.name) == ["out.txt"]
+
+    def test_discard_ignores_errors(self):
+        """Discarding closes what it can and leaves file_path alone."""
+        # given
+        broken = Mock()
+        broken.close.side_effect = OSError(5, "Input/output error")
+        buffer = file.WriteBuffer(self.path)
+        buffer._file = broken  # pylint: disable=protected-access
+        unopened = file.WriteBuffer(self.path)
+        # when
+        buffer.discard()
+        unopened.discard()
+        # then
+        broken.close.assert_called_once_with()
+        assert buffer.close().ok is False
+        assert unopened.close().error_msg.endswith("the buffer was discarded")
+        assert not os.listdir(self.directory.name)
+
+    def test_background_error_is_kept(self):
+        """An exception in the background thread fails the later calls instead of being lost."""
+        # given
+        buffer = file.WriteBuffer(self.path, flush_seconds=0.01, atomic=False, background=True)
+        # when
+        with patch.object(buffer, "_write", side_effect=RuntimeError("bad batch")):
+            buffer.write("a")
+            for _ in range(200):
+                if not buffer.write("").ok:
+                    break
+                time.sleep(0.01)
+        # then
+        assert buffer.write("b") == IOType("", f"{self.path}: bad batch", False)
+        assert buffer.close().ok is False
@@ -1,12 +1,19 @@
 """Testing the monad-wrapped file module."""
 
+import asyncio
+import io as pyio
+import os
+import pathlib
+import tempfile
+import tracemalloc
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
+import jinja2
 from jinja2 import Template
 from jinja2.exceptions import TemplateNotFound
 
-from fpsupport import jinja
+from fpsupport import file, jinja
 from fpsupport.monad import Monad, unwrap
 from fpsupport.struct import IOType
 
@@ -14,6 +21,10 @@ from fpsupport.struct import IOType
 class TestLoadTemplate(TestCase):
     """Testing the jinja.load_template function with unit and integration tests."""
 
+    def setUp(self):
+        """Start each test with an empty template cache."""
+        jinja.TEMPLATE_CACHE.clear()
+
     @patch("fpsupport.jinja.jinja2")
     def test_nok(self, jj2):
         """jinja.load_template with a monad's ok cleared should not run os.open."""
@@ -55,6 +66,266 @@ class TestLoadTemplate(TestCase):
         assert new_io.outcome == "template"
 
 
+class TestTemplateCache(TestCase):
+    """Testing that jinja.load_template reuses environments and compiled templates."""
+
+    def setUp(self):
+        """Create a template on disk and an empty template cache."""
+        jinja.TEMPLATE_CACHE.clear()
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = pathlib.Path(self.directory.name) / "greeting.j2"
+        self.path.write_text("Hello {{ to }}", encoding="utf-8")
+
+    def tearDown(self):
+        """Remove the template directory."""
+        self.directory.cleanup()
+
+    def test_second_load_is_a_hit(self):
+        """Loading the same path twice compiles the template once."""
+        # when
+        first = unwrap(jinja.load_template(IOType(""), str(self.path)))
+        second = unwrap(jinja.load_template(IOType(""), str(self.path)))
+        # then
+        assert first.outcome is second.outcome
+        info = jinja.TEMPLATE_CACHE.info()
+        assert info["templates"].hits == 1
+        assert info["templates"].misses == 1
+        assert info["environments"].currsize == 1
+
+    def test_changed_file_is_reloaded(self):
+        """A change in size or mtime invalidates the cached template."""
+        # given
+        first = unwrap(jinja.load_template(IOType(""), str(self.path)))
+        self.path.write_text("Goodbye {{ to }}", encoding="utf-8")
+        os.utime(self.path, ns=(1, 1))
+        # when
+        second = unwrap(jinja.load_template(IOType(""), str(self.path)))
+        # then
+        assert first.outcome is not second.outcome
+        assert second.outcome.render(to="Mum") == "Goodbye Mum"
+        assert jinja.TEMPLATE_CACHE.info()["templates"].invalidations == 1
+
+    def test_change_of_size_alone_is_reloaded(self):
+        """A file rewritten with its mtime unchanged is reloaded because its size changed."""
+        # given
+        self.path.write_text("one", encoding="utf-8")
+        os.utime(self.path, ns=(1, 1))
+        first = unwrap(jinja.load_template(IOType(""), str(self.path)))
+        self.path.write_text("three!", encoding="utf-8")
+        os.utime(self.path, ns=(1, 1))
+        # when
+        second = unwrap(jinja.load_template(IOType(""), str(self.path)))
+        # then
+        assert first.outcome.render() == "one"
+        assert second.outcome.render() == "three!"
+        assert jinja.TEMPLATE_CACHE.info()["templates"].invalidations == 1
+
+    def test_skipping_the_stat_check_trusts_the_cache(self):
+        """With check_mtime False, a changed file is not noticed."""
+        # given
+        first = unwrap(jinja.load_template(IOType(""), str(self.path), check_mtime=False))
+        self.path.write_text("Goodbye {{ to }}", encoding="utf-8")
+        # when
+        second = unwrap(jinja.load_template(IOType(""), str(self.path), check_mtime=False))
+        # then
+        assert first.outcome is second.outcome
+
+    def test_templates_are_evicted(self):
+        """The least recently used template is dropped once the cache is full."""
+        # given
+        cache = jinja.TemplateCache(max_environments=1, max_templates=1)
+        other = pathlib.Path(self.directory.name) / "other.j2"
+        other.write_text("{{ to }}", encoding="utf-8")
+        # when
+        cache.get_template(str(self.path))
+        cache.get_template(str(other))
+        # then
+        assert cache.info()["templates"].evictions == 1
+        assert cache.info()["templates"].currsize == 1
+
+
+class TestPrecompiledTemplates(TestCase):
+    """Testing the on-disk bytecode cache and ahead-of-time compilation."""
+
+    def setUp(self):
+        """Create a small template tree."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.root = pathlib.Path(self.directory.name) / "templates"
+        (self.root / "mail").mkdir(parents=True)
+        (self.root / "base.j2").write_text("[{% block body %}{% endblock %}]", encoding="utf-8")
+        (self.root / "mail" / "layout.j2").write_text(
+            "[{% block body %}{% endblock %}]", encoding="utf-8"
+        )
+        (self.root / "mail" / "greeting.j2").write_text(
+            '{% extends "layout.j2" %}{% block body %}Hello {{ to }}{% endblock %}',
+            encoding="utf-8",
+        )
+        self.target = str(pathlib.Path(self.directory.name) / "templates.fpsj")
+
+    def tearDown(self):
+        """Remove the template tree."""
+        self.directory.cleanup()
+
+    def test_nok(self):
+        """jinja.precompile_templates with a monad's ok cleared writes nothing."""
+        # when
+        result = jinja.precompile_templates(IOType("", "", False), str(self.root), self.target)
+        # then
+        assert not unwrap(result).ok
+        assert not os.path.exists(self.target)
+
+    def test_precompiled_templates_are_loaded_from_the_archive(self):
+        """A registered archive is used for templates in subdirectories as well."""
+        # given
+        jinja.TEMPLATE_CACHE.clear()
+        jinja.TEMPLATE_CACHE.precompiled.clear()
+        compiled = unwrap(jinja.precompile_templates(IOType(""), str(self.root), self.target))
+        # when
+        loaded = unwrap(jinja.load_precompiled(IOType(""), str(self.root), self.target))
+        result = unwrap(
+            jinja.load_template(IOType(""), str(self.root / "mail" / "greeting.j2"))
+        ).outcome
+        # then
+        jinja.TEMPLATE_CACHE.precompiled.clear()
+        assert compiled.ok
+        assert compiled.outcome == self.target
+        assert loaded.outcome == 3
+        assert isinstance(result.environment.loader, jinja2.ChoiceLoader)
+        assert result.render(to="Mum") == "[Hello Mum]"
+
+    def test_archive_does_not_change_includes(self):
+        """A template in a subdirectory includes the same templates with or without an archive."""
+        # given
+        cache = jinja.TemplateCache()
+        (self.root / "b.j2").write_text("root-b", encoding="utf-8")
+        (self.root / "mail" / "b.j2").write_text("sub-b", encoding="utf-8")
+        (self.root / "mail" / "a.j2").write_text('A[{% include "b.j2" %}]', encoding="utf-8")
+        compiled = unwrap(jinja.precompile_templates(IOType(""), str(self.root), self.target))
+        codes = jinja._read_archive(self.target)  # pylint: disable=protected-access
+        before = cache.get_template(str(self.root / "mail" / "a.j2")).render()
+        # when
+        cache.add_precompiled(str(self.root), codes)
+        after = cache.get_template(str(self.root / "mail" / "a.j2"))
+        # then
+        assert compiled.ok
+        assert before == after.render() == "A[sub-b]"
+        assert sorted(after.environment.loader.loaders[0].list_templates()) == [
+            "a.j2",
+            "b.j2",
+            "greeting.j2",
+            "layout.j2",
+        ]
+
+    def test_templates_missing_from_the_archive_are_loaded_from_disk(self):
+        """The precompiled loader defers to the file system for new templates."""
+        # given
+        cache = jinja.TemplateCache()
+        cache.add_precompiled(str(self.root), {})
+        # when
+        template = cache.get_template(str(self.root / "base.j2"))
+        # then
+        assert template.render() == "[]"
+        assert jinja.PrecompiledLoader({"b": None, "a": None}).list_templates() == ["a", "b"]
+
+    def test_globals_are_passed_through(self):
+        """The loader uses the globals the environment gives it, as jinja2's loaders do."""
+        # given
+        environment = jinja2.Environment()
+        code = environment.compile("{{ site }} {{ page }}", "page.j2")
+        environment.loader = jinja.PrecompiledLoader({"page.j2": code})
+        environment.globals["site"] = "fpsupport"
+        given = {"page": 2}
+        # when
+        template = environment.get_template("page.j2", globals={"page": 1})
+        loaded = environment.loader.load(environment, "page.j2", given)
+        bare = environment.loader.load(environment, "page.j2")
+        # then
+        assert template.render() == "fpsupport 1"
+        assert loaded.globals is given
+        assert bare.render(site="a", page=3) == "a 3"
+
+    def test_foreign_archive_clears_ok(self):
+        """An archive that was not written by precompile_templates is refused."""
+        # given
+        pathlib.Path(self.target).write_bytes(b"PK\x03\x04")
+        # when
+        result = unwrap(jinja.load_precompiled(IOType(""), str(self.root), self.target))
+        # then
+        assert not result.ok
+        assert "not a template archive" in result.error_msg
+
+    def test_truncated_archive_clears_ok(self):
+        """A damaged archive is refused."""
+        # given
+        jinja.precompile_templates(IOType(""), str(self.root), self.target)
+        data = pathlib.Path(self.target).read_bytes()
+        pathlib.Path(self.target).write_bytes(data[:-10])
+        # when
+        result = unwrap(jinja.load_precompiled(IOType(""), str(self.root), self.target))
+        # then
+        assert not result.ok
+
+    def test_missing_archive_clears_ok(self):
+        """An archive that cannot be read is reported instead of raised."""
+        # when
+        result = unwrap(jinja.load_precompiled(IOType(""), str(self.root), self.target))
+        # then
+        assert not result.ok
+        assert result.error_msg.endswith("No such file or directory")
+
+    def test_archive_inside_the_tree_is_skipped(self):
+        """Writing the archive into the template directory does not compile the archive."""
+        # given
+        target = str(self.root / "templates.fpsj")
+        jinja.precompile_templates(IOType(""), str(self.root), target)
+        # when
+        result = unwrap(jinja.precompile_templates(IOType(""), str(self.root), target, ["j2"]))
+        # then
+        assert result.ok
+
+    def test_syntax_error_clears_ok(self):
+        """A template that does not compile is reported instead of raised."""
+        # given
+        (self.root / "broken.j2").write_text("{% if %}", encoding="utf-8")
+        # when
+        result = unwrap(jinja.precompile_templates(IOType(""), str(self.root), self.target))
+        # then
+        assert not result.ok
+        assert "broken.j2:1" in result.error_msg
+
+    def test_undecodable_template_clears_ok(self):
+        """A file that is not text is reported instead of raised."""
+        # given
+        (self.root / "image.png").write_bytes(b"\x89PNG\x9c")
+        # when
+        result = unwrap(jinja.precompile_templates(IOType(""), str(self.root), self.target))
+        # then
+        assert not result.ok
+
+    def test_unwritable_target_clears_ok(self):
+        """An OSError writing the archive is reported instead of raised."""
+        # given
+        target = str(pathlib.Path(self.directory.name) / "missing" / "templates.fpsj")
+        # when
+        result = unwrap(jinja.precompile_templates(IOType(""), str(self.root), target))
+        # then
+        assert not result.ok
+        assert result.error_msg.endswith("No such file or directory")
+
+    def test_bytecode_cache_is_written(self):
+        """With a bytecode directory, compiled templates are stored on disk."""
+        # given
+        bytecode_dir = pathlib.Path(self.directory.name) / "bytecode"
+        bytecode_dir.mkdir()
+        cache = jinja.TemplateCache()
+        # when
+        cache.set_bytecode_dir(str(bytecode_dir))
+        template = cache.get_template(str(self.root / "base.j2"))
+        # then
+        assert template.render() == "[]"
+        assert len(list(bytecode_dir.iterdir())) == 1
+
+
 class TestRender(TestCase):
     """Testing the jinja.render function with unit and integration tests."""
 
@@ -102,6 +373,258 @@ class TestRender(TestCase):
         assert new_io.outcome == "bar"
 
 
+class TestRenderCache(TestCase):
+    """Testing jinja.render and jinja.render_from_file with a RenderCache."""
+
+    def test_repeated_render_is_a_hit(self):
+        """The same template and equal data render once."""
+        # given
+        cache = jinja.RenderCache()
+        template = Template("{{ to }}")
+        io = Monad(IOType(template))
+        # when
+        first = unwrap(io.flat_map(jinja.render, {"to": "Mum", "x": 1}, cache))
+        second = unwrap(io.flat_map(jinja.render, {"x": 1, "to": "Mum"}, cache))
+        # then
+        assert first.outcome == second.outcome == "Mum"
+        assert cache.info().hits == 1
+        assert cache.info().misses == 1
+
+    def test_unhashable_data_is_not_cached(self):
+        """Data that cannot be fingerprinted is rendered without the cache."""
+        # given
+        cache = jinja.RenderCache()
+        # when
+        result = unwrap(jinja.render(IOType(Template("{{ to }}")), {"to": object}, cache))
+        # then
+        assert result.ok
+        assert cache.info().currsize == 0
+
+    def test_excluded_template_is_not_cached(self):
+        """A template excluded by name is always rendered."""
+        # given
+        cache = jinja.RenderCache()
+        cache.exclude("clock.j2")
+        template = jinja2.Environment(
+            loader=jinja2.DictLoader({"clock.j2": "{{ to }}"})
+        ).get_template("clock.j2")
+        # when
+        jinja.render(IOType(template), {"to": "Mum"}, cache)
+        # then
+        assert cache.info().currsize == 0
+
+    def test_max_bytes_counts_utf8_bytes(self):
+        """Outputs are measured in bytes, not characters."""
+        # given
+        cache = jinja.RenderCache(max_bytes=5)
+        template = Template("{{ text }}")
+        # when
+        jinja.render(IOType(template), {"text": "ééé"}, cache)
+        accented = cache.info().currsize
+        jinja.render(IOType(template), {"text": "eee"}, cache)
+        # then
+        assert accented == 0
+        assert cache.info().currsize == 1
+
+    def test_render_from_file_uses_the_cache(self):
+        """render_from_file passes the cache on to render."""
+        # given
+        cache = jinja.RenderCache(maxsize=1)
+        io = Monad(IOType(Template("{{ foo }}"), "", None))
+        # when
+        jinja.render_from_file(io, "filepath.j2", {"foo": "bar"}, cache)
+        result = jinja.render_from_file(io, "filepath.j2", {"foo": "bar"}, cache)
+        # then
+        assert result == "bar"
+        assert cache.info().hits == 1
+        cache.clear()
+        assert cache.info().currsize == 0
+
+
+class TestRenderAsync(TestCase):
+    """Testing jinja.render_async and asynchronous templates."""
+
+    def test_nok_bad_template(self):
+        """jinja.render_async with a type other than jinja2.Template returns the IOType."""
+        # given
+        io = IOType("string_not_template", "unit test", False)
+        # when
+        result = asyncio.run(jinja.render_async(io, {"foo": "bar"}))
+        # then
+        assert unwrap(result) is io
+
+    def test_nok_bad_data(self):
+        """jinja.render_async with data other than a dict clears ok."""
+        # when
+        data = "not a dict"
+        result = asyncio.run(jinja.render_async(IOType(Template("x")), data))  # type: ignore
+        # then
+        assert not unwrap(result).ok
+
+    def test_sync_template_renders_in_a_thread(self):
+        """A template loaded without enable_async is still rendered."""
+        # when
+        result = asyncio.run(jinja.render_async(IOType(Template("{{ foo }}")), {"foo": "bar"}))
+        # then
+        assert unwrap(result).outcome == "bar"
+
+    def test_async_template_is_generated(self):
+        """A template loaded with enable_async renders the same output as render."""
+        # given
+        jinja.TEMPLATE_CACHE.clear()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lines.j2")
+            pathlib.Path(path).write_text(
+                "{% for i in range(200) %}{{ i }},{% endfor %}", encoding="utf-8"
+            )
+            sync = unwrap(jinja.load_template(IOType(""), path)).outcome
+            io = unwrap(jinja.load_template(IOType(""), path, enable_async=True))
+            # when
+            result = asyncio.run(jinja.render_async(io, {}))
+        # then
+        assert io.outcome.environment.is_async
+        assert not sync.environment.is_async
+        assert unwrap(result).outcome == sync.render()
+
+
+class TestRenderMany(TestCase):
+    """Testing the jinja.render_many batch function."""
+
+    def test_nok_bad_template(self):
+        """jinja.render_many with a type other than jinja2.Template returns the IOType."""
+        # given
+        io = IOType("string_not_template", "unit test", False)
+        # when
+        result = jinja.render_many(io, [{"foo": "bar"}])
+        # then
+        assert unwrap(result) is io
+
+    def test_rows_are_rendered_lazily(self):
+        """Rows are pulled from the iterable only as the outcome is consumed."""
+        # given
+        pulled = []
+
+        def rows():
+            for i in range(3):
+                pulled.append(i)
+                yield {"foo": i}
+
+        io = IOType(Template("{{ foo }}"))
+        # when
+        outcome = unwrap(jinja.render_many(io, rows())).outcome
+        first = next(outcome)
+        # then
+        assert pulled == [0]
+        assert first.ok and first.outcome == "0"
+        assert [row.outcome for row in outcome] == ["1", "2"]
+
+    def test_bad_rows_do_not_stop_the_batch(self):
+        """A row that is not a dict, or that fails to render, is recorded as a failure."""
+        # given
+        io = IOType(Template("{{ foo }}{% if foo %}{{ foo.bar() }}{% endif %}"))
+        rows = [{"foo": ""}, "not a dict", {"foo": 1}, {"foo": ""}]
+        # when
+        results = list(unwrap(jinja.render_many(io, rows)).outcome)  # type: ignore
+        # then
+        assert [result.ok for result in results] == [True, False, False, True]
+        assert results[1].error_msg.startswith("row 1: data invalid type")
+        assert results[2].error_msg.startswith("row 2: ")
+
+    def test_python_errors_do_not_stop_the_batch(self):
+        """An error that is not a Jinja error fails its row only."""
+        # given
+        io = IOType(Template("{{ 10 // n }}"))
+        rows = [{"n": 1}, {"n": 0}, {"n": 2}]
+        # when
+        results = list(unwrap(jinja.render_many(io, rows)).outcome)  # type: ignore
+        # then
+        assert [result.outcome for result in results] == ["10", "", "5"]
+        assert results[1].error_msg.startswith("row 1: ZeroDivisionError: ")
+
+
+class TestRenderStream(TestCase):
+    """Testing the jinja.render_stream function."""
+
+    def test_nok(self):
+        """jinja.render_stream with a monad's ok cleared writes nothing."""
+        # given
+        file_pointer = Mock()
+        io = IOType(Template("{{ foo }}"), "", False)
+        # when
+        result = jinja.render_stream(io, {"foo": "bar"}, file_pointer)
+        # then
+        assert not unwrap(result).ok
+        file_pointer.write.assert_not_called()
+
+    def test_nok_bad_template(self):
+        """jinja.render_stream with a type other than jinja2.Template returns the IOType."""
+        # given
+        io = IOType("string_not_template")
+        # when
+        result = jinja.render_stream(io, {"foo": "bar"}, Mock())
+        # then
+        assert unwrap(result) is io
+
+    def test_nok_bad_data(self):
+        """jinja.render_stream with data other than a dict clears ok."""
+        # when
+        result = jinja.render_stream(IOType(Template("x")), "not a dict", Mock())  # type: ignore
+        # then
+        assert not unwrap(result).ok
+
+    def test_chunks_are_written_in_buffers(self):
+        """Output is written in batches of at least buffer_size characters."""
+        # given
+        file_pointer = Mock()
+        io = IOType(Template("{% for i in range(10) %}ab{% endfor %}"))
+        # when
+        result = jinja.render_stream(io, {}, file_pointer, buffer_size=8)
+        # then
+        assert unwrap(result).outcome == 20
+        writes = [call.args[0] for call in file_pointer.write.call_args_list]
+        assert writes == ["abababab", "abababab", "abab"]
+
+    def test_failed_write_clears_ok(self):
+        """An OSError from the file is reported instead of raised."""
+        # given
+        file_pointer = Mock()
+        file_pointer.write.side_effect = OSError(28, "No space left on device", "out.txt")
+        # when
+        result = jinja.render_stream(IOType(Template("{{ foo }}")), {"foo": "bar"}, file_pointer)
+        # then
+        assert not unwrap(result).ok
+        assert unwrap(result).error_msg == "out.txt: No space left on device"
+
+    def test_failed_render_clears_ok(self):
+        """A template error part-way through the output is reported instead of raised."""
+        # given
+        io = IOType(Template("{{ foo }}{{ foo.bar() }}"))
+        # when
+        result = jinja.render_stream(io, {"foo": 1}, pyio.StringIO())
+        # then
+        assert not unwrap(result).ok
+
+    def test_memory_does_not_grow_with_output(self):
+        """Streaming megabytes of output through fopen keeps the peak allocation small."""
+        # given
+        template = Template("{% for i in range(count) %}line {{ i }} of the report\n{% endfor %}")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.txt")
+            file_pointer = unwrap(file.fopen(IOType(""), path, "w", encoding="utf-8")).outcome
+            # when
+            tracemalloc.start()
+            result = jinja.render_stream(
+                IOType(template), {"count": 100000}, file_pointer, buffer_size=4096
+            )
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            file_pointer.close()
+            # then
+            assert unwrap(result).outcome == os.path.getsize(path)
+            assert os.path.getsize(path) > 2_000_000
+            assert peak < 500_000
+
+
 class TestRenderFromFile(TestCase):
     """Testing the jinja.render_from_file convenience function.
 
@@ -118,3 +641,135 @@ class TestRenderFromFile(TestCase):
         template = Template("{{ foo }}")
         io = Monad(IOType(template, "", None))
         assert jinja.render_from_file(io, "filepath.j2", {"foo": "bar"}) == "bar"
+
+
+class TestRenderParallel(TestCase):
+    """Testing the jinja.render_parallel process pool."""
+
+    def setUp(self):
+        """Create a template on disk."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = str(pathlib.Path(self.directory.name) / "row.j2")
+        pathlib.Path(self.path).write_text("{{ 10 // n }}", encoding="utf-8")
+
+    def tearDown(self):
+        """Remove the template directory."""
+        self.directory.cleanup()
+
+    def test_nok(self):
+        """jinja.render_parallel with a monad's ok cleared starts no processes."""
+        # given
+        io = IOType("", "unit test", False)
+        # when
+        result = jinja.render_parallel(io, self.path, [{"n": 1}])
+        # then
+        assert unwrap(result) is io
+
+    def test_invalid_sizes_fail(self):
+        """A chunk_size below 1, or a negative number of workers, fails without a pool."""
+        # when
+        empty = jinja.render_parallel(IOType(""), self.path, [{"n": 1}], chunk_size=0)
+        negative = jinja.render_parallel(IOType(""), self.path, [{"n": 1}], workers=-1)
+        # then
+        assert unwrap(empty).ok is False
+        assert unwrap(empty).error_msg == "chunk_size must be at least 1, not 0"
+        assert unwrap(negative).error_msg == "workers must not be negative, not -1"
+
+    def test_worker_functions(self):
+        """A worker loads the template and renders its chunks, or fails them if it could not."""
+        # given
+        # pylint: disable=protected-access
+        saved = jinja._WORKER_IO
+        try:
+            # when
+            uninitialized = jinja._render_chunk(0, [{"n": 1}])
+            jinja._init_worker(self.path)
+            rendered = jinja._render_chunk(3, [{"n": 2}, {"n": 0}])
+        finally:
+            jinja._WORKER_IO = saved
+        # then
+        assert uninitialized == [IOType("", "worker not initialized", False)]
+        assert rendered[0] == IOType("5", "", True)
+        assert rendered[1].error_msg.startswith("row 4: ZeroDivisionError")
+
+    def test_ordered_results(self):
+        """Results come back in input order, with failures in place."""
+        # given
+        rows = [{"n": n} for n in (1, 2, 0, 5)] + ["not a dict"]
+        # when
+        outcome = unwrap(
+            jinja.render_parallel(IOType(""), self.path, iter(rows), workers=2, chunk_size=2)
+        ).outcome
+        results = list(outcome)
+        # then
+        assert [index for index, _ in results] == [0, 1, 2, 3, 4]
+        assert [io.outcome for _, io in results[:2]] == ["10", "5"]
+        assert not results[2][1].ok
+        assert results[2][1].error_msg.startswith("row 2: ZeroDivisionError")
+        assert results[3][1].outcome == "2"
+        assert results[4][1].error_msg.startswith("row 4: data invalid type")
+
+    def test_rows_are_read_as_workers_become_free(self):
+        """Only two chunks per worker are read ahead of the results."""
+        # given
+        read = []
+
+        def rows():
+            for n in range(1, 7):
+                read.append(n)
+                yield {"n": n}
+
+        outcome = unwrap(
+            jinja.render_parallel(IOType(""), self.path, rows(), workers=1, chunk_size=1)
+        ).outcome
+        # when
+        first = next(outcome)
+        ahead = len(read)
+        rest = list(outcome)
+        # then
+        assert first[1].outcome == "10"
+        assert ahead <= 3
+        assert [index for index, _ in rest] == [1, 2, 3, 4, 5]
+
+    def test_unordered_results(self):
+        """Results come back as they complete, each paired with its input index."""
+        # given
+        rows = [{"n": n} for n in range(1, 11)]
+        # when
+        results = dict(
+            unwrap(
+                jinja.render_parallel(
+                    IOType(""), self.path, rows, workers=2, chunk_size=3, ordered=False
+                )
+            ).outcome
+        )
+        # then
+        assert {index: io.outcome for index, io in results.items()} == {
+            i: str(10 // (i + 1)) for i in range(10)
+        }
+
+    def test_missing_template_fails_every_row(self):
+        """If the workers cannot load the template, every row reports why."""
+        # when
+        results = list(
+            unwrap(
+                jinja.render_parallel(IOType(""), "missing/row.j2", [{"n": 1}] * 3, workers=1)
+            ).outcome
+        )
+        # then
+        assert [io.ok for _, io in results] == [False, False, False]
+        assert results[0][1].error_msg.startswith("'row.j2' not found")
+
+    def test_unpicklable_row_fails_its_chunk(self):
+        """A row that cannot be sent to a worker fails its chunk instead of raising."""
+        # given
+        rows = [{"n": 1}, {"n": lambda: 1}, {"n": 2}]
+        # when
+        results = list(
+            unwrap(
+                jinja.render_parallel(IOType(""), self.path, rows, workers=1, chunk_size=2)
+            ).outcome
+        )
+        # then
+        assert [io.ok for _, io in results] == [False, False, True]
+        assert results[0][1].error_msg.startswith("row 0: ")
@@ -0,0 +1,203 @@
+"""Testing the metrics of @side_effect functions."""
+
+import asyncio
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+import pytest
+
+from fpsupport import decorator
+from fpsupport.decorator import side_effect
+from fpsupport.metrics import Metrics, error_category, write_prometheus
+from fpsupport.monad import Monad, unwrap
+from fpsupport.struct import IOType
+
+
+@side_effect
+def echo(io: IOType) -> Monad:
+    """Return the incoming IOType, failing when asked to."""
+    return Monad(IOType(io.outcome, io.error_msg, io.outcome != "fail"))
+
+
+@side_effect
+def explode(io: IOType) -> Monad:
+    """Raise."""
+    raise ValueError(io.outcome)
+
+
+@side_effect
+async def async_echo(io: IOType) -> Monad:
+    """Return the incoming IOType asynchronously."""
+    await asyncio.sleep(0)
+    return Monad(io)
+
+
+@side_effect
+async def async_explode(io: IOType) -> Monad:
+    """Raise asynchronously."""
+    await asyncio.sleep(0)
+    raise ValueError(io.outcome)
+
+
+@side_effect
+def undecided(io: IOType) -> Monad:
+    """Return a result that is neither ok nor failed."""
+    return Monad(IOType(io.outcome, "", None))
+
+
+ECHO = f"{__name__}.echo"
+
+
+class TestMetrics(TestCase):
+    """Testing the Metrics collector."""
+
+    def tearDown(self):
+        decorator.set_metrics(None)
+
+    def test_off_by_default(self):
+        """Nothing is collected until a collector is enabled."""
+        # given
+        metrics = Metrics()
+        # when
+        echo(IOType("a"))
+        # then
+        assert not metrics.snapshot()
+
+    def test_results_are_counted(self):
+        """Each call is counted as ok, failed, skipped or error."""
+        # when
+        with Metrics() as metrics:
+            echo(IOType("a"))
+            echo(IOType("fail", "/tmp/x: No such file or directory", True))
+            echo(IOType("a", "", False))
+            echo(IOType("a", "", None))
+            with pytest.raises(ValueError):
+                explode(IOType("boom"))
+        echo(IOType("after"))
+        # then
+        snapshot = metrics.snapshot()
+        assert snapshot[ECHO]["results"] == {"ok": 1, "failed": 1, "skipped": 2, "error": 0}
+        assert snapshot[ECHO]["errors"] == {"No such file or directory": 1}
+        assert snapshot[f"{__name__}.explode"]["errors"] == {"ValueError": 1}
+        assert sum(snapshot[ECHO]["buckets"]) == 2
+
+    def test_async_functions_are_measured(self):
+        """Coroutine functions are timed when awaited."""
+        # when
+        with Metrics() as metrics:
+            result = asyncio.run(async_echo(IOType("a")))
+        # then
+        assert unwrap(result).outcome == "a"
+        assert metrics.snapshot()[f"{__name__}.async_echo"]["results"]["ok"] == 1
+
+    def test_async_skips_and_exceptions_are_counted(self):
+        """Coroutine functions count their skips and exceptions as the others do."""
+        # when
+        with Metrics() as metrics:
+            skipped = asyncio.run(async_echo(IOType("a", "", False)))
+            with pytest.raises(ValueError):
+                asyncio.run(async_explode(IOType("boom")))
+        # then
+        snapshot = metrics.snapshot()
+        assert unwrap(skipped).ok is False
+        assert snapshot[f"{__name__}.async_echo"]["results"]["skipped"] == 1
+        assert snapshot[f"{__name__}.async_explode"]["results"]["error"] == 1
+        assert snapshot[f"{__name__}.async_explode"]["errors"] == {"ValueError": 1}
+
+    def test_undecided_result_is_skipped(self):
+        """A result with ok set to None is counted as skipped."""
+        # when
+        with Metrics() as metrics:
+            undecided(IOType("a"))
+        # then
+        assert metrics.snapshot()[f"{__name__}.undecided"]["results"]["skipped"] == 1
+
+    def test_threads_are_merged(self):
+        """Every thread records into its own shard, and the shards add up."""
+        # given
+        metrics = Metrics()
+
+        def work():
+            for _ in range(1000):
+                echo(IOType("a"))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        # when
+        with metrics:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        # then
+        assert metrics.snapshot()[ECHO]["results"]["ok"] == 4000
+        assert len(metrics._shards) == 4  # pylint: disable=protected-access
+
+    def test_prometheus_text(self):
+        """The histogram is cumulative and ends with +Inf, sum and count."""
+        # given
+        with Metrics(buckets=(1.0,)) as metrics:
+            echo(IOType("a"))
+            echo(IOType("fail", 'bad "quote"', True))
+        # when
+        text = metrics.prometheus()
+        # then
+        label = f'function="{ECHO}"'
+        assert f'fpsupport_side_effect_seconds_bucket{{{label},le="1.0"}} 2' in text
+        assert f'fpsupport_side_effect_seconds_bucket{{{label},le="+Inf"}} 2' in text
+        assert f"fpsupport_side_effect_seconds_count{{{label}}} 2" in text
+        assert f'fpsupport_side_effect_calls_total{{{label},result="failed"}} 1' in text
+        assert f'{{{label},category="bad \\"quote\\""}} 1' in text
+        assert "# TYPE fpsupport_side_effect_seconds histogram" in text
+
+    def test_categories_are_bounded(self):
+        """Past MAX_CATEGORIES, further categories are counted as other."""
+        # when
+        with Metrics() as metrics:
+            for i in range(40):
+                echo(IOType("fail", f"error {i}", True))
+        # then
+        errors = metrics.snapshot()[ECHO]["errors"]
+        assert len(errors) == 33
+        assert errors["other"] == 8
+
+    def test_export(self):
+        """The text goes to a callback, or atomically to a file."""
+        # given
+        with Metrics() as metrics:
+            echo(IOType("a"))
+        sent: list = []
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fpsupport.prom")
+            # when
+            metrics.export(sent.append)
+            written = write_prometheus(IOType(), metrics, path)
+            missing = write_prometheus(IOType(), metrics, os.path.join(directory, "no", "file"))
+            # then
+            with open(path, encoding="utf-8") as file_pointer:
+                assert file_pointer.read() == sent[0]
+            assert os.listdir(directory) == ["fpsupport.prom"]
+        assert unwrap(written).ok
+        assert unwrap(missing).ok is False
+
+    def test_clear(self):
+        """Clearing forgets everything."""
+        # given
+        with Metrics() as metrics:
+            echo(IOType("a"))
+        # when
+        metrics.clear()
+        # then
+        assert not metrics.snapshot()
+
+
+class TestErrorCategory(TestCase):
+    """Testing the default error categories."""
+
+    def test_drops_the_prefix(self):
+        """The file name or row before the last colon is dropped."""
+        assert error_category("/etc/x: Permission denied") == "Permission denied"
+        assert error_category("row 3: 'x' is undefined") == "'x' is undefined"
+        assert error_category("") == "unknown"
+        assert error_category(None) == "unknown"
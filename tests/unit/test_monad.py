@@ -7,12 +7,32 @@ Every monad in the fpsupport/monad directory are tested here.
 
 from dataclasses import dataclass
 from typing import Any, Self
+import time
 from unittest import TestCase
 
 import pytest
 
+from fpsupport.decorator import side_effect
 from fpsupport.exception import MonadException
-from fpsupport.monad import Monad, Maybe, unwrap
+from fpsupport.monad import (
+    DEADLINE_EXCEEDED,
+    STRICT,
+    TRUSTED,
+    Deadline,
+    Done,
+    Lazy,
+    Maybe,
+    Monad,
+    Pipeline,
+    Suspend,
+    Writer,
+    bracket,
+    remaining_budget,
+    set_validation,
+    trampoline,
+    unwrap,
+)
+from fpsupport.struct import IOType
 
 
 class TestBaseClass(TestCase):
@@ -66,6 +86,13 @@ class TestBaseClass(TestCase):
         result = (m >> monadic_add_one >> monadic_add_one).final()
         assert unwrap(result) == 10
 
+    def test_slotted_and_repr(self):
+        """The Monad has no per-instance dictionary and prints its wrapped value."""
+        m = Monad.unit(5)
+        assert not hasattr(m, "__dict__")
+        assert repr(m) == "Monad(5)"
+        assert repr(Maybe(Monad(1))) == "Maybe(Monad(1))"
+
     def test_bind_failure(self):
         """Test that the bind operator fails with an exception."""
         # given
@@ -75,6 +102,37 @@ class TestBaseClass(TestCase):
         with pytest.raises(MonadException):
             _ = m >> (lambda x: str(x + 1))
 
+    def test_trusted_mode_skips_validation(self):
+        """In trusted mode, a bound function's return type is not checked."""
+        # given
+        m = Monad.unit(5)
+        # when
+        set_validation(TRUSTED)
+        try:
+            result = m >> (lambda x: str(x + 1))
+        finally:
+            set_validation(STRICT)
+        # then
+        assert result == "6"
+        with pytest.raises(MonadException):
+            _ = m >> (lambda x: str(x + 1))
+
+    def test_base_map_is_a_clone(self):
+        """flat_map skips the base map(), which only clones the Monad."""
+        # given
+        m = Monad.unit(5)
+        # when
+        clone = m.map()
+        # then
+        assert clone is not m and unwrap(clone) == 5
+        assert unwrap(m.final()) == 5
+
+    def test_unknown_validation_mode(self):
+        """Only strict and trusted are validation modes."""
+        with pytest.raises(ValueError):
+            set_validation("lenient")
+
+
 class TestMaybe(TestCase):
     """Test the Maybe Monad Class."""
 
@@ -105,3 +163,696 @@ class TestMaybe(TestCase):
             monadic_add_natural_number, 1)  # This last one will not execute
 
         assert unwrap(result).outcome == 2
+
+
+@dataclass
+class Counted:  # pylint: disable=missing-class-docstring
+    outcome: int
+    ok: bool = True
+
+
+def maybe_add(a: Counted, b: int) -> Maybe:
+    """Add a natural number, failing on anything else."""
+    return Maybe(Counted(a.outcome + b)) if b > 0 else Maybe(Counted(a.outcome, False))
+
+
+def monad_add(a: int, b: int = 1) -> Monad:
+    """Add b."""
+    return Monad(a + b)
+
+
+class TestPipeline(TestCase):
+    """Test the Pipeline of bound functions."""
+
+    def test_pipeline_matches_chain(self):
+        """A Pipeline gives the same result as the equivalent flat_map chain."""
+        # given
+        pipeline = Pipeline().then(monad_add).then(monad_add, 10) >> (monad_add, 100) >> monad_add
+        # when
+        result = pipeline.run(Monad(0))
+        # then
+        assert unwrap(result) == unwrap(Monad(0) >> monad_add) + 111
+        assert len(pipeline.steps) == 4
+
+    def test_pipeline_is_immutable(self):
+        """Adding a step returns a new Pipeline."""
+        # given
+        empty = Pipeline()
+        # when
+        longer = empty >> monad_add
+        # then
+        assert not empty.steps
+        assert unwrap(empty(Monad(1))) == 1
+        assert unwrap(longer(Monad(1))) == 2
+
+    def test_maybe_stops_at_the_first_failure(self):
+        """A Maybe whose ok is False is returned without running the remaining steps."""
+        # given
+        pipeline = Pipeline() >> (maybe_add, 1) >> (maybe_add, 0) >> (maybe_add, 1)
+        # when
+        result = unwrap(pipeline.run(Maybe(Counted(1))))
+        # then
+        assert result.outcome == 2
+        assert result.ok is False
+
+    def test_run_many(self):
+        """A Pipeline runs against many inputs."""
+        # given
+        pipeline = Pipeline() >> (maybe_add, 1) >> (maybe_add, 2)
+        # when
+        results = pipeline.run_many(Maybe(Counted(i)) for i in range(3))
+        # then
+        assert [unwrap(m).outcome for m in results] == [3, 4, 5]
+
+    def test_custom_map_is_respected(self):
+        """A Monad with its own map() is bound step by step through flat_map."""
+
+        # given
+        class MyMonad(Monad):
+            """Add one before each bind."""
+
+            def map(self) -> Self:
+                return MyMonad(self.outer + 1)  # pyright: ignore[reportReturnType]
+
+        def add_one(a: int) -> MyMonad:
+            return MyMonad(a + 1)
+
+        # when
+        result = (Pipeline() >> add_one >> add_one).run(MyMonad(5))
+        # then
+        assert unwrap(result) == unwrap(MyMonad(5) >> add_one >> add_one) == 9
+
+    def test_step_changing_the_monad_type(self):
+        """After a step returns another kind of Monad, the rest follow that Monad's rules."""
+        # given
+        called = []
+
+        def to_failed_maybe(io: IOType) -> Maybe:
+            return Maybe(IOType(io.outcome, "failed", False))
+
+        def to_maybe(io: IOType) -> Maybe:
+            return Maybe(io)
+
+        def g(io: IOType) -> Monad:
+            called.append(io)
+            return Monad(IOType(io.outcome, "", True))
+
+        # when
+        chained = Monad(IOType("a")) >> to_failed_maybe >> g
+        piped = (Pipeline() >> to_failed_maybe >> g).run(Monad(IOType("a")))
+        # then
+        assert not called
+        assert unwrap(piped) == unwrap(chained)
+        assert unwrap(piped).ok is False
+        with pytest.raises(MonadException):
+            Monad(IOType("a")) >> to_maybe >> g
+        with pytest.raises(MonadException):
+            (Pipeline() >> to_maybe >> g).run(Monad(IOType("a")))
+
+    def test_wrong_type_fails(self):
+        """A step returning another type raises as flat_map does."""
+        with pytest.raises(MonadException):
+            (Pipeline() >> (lambda x: x + 1)).run(Monad(1))
+
+
+class TestLazy(TestCase):
+    """Test the deferred Monad."""
+
+    def test_binding_does_not_evaluate(self):
+        """Nothing runs until the value is asked for."""
+        # given
+        calls = []
+
+        def add(a: int, n: int) -> Lazy:
+            calls.append(n)
+            return Lazy.unit(a + n)
+
+        # when
+        m = Lazy(1) >> (lambda a: add(a, 1))
+        m = m.flat_map(add, 2)
+        # then
+        assert not calls
+        assert not m.forced
+        assert unwrap(m) == 4
+        assert calls == [1, 2]
+
+    def test_repr_does_not_evaluate(self):
+        """Printing an unforced Lazy does not run its chain."""
+        # given
+        calls: list = []
+
+        def record(a: int) -> Lazy:
+            calls.append(a)
+            return Lazy.unit(a + 1)
+
+        m = Lazy(1) >> record
+        # when
+        unforced = repr(m)
+        # then
+        assert unforced == "Lazy(<unevaluated>)"
+        assert not calls and not m.forced
+        assert unwrap(m) == 2
+        assert repr(m) == "Lazy(2)"
+
+    def test_forcing_is_memoized(self):
+        """Forcing twice, or forcing a longer chain, does not run the functions again."""
+        # given
+        calls = []
+
+        def add_one(a: int) -> Lazy:
+            calls.append(a)
+            return Lazy(a + 1)
+
+        m = Lazy(0) >> add_one >> add_one
+        # when
+        assert unwrap(m) == 2
+        assert unwrap(m) == 2
+        longer = m >> add_one
+        # then
+        assert unwrap(longer) == 3
+        assert calls == [0, 1, 2]
+        assert m.forced
+
+    def test_unused_branch_never_runs(self):
+        """Only the branch that is unwrapped is evaluated."""
+        # given
+        calls = []
+
+        def tag(a: str, name: str) -> Lazy:
+            calls.append(name)
+            return Lazy(a + name)
+
+        base = Lazy("") >> (lambda a: tag(a, "base"))
+        _ = base.flat_map(tag, "left")
+        right = base.flat_map(tag, "right")
+        # when
+        result = unwrap(right)
+        # then
+        assert result == "baseright"
+        assert calls == ["base", "right"]
+
+    def test_long_chain_is_stack_safe(self):
+        """A chain of 100k steps is evaluated without reaching the recursion limit."""
+        # given
+        m = Lazy(0)
+        for _ in range(100_000):
+            m = m >> (lambda a: Lazy(a + 1))
+        # when
+        result = unwrap(m.final())
+        # then
+        assert result == 100_000
+
+    def test_nested_lazy_results_are_flattened(self):
+        """A bound function returning an unforced Lazy is evaluated as part of the chain."""
+        # when
+        m = Lazy(1) >> (lambda a: Lazy(a) >> (lambda b: Lazy(b * 10)))
+        # then
+        assert unwrap(m) == 10
+
+    def test_failure_can_be_retried(self):
+        """An exception leaves the failed step unforced, and the steps before it memoized."""
+        # given
+        calls = []
+        attempts = iter([ValueError("first"), None])
+
+        def once(a: int) -> Lazy:
+            calls.append(a)
+            return Lazy(a + 1)
+
+        def flaky(a: int) -> Lazy:
+            error = next(attempts)
+            if error is not None:
+                raise error
+            return Lazy(a * 2)
+
+        m = Lazy(1) >> once >> flaky
+        # when
+        with pytest.raises(ValueError):
+            unwrap(m)
+        # then
+        assert not m.forced
+        assert unwrap(m) == 4
+        assert calls == [1]
+
+    def test_wrong_type_fails(self):
+        """A bound function that does not return a Lazy raises when the chain is forced."""
+        # given
+        m = Lazy(1) >> (lambda a: Monad(a))
+        # then
+        with pytest.raises(MonadException):
+            unwrap(m)
+
+    def test_trusted_mode_accepts_any_monad(self):
+        """In trusted mode, the value of any Monad is taken."""
+        # given
+        set_validation(TRUSTED)
+        try:
+            m = Lazy(1) >> (lambda a: Monad(a + 1))
+            # then
+            assert unwrap(m) == 2
+        finally:
+            set_validation(STRICT)
+
+    def test_pipeline_builds_a_lazy_chain(self):
+        """A Pipeline run on a Lazy defers its steps like flat_map does."""
+        # given
+        calls = []
+
+        def add_one(a: int) -> Lazy:
+            calls.append(a)
+            return Lazy(a + 1)
+
+        # when
+        result = (Pipeline() >> add_one >> add_one).run(Lazy(0))
+        # then
+        assert not calls
+        assert unwrap(result) == 2
+
+
+def walk(m: Maybe, record: tuple | None) -> Done | Suspend:
+    """Add up a linked list of (value, next) records, one bind per record."""
+    if record is None or m.outer.ok is False:
+        return Done(m)
+    value, rest = record
+    return Suspend(walk, m.flat_map(maybe_add, value), rest)
+
+
+def depth_of(record: tuple | None) -> Done | Suspend:
+    """Count the records, adding one after the recursive call returns."""
+    if record is None:
+        return Done(Maybe(Counted(0)))
+    return Suspend(depth_of, record[1]).then(lambda m: Done(m.flat_map(maybe_add, 1)))
+
+
+def linked(length: int) -> tuple | None:
+    """Build a linked list of (1, next) records."""
+    record = None
+    for _ in range(length):
+        record = (1, record)
+    return record
+
+
+class TestTrampoline(TestCase):
+    """Test stack-safe recursion with Done, Suspend and trampoline()."""
+
+    def test_tail_recursion_is_stack_safe(self):
+        """A recursive walk far deeper than the recursion limit completes."""
+        # when
+        result = trampoline(Suspend(walk, Maybe(Counted(0)), linked(100_000)))
+        # then
+        assert unwrap(result).outcome == 100_000
+
+    def test_work_after_the_recursive_call(self):
+        """Continuations added with then() run in order once the call returns."""
+        # when
+        result = trampoline(Suspend(depth_of, linked(100_000)))
+        # then
+        assert unwrap(result).outcome == 100_000
+
+    def test_continuations_run_in_order(self):
+        """Several then() calls are applied first to last."""
+        # when
+        result = trampoline(
+            Done(Monad([])).then(lambda m: Done(Monad(m.outer + [1]))).then(
+                lambda m, n: Done(Monad(m.outer + [n])), 2
+            )
+        )
+        # then
+        assert unwrap(result) == [1, 2]
+
+    def test_failed_maybe_stops_the_walk(self):
+        """A recursive function can stop early on a failed Maybe."""
+        # given
+        m = Maybe(Counted(0, False))
+        # when
+        result = trampoline(Suspend(walk, m, linked(10)))
+        # then
+        assert unwrap(result).outcome == 0
+
+    def test_repr(self):
+        """A step prints its value, or the name of the function it will call."""
+        assert repr(Done(1)) == "Done(1)"
+        assert repr(Suspend(trampoline, Done(1)).then(Done)) == "Suspend('trampoline', ...)"
+
+    def test_wrong_step_fails(self):
+        """A step that is neither a Done nor a Suspend raises a MonadException."""
+        with pytest.raises(MonadException):
+            trampoline(Suspend(lambda: Monad(1)))
+
+
+@side_effect
+def budgeted(io: IOType, budgets: list) -> Monad:
+    """A side effect that records the budget it was given."""
+    budgets.append(remaining_budget())
+    return Monad(IOType(io.outcome + 1, "", True))
+
+
+class TestDeadline(TestCase):
+    """Test the Maybe Monad with a latency budget."""
+
+    def test_runs_within_the_budget(self):
+        """Before the deadline, bound functions run and see the remaining budget."""
+        # given
+        budgets: list = []
+        # when
+        m = Deadline.within(IOType(0), 10)
+        result = m.flat_map(budgeted, budgets).flat_map(budgeted, budgets)
+        # then
+        assert isinstance(result, Deadline)
+        assert unwrap(result) == IOType(2, "", True)
+        assert len(budgets) == 2
+        assert all(0 < budget <= 10 for budget in budgets)
+        assert remaining_budget() is None
+
+    def test_short_circuits_after_the_deadline(self):
+        """Once the deadline has passed, the chain fails with the last outcome."""
+        # given
+        budgets: list = []
+        m = Deadline(IOType(5), time.monotonic() - 1)
+        # when
+        result = m.flat_map(budgeted, budgets).flat_map(budgeted, budgets)
+        # then
+        assert unwrap(result) == IOType(5, DEADLINE_EXCEEDED, False)
+        assert not budgets
+        assert result.remaining == 0
+
+    def test_deadline_passing_mid_chain(self):
+        """A step that uses up the budget stops the steps after it."""
+        # given
+        budgets: list = []
+
+        def slow(io: IOType) -> Maybe:
+            time.sleep(0.05)
+            return Maybe(io)
+
+        # when
+        result = (Deadline.within(IOType(0), 0.02) >> slow).flat_map(budgeted, budgets)
+        # then
+        assert unwrap(result).error_msg == DEADLINE_EXCEEDED
+        assert not budgets
+
+    def test_failure_is_kept(self):
+        """A failed value is frozen as in Maybe."""
+        # given
+        m = Deadline(IOType(1, "failed", False), time.monotonic() - 1)
+        # when
+        result = m.flat_map(budgeted, [])
+        # then
+        assert result is m
+
+    def test_no_deadline_behaves_as_maybe(self):
+        """Without a deadline there is no budget and nothing expires."""
+        # given
+        budgets: list = []
+        # when
+        result = Deadline(IOType(0)).flat_map(budgeted, budgets)
+        # then
+        assert unwrap(result).outcome == 1
+        assert budgets == [None]
+        assert result.remaining is None
+
+    def test_unit_inherits_the_running_deadline(self):
+        """A Deadline made inside a bound function shares the chain's deadline."""
+
+        # given
+        def nested(io: IOType) -> Deadline:
+            return Deadline.unit(io).flat_map(budgeted, [])
+
+        m = Deadline.within(IOType(0), 10)
+        # when
+        result = m >> nested
+        # then
+        assert result.deadline == m.deadline
+        assert unwrap(result).outcome == 1
+
+    def test_earlier_deadline_wins(self):
+        """A bound function may tighten the deadline but not extend it."""
+        # given
+        m = Deadline.within(IOType(0), 10)
+        # when
+        tighter = m >> (lambda io: Deadline.within(io, 1))
+        looser = m >> (lambda io: Deadline.within(io, 100))
+        # then
+        assert tighter.deadline < m.deadline
+        assert looser.deadline == m.deadline
+
+    def test_unit_needs_ok(self):
+        """As with Maybe, the wrapped value must have an ok attribute."""
+        with pytest.raises(MonadException):
+            Deadline.unit(5)
+
+    def test_repr(self):
+        """A Deadline prints its value and its deadline."""
+        assert repr(Deadline(IOType(0), 1.5)) == f"Deadline({IOType(0)!r}, 1.5)"
+
+    def test_custom_map_is_respected(self):
+        """A subclass with its own map() has it applied before each bind."""
+
+        # given
+        class Doubled(Deadline):
+            """Double the outcome before each bind."""
+
+            def map(self) -> Self:
+                return Doubled(IOType(self.outer.outcome * 2), self.deadline)
+
+        # when
+        result = Doubled(IOType(1), time.monotonic() + 10).flat_map(budgeted, [])
+        # then
+        assert unwrap(result).outcome == 3
+
+    def test_wrong_type_fails(self):
+        """A bound function must return a Monad, in trusted mode as well."""
+        with pytest.raises(MonadException):
+            Deadline.within(IOType(0), 10) >> (lambda io: io)
+        set_validation(TRUSTED)
+        try:
+            with pytest.raises(MonadException):
+                Deadline.within(IOType(0), 10) >> (lambda io: 1)
+        finally:
+            set_validation(STRICT)
+
+
+class Resource:
+    """A resource that remembers whether it was released."""
+
+    def __init__(self):
+        self.released = False
+
+
+def acquire(io: IOType, resource: Resource) -> Monad:
+    """Hand out the resource."""
+    return Monad(IOType(resource, "", True))
+
+
+def acquire_maybe(io: IOType, resource: Resource) -> Maybe:
+    """Hand out the resource in a Maybe."""
+    return Maybe(IOType(resource, "", True))
+
+
+def release(io: IOType) -> Monad:
+    """Release the resource."""
+    io.outcome.released = True
+    return Monad(IOType(None, "", True))
+
+
+def release_fails(io: IOType) -> Monad:
+    """Release the resource, reporting a failure."""
+    io.outcome.released = True
+    return Monad(IOType(None, "flush failed", False))
+
+
+class TestBracket(TestCase):
+    """Test the acquire, use and release combinator."""
+
+    def test_use_result_is_returned(self):
+        """The resource is released after use, and the result of use is returned."""
+        # given
+        resource = Resource()
+
+        def use(m: Monad) -> Monad:
+            return Monad(IOType(unwrap(m).outcome.released, "", True))
+
+        # when
+        result = bracket(Monad(IOType()), acquire, use, release, resource)
+        # then
+        assert unwrap(result).outcome is False
+        assert resource.released
+
+    def test_released_when_use_fails(self):
+        """A sub-chain that clears ok still releases, and its failure is returned."""
+        # given
+        resource = Resource()
+        use = Pipeline() >> (lambda io: Maybe(IOType(io.outcome, "bad", False))) >> (maybe_add, 1)
+        # when
+        result = bracket(Maybe(IOType()), acquire_maybe, use, release, resource)
+        # then
+        assert unwrap(result).error_msg == "bad"
+        assert resource.released
+
+    def test_released_when_use_raises(self):
+        """A sub-chain that raises still releases."""
+        # given
+        resource = Resource()
+
+        def broken(m: Monad) -> Monad:
+            raise ValueError(m)
+
+        # when
+        with pytest.raises(ValueError):
+            bracket(Monad(IOType()), acquire, broken, release, resource)
+        # then
+        assert resource.released
+
+    def test_released_after_the_deadline(self):
+        """A Deadline that passes during use does not skip the release."""
+        # given
+        resource = Resource()
+
+        def slow(m: Deadline) -> Deadline:
+            time.sleep(0.02)
+            return m >> Deadline.unit
+
+        # when
+        result = bracket(Deadline.within(IOType(), 0.01), acquire, slow, release, resource)
+        # then
+        assert unwrap(result).error_msg == DEADLINE_EXCEEDED
+        assert resource.released
+
+    def test_failed_acquire_is_not_released(self):
+        """Nothing is used or released when acquire fails."""
+        # given
+        used = []
+        # when
+        result = bracket(Maybe(IOType("", "no", False)), acquire, used.append, release, Resource())
+        # then
+        assert unwrap(result).error_msg == "no"
+        assert not used
+
+    def test_release_failure_is_returned(self):
+        """A failed release is returned when use succeeded, in the type of use's Monad."""
+        # given
+        resource = Resource()
+        # when
+        result = bracket(Maybe(IOType()), acquire_maybe, lambda m: m, release_fails, resource)
+        # then
+        assert isinstance(result, Maybe)
+        assert unwrap(result).error_msg == "flush failed"
+        assert resource.released
+
+
+class ListSink:
+    """A sink that keeps what it is given, failing on request."""
+
+    def __init__(self, fail_on: str = ""):
+        self.parts: list = []
+        self.fail_on = fail_on
+        self.state = "open"
+
+    def write(self, data: str) -> IOType:
+        if data == self.fail_on:
+            return IOType("", "disk full", False)
+        self.parts.append(data)
+        return IOType(len(data), "", True)
+
+    def close(self) -> IOType:
+        self.state = "closed"
+        return IOType("", "cannot rename", False) if self.fail_on == "close" else IOType()
+
+    def discard(self) -> None:
+        self.state = "discarded"
+
+
+def line(io: IOType, text: str) -> Writer:
+    """Write a line, adding one to the outcome."""
+    return Writer.tell(IOType(io.outcome + 1, "", True), text + "\n")
+
+
+class TestWriter(TestCase):
+    """Test the Monad that collects output."""
+
+    def test_output_is_appended_in_order(self):
+        """Without a sink, the output of every step is kept in the Writer."""
+        # when
+        result = (
+            Writer(IOType(0)).flat_map(line, "a").flat_map(Monad.unit).flat_map(line, "b")
+        ).final()
+        # then
+        assert result.output == "a\nb\n"
+        assert unwrap(result).outcome == 2
+
+    def test_failure_skips_the_rest(self):
+        """As in a Maybe, a cleared ok skips every later function."""
+        # when
+        result = Writer(IOType(0)).flat_map(line, "a") >> (
+            lambda io: Writer(IOType(io.outcome, "bad", False))
+        )
+        result = result.flat_map(line, "b")
+        # then
+        assert result.output == "a\n"
+        assert unwrap(result).error_msg == "bad"
+
+    def test_output_goes_to_the_sink(self):
+        """With a sink, the output is handed over step by step and committed by final()."""
+        # given
+        sink = ListSink()
+        # when
+        m = Writer.to(IOType(0), sink).flat_map(line, "a").flat_map(line, "b")
+        result = m.final()
+        # then
+        assert sink.parts == ["a\n", "b\n"]
+        assert not m.output
+        assert sink.state == "closed"
+        assert unwrap(result).outcome == 2
+
+    def test_failed_chain_is_discarded(self):
+        """final() on a failed chain discards the sink rather than committing it."""
+        # given
+        sink = ListSink()
+        # when
+        result = Writer.to(IOType(0, "bad", False), sink).flat_map(line, "a").final()
+        # then
+        assert sink.state == "discarded"
+        assert unwrap(result).error_msg == "bad"
+
+    def test_sink_failures_fail_the_chain(self):
+        """A failed write, or a failed close, fails the chain with its error."""
+        # when
+        written = Writer.to(IOType(0), ListSink("b\n")).flat_map(line, "a").flat_map(line, "b")
+        closed = Writer.to(IOType(0), ListSink("close")).flat_map(line, "a").final()
+        # then
+        assert unwrap(written).error_msg == "disk full"
+        assert unwrap(written).outcome == 2
+        assert unwrap(closed).error_msg == "cannot rename"
+        assert unwrap(closed).ok is False
+
+    def test_unit_and_repr(self):
+        """unit() starts with no output, and a Writer prints its value, output and sink."""
+        assert repr(Writer.unit(1)) == "Writer(1, '', None)"
+        assert repr(Writer.tell(1, b"a")) == "Writer(1, b'a', None)"
+
+    def test_custom_map_is_respected(self):
+        """A subclass with its own map() has it applied before each bind."""
+
+        # given
+        class Doubled(Writer):
+            """Double the outcome before each bind."""
+
+            def map(self) -> Self:
+                return Doubled(IOType(self.outer.outcome * 2), self.output, self.sink)
+
+        # when
+        result = Doubled(IOType(1)).flat_map(line, "a")
+        # then
+        assert unwrap(result).outcome == 3
+        assert result.output == "a\n"
+
+    def test_wrong_type_fails(self):
+        """A bound function must return a Monad, in trusted mode as well."""
+        with pytest.raises(MonadException):
+            Writer(IOType(0)) >> (lambda io: io)
+        set_validation(TRUSTED)
+        try:
+            with pytest.raises(MonadException):
+                Writer(IOType(0)) >> (lambda io: 1)
+        finally:
+            set_validation(STRICT)
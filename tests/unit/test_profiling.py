@@ -0,0 +1,233 @@
+"""Testing the profiling of bound functions."""
+
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from fpsupport import monad
+from fpsupport.monad import (
+    Deadline,
+    Hook,
+    Maybe,
+    Monad,
+    Pipeline,
+    Writer,
+    add_hook,
+    remove_hook,
+    unwrap,
+)
+from fpsupport.profiling import Profiler, write_folded, write_report
+from fpsupport.struct import IOType
+
+
+def inc(io: IOType) -> Maybe:
+    """Add one."""
+    return Maybe(IOType(io.outcome + 1, "", True))
+
+
+def fail(io: IOType) -> Maybe:
+    """Fail."""
+    return Maybe(IOType(io.outcome, "failed", False))
+
+
+def sleepy(io: IOType) -> Maybe:
+    """Sleep a little, then add one through a nested chain."""
+    time.sleep(0.002)
+    return Maybe(io) >> inc
+
+
+class Recorder(Hook):
+    """A hook that records what it is called with."""
+
+    def __init__(self):
+        self.events: list = []
+
+    def pre(self, f, args, kwargs):
+        self.events.append(("pre", f.__name__, args))
+
+    def post(self, f, args, kwargs, elapsed_ns, result):
+        self.events.append(("post", f.__name__, elapsed_ns >= 0, result and unwrap(result)))
+
+    def short_circuit(self, f, args, kwargs):
+        self.events.append(("skip", f.__name__, args))
+
+
+class TestHooks(TestCase):
+    """Testing the instrumentation surface of fpsupport.monad."""
+
+    def tearDown(self):
+        monad._hooks = ()  # pylint: disable=protected-access
+
+    def test_off_by_default(self):
+        """No hooks are registered until one is added."""
+        assert monad._hooks == ()  # pylint: disable=protected-access
+
+    def test_pre_post_and_short_circuit(self):
+        """Hooks see every bind, its arguments, its time and its result, and every skip."""
+        # given
+        recorder = Recorder()
+        add_hook(recorder)
+        # when
+        result = Maybe(IOType(1)).flat_map(inc).flat_map(fail).flat_map(inc)
+        remove_hook(recorder)
+        Maybe(IOType(1)).flat_map(inc)
+        # then
+        assert recorder.events == [
+            ("pre", "inc", (IOType(1),)),
+            ("post", "inc", True, IOType(2, "", True)),
+            ("pre", "fail", (IOType(2, "", True),)),
+            ("post", "fail", True, unwrap(result)),
+            ("skip", "inc", ()),
+        ]
+
+    def test_pipeline_is_instrumented(self):
+        """A Pipeline binds step by step while hooks are registered."""
+        # given
+        recorder = Recorder()
+        add_hook(recorder)
+        # when
+        (Pipeline() >> inc >> inc).run(Maybe(IOType(0)))
+        # then
+        assert [event[0] for event in recorder.events] == ["pre", "post", "pre", "post"]
+
+    def test_deadline_skips_are_seen(self):
+        """A Deadline reports the binds it skips, whether failed or out of time."""
+        # given
+        recorder = Recorder()
+        add_hook(recorder)
+        # when
+        Deadline(IOType(1, "failed", False)).flat_map(inc)
+        Deadline(IOType(1), time.monotonic() - 1).flat_map(inc, 2)
+        # then
+        assert recorder.events == [("skip", "inc", ()), ("skip", "inc", (2,))]
+
+    def test_writer_skips_are_seen(self):
+        """A Writer reports the binds it skips after a failure."""
+        # given
+        recorder = Recorder()
+        add_hook(recorder)
+        # when
+        Writer(IOType(1, "failed", False)).flat_map(inc, 2)
+        # then
+        assert recorder.events == [("skip", "inc", (2,))]
+
+    def test_exceptions_still_reach_post(self):
+        """A bound function that raises is still closed by post, with no result."""
+        # given
+        recorder = Recorder()
+        add_hook(recorder)
+
+        def broken(io: IOType) -> Monad:
+            raise ValueError(io.outcome)
+
+        # when
+        with self.assertRaises(ValueError):
+            Monad(IOType(1)).flat_map(broken)
+        # then
+        assert recorder.events[-1] == ("post", "broken", True, None)
+
+
+class TestProfiler(TestCase):
+    """Testing the Profiler collector."""
+
+    def test_counts_timings_and_short_circuits(self):
+        """Each function is counted, timed and its skips tallied."""
+        # when
+        with Profiler() as profiler:
+            for i in range(10):
+                Maybe(IOType(i)).flat_map(inc).flat_map(sleepy).flat_map(fail).flat_map(inc)
+        # then
+        stats = {s.name.rsplit(".", 1)[-1]: s for s in profiler.stats()}
+        assert stats["inc"].calls == 20
+        assert stats["inc"].short_circuits == 10
+        assert stats["sleepy"].calls == 10
+        assert stats["sleepy"].p50_ns >= 2_000_000
+        assert stats["sleepy"].max_ns >= stats["sleepy"].p99_ns >= stats["sleepy"].p50_ns
+        assert profiler.stats()[0].name.endswith("sleepy")
+
+    def test_stops_collecting(self):
+        """Nothing is collected after the with block."""
+        # given
+        with Profiler() as profiler:
+            Maybe(IOType(0)).flat_map(inc)
+        # when
+        Maybe(IOType(0)).flat_map(inc)
+        # then
+        assert profiler.stats()[0].calls == 1
+        assert not monad._hooks  # pylint: disable=protected-access
+
+    def test_folded_stacks_nest(self):
+        """Binds made inside a bound function are folded under it."""
+        # when
+        with Profiler() as profiler:
+            Maybe(IOType(0)).flat_map(sleepy)
+        # then
+        lines = profiler.folded().splitlines()
+        paths = [line.rsplit(" ", 1)[0] for line in lines]
+        assert len(lines) == 2
+        assert paths[0].endswith("sleepy")
+        assert paths[1].startswith(paths[0] + ";") and paths[1].endswith("inc")
+        assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in lines)
+
+    def test_samples_are_bounded(self):
+        """Percentiles come from at most max_samples timings."""
+        # when
+        with Profiler(max_samples=5) as profiler:
+            for i in range(50):
+                Maybe(IOType(i)).flat_map(inc)
+        # then
+        stats = profiler.stats()[0]
+        assert stats.calls == 50
+        assert len(profiler._records[stats.name].samples) == 5  # pylint: disable=protected-access
+
+    def test_only_short_circuited(self):
+        """A function that was only skipped has no timings."""
+        # when
+        with Profiler() as profiler:
+            Maybe(IOType(0)).flat_map(fail).flat_map(inc)
+        # then
+        stats = {s.name.rsplit(".", 1)[-1]: s for s in profiler.stats()}
+        assert stats["inc"].calls == 0
+        assert stats["inc"].short_circuits == 1
+        assert stats["inc"].p50_ns == stats["inc"].max_ns == 0
+
+    def test_post_without_pre(self):
+        """A post without a matching pre is ignored."""
+        # given
+        profiler = Profiler()
+        # when
+        profiler.post(inc, (), {}, 10, None)
+        # then
+        assert not profiler.stats()
+
+    def test_report_and_folded_files(self):
+        """The report and the folded stacks are written as side effects."""
+        # given
+        with Profiler() as profiler:
+            Maybe(IOType(0)).flat_map(sleepy)
+        with tempfile.TemporaryDirectory() as directory:
+            report_path = os.path.join(directory, "report.txt")
+            folded_path = os.path.join(directory, "binds.folded")
+            # when
+            report = write_report(IOType(), profiler, report_path)
+            folded = write_folded(IOType(), profiler, folded_path)
+            missing = write_report(IOType(), profiler, os.path.join(directory, "no", "file"))
+            # then
+            with open(report_path, encoding="utf-8") as file_pointer:
+                assert file_pointer.readline().startswith("function")
+            with open(folded_path, encoding="utf-8") as file_pointer:
+                assert file_pointer.read() == profiler.folded()
+        assert unwrap(report).ok and unwrap(folded).ok
+        assert unwrap(missing).ok is False
+
+    def test_clear(self):
+        """Clearing forgets everything."""
+        # given
+        with Profiler() as profiler:
+            Maybe(IOType(0)).flat_map(inc)
+        # when
+        profiler.clear()
+        # then
+        assert not profiler.stats()
+        assert not profiler.folded()
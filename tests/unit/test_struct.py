@@ -19,3 +19,16 @@ class TestIOType(TestCase):
         """Error_msg must be string or None."""
         with raises(TypeError):
             _ = IOType("", 5, None)  # type: ignore
+
+    def test_slotted(self):
+        """IOType has no per-instance dictionary, and refuses unknown attributes."""
+        io = IOType("", "", True)
+        assert not hasattr(io, "__dict__")
+        with raises(AttributeError):
+            io.extra = 1  # type: ignore  # pylint: disable=assigning-non-slot
+
+    def test_equality_and_repr(self):
+        """IOTypes compare and print by their fields."""
+        assert IOType("a", "", True) == IOType("a", "", True)
+        assert IOType("a", "", True) != IOType("b", "", True)
+        assert repr(IOType("a", "", None)) == "IOType(outcome='a', error_msg='', ok=None)"